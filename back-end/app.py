@@ -1,35 +1,56 @@
+import base64
+import functools
+import hashlib
 import io
+import json
 import os
 import pathlib
-from datetime import datetime
+from datetime import date, datetime
 
 import numpy as np
 import pandas as pd
-from flask import Flask, jsonify, request, send_file
+from flask import (
+    Flask,
+    Response,
+    make_response,
+    request,
+    send_file,
+    stream_with_context,
+)
 from flask_cors import CORS
 from gensim.models import Word2Vec
-from sklearn.metrics.pairwise import cosine_similarity
 
 from database import (
     create_rotation_config,
     delete_rotation_config,
     get_all_locked_seaman_codes,
     get_locked_rotations,
-    get_mutations_as_data,
+    get_locked_rotations_version,
+    get_mutation_store,
+    get_pool_status,
     get_rotation_config_by_id,
     get_rotation_configs,
+    get_rotation_configs_version,
     get_seamen_as_data,
+    get_seamen_changes,
+    get_seamen_index,
+    get_snapshot_version,
+    get_sync_lease_holders,
+    get_sync_logs,
     save_locked_rotation,
     unlock_rotation,
     update_rotation_config,
 )
 from model import (
     filter_in_vessel,
+    get_crew_embeddings,
     getRecommendation,
     search_candidate,
+    top_k_positions,
     vessel_group_id_deck,
 )
 from request_api import (
+    RotationContext,
     get_kkm,
     get_masinisII,
     get_mualimI,
@@ -37,12 +58,73 @@ from request_api import (
     get_nganggur,
     get_schedule,
 )
+from serializer import encoded_response, frame_payload, json_response, requested_orient
 
 app = Flask(__name__)
-CORS(app=app)
+CORS(app=app, expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"])
 app.secret_key = "supersecretkey"
 
 
+# Sumber versi untuk ETag. Versi None berarti tidak bisa di-cache.
+ETAG_SOURCES = {
+    "seamen": lambda: get_snapshot_version("seamen"),
+    "mutations": lambda: get_snapshot_version("mutations"),
+    "rotation_configs": get_rotation_configs_version,
+    "locked_rotations": get_locked_rotations_version,
+    # Untuk route yang memakai datetime.now() (cutoff pengalaman)
+    "date": lambda: date.today().isoformat(),
+}
+
+
+def conditional_get(*sources):
+    """
+    Decorator ETag berdasarkan versi data
+
+    ETag dihitung dari versi sources (lihat ETAG_SOURCES) beserta path,
+    query string dan body request. Jika If-None-Match cocok, 304 langsung
+    dikirim tanpa menjalankan route. Hanya untuk GET/HEAD: 304 tidak berlaku
+    untuk method lain.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            try:
+                versions = [str(ETAG_SOURCES[source]()) for source in sources]
+            except Exception as e:
+                print(f"WARNING - Failed to compute ETag version: {str(e)}")
+                return view(*args, **kwargs)
+
+            if "None" in versions:
+                return view(*args, **kwargs)
+
+            digest = hashlib.sha1()
+            digest.update("|".join(versions).encode())
+            digest.update(request.full_path.encode())
+            digest.update(request.get_data())
+            etag = digest.hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = "no-cache"
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                # Weak karena body bisa dikompres berbeda per Accept-Encoding
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
 # Route to check if the app is working
 @app.route("/")
 def index():
@@ -229,32 +311,54 @@ SHIP_GROUPS = {
     ],
 }
 
-# Load data from Supabase instead of Excel
-combined_df = get_seamen_as_data()
-
 timestamp_file = "../last_request_time.txt"
 
-# combined_df["DAY REMAINS DIFF"] = combined_df["day_remains"]
-combined_df["DAY REMAINS DIFF"] = pd.to_numeric(
-    combined_df["day_remains"], errors="coerce"
-)
-
-df_filtered = combined_df[combined_df["DAY REMAINS DIFF"] > 0][
-    [
-        "seamancode",
-        "seafarercode",
-        "name",
-        "last_position",
-        "last_location",
-        "age",
-        "certificate",
-        "DAY REMAINS DIFF",
-    ]
+SORTED_SEAMEN_CSV = "../data/sorted_seamen_data_diff.csv"
+SORTED_SEAMEN_COLUMNS = [
+    "seamancode",
+    "seafarercode",
+    "name",
+    "last_position",
+    "last_location",
+    "age",
+    "certificate",
 ]
 
-sorted_df = df_filtered.sort_values(by="DAY REMAINS DIFF")
+# Hasil get_sorted_seamen per versi snapshot seamen
+_sorted_seamen = {"version": None, "data": None}
+
+
+def get_sorted_seamen():
+    """
+    Seamen dengan sisa kontrak > 0, urut DAY REMAINS DIFF
+
+    Dihitung dari snapshot seamen saat pertama dipakai (bukan saat import)
+    dan dihitung ulang hanya jika versi snapshot berubah.
+    """
+    version = get_snapshot_version("seamen")
+    if _sorted_seamen["version"] != version:
+        df = get_seamen_as_data()
+        day_remains = pd.to_numeric(df["day_remains"], errors="coerce")
+        active = (day_remains > 0).to_numpy()
+        sorted_df = df.loc[active, SORTED_SEAMEN_COLUMNS].assign(
+            **{"DAY REMAINS DIFF": day_remains[active]}
+        )
+        _sorted_seamen["data"] = sorted_df.sort_values(by="DAY REMAINS DIFF")
+        _sorted_seamen["version"] = version
+    return _sorted_seamen["data"]
+
+
+def export_sorted_seamen_csv(path=SORTED_SEAMEN_CSV):
+    """
+    Tulis get_sorted_seamen ke CSV
+
+    Ditulis ke file sementara lalu di-rename, jadi pembaca di mount data
+    bersama tidak pernah melihat file setengah jadi.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    get_sorted_seamen().to_csv(temp_path, index=False)
+    os.replace(temp_path, path)
 
-sorted_df.to_csv("../data/sorted_seamen_data_diff.csv", index=False)
 
 word2vec_model = None
 
@@ -289,74 +393,43 @@ def save_last_request_time():
 
 def get_top_5_similar(target_seaman_code):
     try:
-        global combined_df
         global word2vec_model
 
         if word2vec_model is None:
             print("Word2Vec model is None!")
-            return jsonify({"error": "Word2Vec model belum dimuat"})
+            return {"error": "Word2Vec model belum dimuat"}
 
-        target_seaman_data = combined_df[
-            combined_df["seamancode"] == target_seaman_code
-        ]
+        seamen_index = get_seamen_index()
+        target_position = seamen_index.position(target_seaman_code)
 
-        if target_seaman_data.empty:
+        if target_position is None:
             print("No seaman found with that code")
-            return jsonify(
-                {"error": f"Seaman dengan kode {target_seaman_code} tidak ditemukan"}
-            )
-
-        rank = target_seaman_data.iloc[0]["last_position"]
-        certificate = target_seaman_data.iloc[0]["certificate"]
+            return {"error": f"Seaman dengan kode {target_seaman_code} tidak ditemukan"}
 
-        def get_word2vec_vector(text):
-            if not isinstance(text, str):
-                return np.zeros(word2vec_model.vector_size)
-            words = str(text).split()
-            try:
-                word_vectors = [
-                    word2vec_model.wv[word]
-                    for word in words
-                    if word in word2vec_model.wv
-                ]
-                if word_vectors:
-                    return np.mean(word_vectors, axis=0)
-                return np.zeros(word2vec_model.vector_size)
-            except Exception as e:
-                print(f"Error in get_word2vec_vector: {str(e)}")
-                return np.zeros(word2vec_model.vector_size)
+        target_seaman_data = seamen_index.data.iloc[target_position]
+        rank = target_seaman_data["last_position"]
+        certificate = target_seaman_data["certificate"]
 
-        user_input = f"{rank} {certificate}"
-        user_vector = get_word2vec_vector(user_input)
+        # Similarity seluruh crew dengan satu perkalian matriks-vektor
+        embeddings = get_crew_embeddings(seamen_index.data, word2vec_model)
+        similarity = embeddings.scores(f"{rank} {certificate}")
 
-        filtered_candidates = combined_df[
-            combined_df["seamancode"] != target_seaman_code
-        ].copy()
-
-        filtered_candidates["vector"] = (
-            filtered_candidates["last_position"].astype(str)
-            + " "
-            + filtered_candidates["certificate"].astype(str)
-        )
-        filtered_candidates["vector"] = filtered_candidates["vector"].apply(
-            get_word2vec_vector
+        # Buang seaman target berdasarkan posisi baris (bukan label index)
+        candidate_positions = np.delete(
+            np.arange(len(seamen_index.data)),
+            seamen_index.positions("seamancode", [target_seaman_code]),
         )
-
-        filtered_candidates["vector"] = filtered_candidates["vector"].apply(
-            lambda x: x.tolist()
+        filtered_candidates = seamen_index.data.take(candidate_positions)
+        filtered_candidates["DAY REMAINS DIFF"] = pd.to_numeric(
+            filtered_candidates["day_remains"], errors="coerce"
         )
+        filtered_candidates["similarity"] = similarity[candidate_positions]
 
-        filtered_candidates["similarity"] = filtered_candidates["vector"].apply(
-            lambda x: float(cosine_similarity([user_vector], [x])[0][0])
-        )
-
-        filtered_candidates = filtered_candidates.sort_values(
-            by="similarity", ascending=False
-        )
-        top_5_recommendations = filtered_candidates.head(5)
+        top_5_recommendations = filtered_candidates.iloc[
+            top_k_positions([filtered_candidates["similarity"]], 5)
+        ]
 
         columns_to_drop = [
-            "vector",
             "phone_number_1",
             "phone_number_2",
             "phone_number_3",
@@ -367,57 +440,228 @@ def get_top_5_similar(target_seaman_code):
 
         top_5_dict = top_5_recommendations.to_dict(orient="records")
 
-        for record in top_5_dict:
-            for key, value in record.items():
-                if "numpy" in str(type(value)):
-                    if np.issubdtype(type(value), np.floating):
-                        record[key] = float(value)
-                    elif np.issubdtype(type(value), np.integer):
-                        record[key] = int(value)
-                    else:
-                        record[key] = str(value)
-
         response = {"status": "success", "data": top_5_dict}
 
         return response
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)})
+        return {"status": "error", "message": str(e)}
+
+
+# Kolom output dashboard -> kolom seamen
+DASHBOARD_COLUMNS = {
+    "SEAMAN CODE": "seamancode",
+    "SEAFARER CODE": "seafarercode",
+    "SEAMAN NAME": "name",
+    "RANK": "last_position",
+    "VESSEL": "last_location",
+    "UMUR": "age",
+    "CERTIFICATE": "certificate",
+    "DAY REMAINS": "day_remains",
+}
+DASHBOARD_NUMERIC_COLUMNS = {"UMUR", "DAY REMAINS"}
+
+# Parameter filter dashboard -> kolom seamen (kolom yang ter-index)
+DASHBOARD_FILTERS = {
+    "rank": "last_position",
+    "vessel": "last_location",
+    "status": "status",
+}
+
+DASHBOARD_MAX_LIMIT = 1000
+DASHBOARD_STREAM_CHUNK = 500
+DASHBOARD_CURSOR_KEYS = {"version", "offset", "limit", "sort", "order", "filters"}
+
+
+def encode_dashboard_cursor(state):
+    payload = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_dashboard_cursor(cursor):
+    """State dashboard dari cursor, ValueError jika strukturnya tidak valid"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    valid = (
+        isinstance(state, dict)
+        and set(state) == DASHBOARD_CURSOR_KEYS
+        and isinstance(state["version"], str)
+        and is_int(state["offset"])
+        and state["offset"] >= 0
+        and (state["limit"] is None or is_int(state["limit"]))
+        and (state["sort"] is None or isinstance(state["sort"], str))
+        and isinstance(state["order"], str)
+        and isinstance(state["filters"], dict)
+        and all(
+            param in DASHBOARD_FILTERS
+            and isinstance(values, list)
+            and all(isinstance(value, str) for value in values)
+            for param, values in state["filters"].items()
+        )
+    )
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def dashboard_state_error(state):
+    """Pesan error jika sort/order/limit state dashboard tidak valid, atau None"""
+    if state["sort"] and state["sort"] not in DASHBOARD_COLUMNS:
+        return f"Sort harus salah satu dari: {', '.join(DASHBOARD_COLUMNS)}"
+    if state["order"] not in ["asc", "desc"]:
+        return "Order harus asc/desc"
+    if state["limit"] is not None and not 1 <= state["limit"] <= DASHBOARD_MAX_LIMIT:
+        return f"Limit harus 1-{DASHBOARD_MAX_LIMIT}"
+    return None
+
+
+def dashboard_sort_order(values, tiebreak, descending, numeric):
+    """
+    Urutan baris untuk sort dashboard, stabil dengan seamancode sebagai
+    tiebreak dan nilai kosong selalu di akhir
+    """
+    if numeric:
+        key = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    else:
+        codes, _ = pd.factorize(pd.Series(values), sort=True)
+        key = np.where(codes < 0, np.nan, codes.astype(float))
+    if descending:
+        key = -key
+    return np.lexsort((tiebreak, key))
+
+
+def dashboard_records(data, positions):
+    """DataFrame output dashboard untuk posisi baris tertentu"""
+    frame = data.iloc[positions][list(DASHBOARD_COLUMNS.values())]
+    frame.columns = list(DASHBOARD_COLUMNS.keys())
+    return frame
 
 
 # Route to serve the main dashboard
 @app.route("/api/dashboard-data")
+@conditional_get("seamen")
 def get_dashboard_data():
-    # Load from Supabase instead of Excel
-    data = get_seamen_as_data()
-    data = data.rename(
-        columns={
-            "age": "UMUR",
-            "certificate": "CERTIFICATE",
-            "day_remains": "DAY REMAINS",
-            "last_position": "RANK",
-            "last_location": "VESSEL",
-            "name": "SEAMAN NAME",
-            "seafarercode": "SEAFARER CODE",
-            "seamancode": "SEAMAN CODE",
-        }
-    )
+    """
+    Data dashboard seamen
+
+    Tanpa parameter, seluruh data dikembalikan sebagai satu array JSON.
+    Parameter opsional:
+        rank, vessel, status: filter (pisahkan beberapa nilai dengan koma)
+        sort, order: kolom output (mis. "DAY REMAINS") dan asc/desc
+        limit: jumlah baris per halaman, response menjadi
+            {"data": [...], "next_cursor": ..., "total": ...}
+        cursor: next_cursor dari halaman sebelumnya (sort/filter ikut cursor)
+        format=ndjson: stream satu record JSON per baris, next_cursor
+            dikirim di header X-Next-Cursor
+    """
+    try:
+        # Versi cursor diambil dari index yang sama dengan data yang dipakai
+        seamen_index = get_seamen_index()
+        data = seamen_index.data
+        version = str(seamen_index.version)
+        cursor = request.args.get("cursor")
 
-    data = data[
-        [
-            "SEAMAN CODE",
-            "SEAFARER CODE",
-            "SEAMAN NAME",
-            "RANK",
-            "VESSEL",
-            "UMUR",
-            "CERTIFICATE",
-            "DAY REMAINS",
+        if cursor:
+            try:
+                state = decode_dashboard_cursor(cursor)
+            except Exception:
+                return (
+                    json_response({"status": "error", "message": "Invalid cursor"}),
+                    400,
+                )
+
+            if state["version"] != version:
+                return (
+                    json_response(
+                        {
+                            "status": "error",
+                            "message": "Cursor expired, data has been synced",
+                        }
+                    ),
+                    410,
+                )
+        else:
+            state = {
+                "version": version,
+                "offset": 0,
+                "limit": request.args.get("limit", type=int),
+                "sort": request.args.get("sort"),
+                "order": request.args.get("order", "asc").lower(),
+                "filters": {
+                    param: [v.strip() for v in request.args[param].split(",")]
+                    for param in DASHBOARD_FILTERS
+                    if request.args.get(param)
+                },
+            }
+
+        error = dashboard_state_error(state)
+        if error:
+            return json_response({"status": "error", "message": error}), 400
+
+        # Filter lewat index, hanya posisi baris yang disimpan
+        conditions = [
+            (DASHBOARD_FILTERS[param], "in", values)
+            for param, values in state["filters"].items()
         ]
-    ]
+        positions = seamen_index.match(conditions)
+        if positions is None:
+            positions = np.arange(len(data))
+
+        if state["sort"]:
+            column = data[DASHBOARD_COLUMNS[state["sort"]]].to_numpy()
+            order = dashboard_sort_order(
+                column[positions],
+                data["seamancode"].to_numpy()[positions],
+                state["order"] == "desc",
+                state["sort"] in DASHBOARD_NUMERIC_COLUMNS,
+            )
+            positions = positions[order]
 
-    # Kembalikan data sebagai JSON
-    return data.to_json(orient="records")
+        total = len(positions)
+        offset = state["offset"]
+        limit = state["limit"]
+        end = total if limit is None else min(offset + limit, total)
+        positions = positions[offset:end]
+
+        next_cursor = None
+        if end < total:
+            next_cursor = encode_dashboard_cursor({**state, "offset": end})
+
+        if request.args.get("format") == "ndjson":
+
+            def generate():
+                for start in range(0, len(positions), DASHBOARD_STREAM_CHUNK):
+                    chunk = positions[start : start + DASHBOARD_STREAM_CHUNK]
+                    yield dashboard_records(data, chunk).to_json(
+                        orient="records", lines=True
+                    )
+
+            headers = {"X-Total-Count": str(total)}
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return Response(
+                stream_with_context(generate()),
+                mimetype="application/x-ndjson",
+                headers=headers,
+            )
+
+        records = dashboard_records(data, positions).to_json(orient="records")
+
+        if limit is None and not cursor:
+            # Kembalikan data sebagai JSON (format lama)
+            return encoded_response(records)
+
+        return encoded_response(
+            '{"data":%s,"next_cursor":%s,"total":%d}'
+            % (records, json.dumps(next_cursor), total)
+        )
+
+    except Exception as e:
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 # Route to get the top 5 similar seamen
@@ -425,11 +669,12 @@ def get_dashboard_data():
 def get_similarity(seaman_code):
     top_5 = get_top_5_similar(seaman_code)
     print(f"Top 5 similar seamen for code {seaman_code}: {top_5}")
-    return jsonify(top_5)
+    return json_response(top_5)
 
 
-# Global variable to hold the current DataFrame
-original_df = combined_df  # Asumsikan combined_df adalah DataFrame awal Anda
+def get_original_df():
+    """Data seamen terbaru dari snapshot (jangan diubah in-place)"""
+    return get_seamen_as_data()
 
 
 def generate_schedule(ship_names, first_assignments, start_year, end_year):
@@ -622,8 +867,10 @@ def df_to_json(df: pd.DataFrame):
         ...
       ]
     }
+
+    Dengan ?orient=split, "data" berisi list baris (tanpa nama kolom per baris).
     """
-    return {"columns": df.columns.tolist(), "data": df.to_dict(orient="records")}
+    return frame_payload(df, requested_orient())
 
 
 @app.route("/api/container_rotation", methods=["POST"])
@@ -648,7 +895,7 @@ def container_rotation_api():
 
         if job_raw_upper not in job_mapping:
             return (
-                jsonify(
+                json_response(
                     {
                         "status": "error",
                         "message": f"Job '{job_raw}' tidak valid. Pilih antara: {', '.join(job_mapping.keys())}",
@@ -666,12 +913,12 @@ def container_rotation_api():
         # Ambil data dari request body
         data = request.get_json()
         if not data:
-            return jsonify({"error": "Tidak ada data yang diterima"}), 400
+            return json_response({"error": "Tidak ada data yang diterima"}), 400
 
         required_fields = ["selected_group", "cadangan"]
         for field in required_fields:
             if field not in data:
-                return jsonify({"error": f"Field {field} diperlukan"}), 400
+                return json_response({"error": f"Field {field} diperlukan"}), 400
 
         # Ambil data dari payload
         selected_group = data["selected_group"]
@@ -693,22 +940,38 @@ def container_rotation_api():
         # LOGGING
         print(f"[DEBUG] Memanggil get_schedule dengan job='{job}'")
 
+        # Data seamen dimuat sekali untuk semua helper di request ini
+        context = RotationContext()
+
         # Dapatkan DataFrame schedule dengan parameter job
-        schedule_df = get_schedule(selected_group, cadangan, type_vessel, part, job)
+        schedule_df = get_schedule(
+            selected_group, cadangan, type_vessel, part, job, context=context
+        )
 
         # PILIH FUNGSI YANG TEPAT BERDASARKAN JOB
         print(f"[DEBUG] Memanggil fungsi crew untuk job='{job}'")
 
         if job == "NAKHODA":
-            crew_df = get_nahkoda(selected_group, cadangan, type_vessel, part)
+            crew_df = get_nahkoda(
+                selected_group, cadangan, type_vessel, part, context=context
+            )
         elif job == "KKM":
-            crew_df = get_kkm(selected_group, cadangan, type_vessel, part)
+            crew_df = get_kkm(
+                selected_group, cadangan, type_vessel, part, context=context
+            )
         elif job == "MUALIM I":
-            crew_df = get_mualimI(selected_group, cadangan, type_vessel, part)
+            crew_df = get_mualimI(
+                selected_group, cadangan, type_vessel, part, context=context
+            )
         elif job == "MASINIS II":
-            crew_df = get_masinisII(selected_group, cadangan, type_vessel, part)
+            crew_df = get_masinisII(
+                selected_group, cadangan, type_vessel, part, context=context
+            )
         else:
-            return jsonify({"error": f"Fungsi untuk job {job} belum tersedia"}), 400
+            return (
+                json_response({"error": f"Fungsi untuk job {job} belum tersedia"}),
+                400,
+            )
 
         print(f"[DEBUG] Crew DataFrame shape: {crew_df.shape}")
 
@@ -723,17 +986,19 @@ def container_rotation_api():
 
             if job == "NAKHODA":
                 darat_df = get_nahkoda(
-                    selected_group, cadangan2, type_vessel, part, "ONE"
+                    selected_group, cadangan2, type_vessel, part, "ONE", context=context
                 )
             elif job == "KKM":
-                darat_df = get_kkm(selected_group, cadangan2, type_vessel, part, "ONE")
+                darat_df = get_kkm(
+                    selected_group, cadangan2, type_vessel, part, "ONE", context=context
+                )
             elif job == "MUALIM I":
                 darat_df = get_mualimI(
-                    selected_group, cadangan2, type_vessel, part, "ONE"
+                    selected_group, cadangan2, type_vessel, part, "ONE", context=context
                 )
             elif job == "MASINIS II":
                 darat_df = get_masinisII(
-                    selected_group, cadangan2, type_vessel, part, "ONE"
+                    selected_group, cadangan2, type_vessel, part, "ONE", context=context
                 )
 
             darat_json = df_to_json(darat_df)
@@ -742,7 +1007,7 @@ def container_rotation_api():
         # RESPONSE - TETAP GUNAKAN KEY "nahkoda"
         print(f"[DEBUG] Mengirim response dengan job='{job}'")
 
-        return jsonify(
+        return json_response(
             {
                 "schedule": schedule_json,
                 "nahkoda": nahkoda_json,  # ← KEY TETAP "nahkoda"
@@ -756,38 +1021,46 @@ def container_rotation_api():
         import traceback
 
         traceback.print_exc()
-        return jsonify({"error": "Terjadi kesalahan internal", "message": str(e)}), 500
+        return (
+            json_response({"error": "Terjadi kesalahan internal", "message": str(e)}),
+            500,
+        )
 
 
 @app.route("/api/get_cadangan_KKM")
+@conditional_get("seamen")
 def get_cadangan_KKM():
     df = get_nganggur("KKM")
     data = df.to_dict(orient="records")
-    return jsonify(data)
+    return json_response(data)
 
 
 @app.route("/api/get_cadangan_nakhoda")
+@conditional_get("seamen")
 def get_cadangan_nakhoda():
     df = get_nganggur("NAKHODA")
     data = df.to_dict(orient="records")
-    return jsonify(data)
+    return json_response(data)
 
 
 @app.route("/api/get_cadangan_mualimI")
+@conditional_get("seamen")
 def get_cadangan_mualimI():
     df = get_nganggur("MUALIM I")
     data = df.to_dict(orient="records")
-    return jsonify(data)
+    return json_response(data)
 
 
 @app.route("/api/get_cadangan_masinisII")
+@conditional_get("seamen")
 def get_cadangan_masinisII():
     df = get_nganggur("MASINIS II")
     data = df.to_dict(orient="records")
-    return jsonify(data)
+    return json_response(data)
 
 
 @app.route("/api/mutasi_filtered", methods=["GET"])
+@conditional_get("seamen", "mutations")
 def get_mutasi_filtered():
     try:
         # Ambil parameter 'job' dari query string
@@ -815,7 +1088,7 @@ def get_mutasi_filtered():
         # Validasi job yang diterima
         if job not in ["NAKHODA", "KKM", "MUALIM I", "MASINIS II"]:
             return (
-                jsonify(
+                json_response(
                     {
                         "status": "error",
                         "message": "Job tidak valid. Pilih antara 'NAKHODA', 'KKM', 'MUALIM I' atau 'MASINIS II'.",
@@ -824,10 +1097,6 @@ def get_mutasi_filtered():
                 400,
             )
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
-
         # Filter lokasi tertentu
         lokasi_filter = [
             "PENDING CUTI",
@@ -837,62 +1106,46 @@ def get_mutasi_filtered():
             "DARAT STAND-BY",
         ]
 
+        # Ambil seamen darat dengan job ini
+        df_seamen = get_seamen_as_data(
+            columns=["seamancode", "name"],
+            where={"last_position": job, "last_location": lokasi_filter},
+        )
+
         # Ambil seamancode berdasarkan job
-        seamancode_terfilter = df_seamen[
-            (df_seamen["last_location"].isin(lokasi_filter))
-            & (df_seamen["last_position"] == job)
-        ]["seamancode"].unique()
+        seamancode_terfilter = df_seamen["seamancode"].unique()
 
         # **FILTER OUT LOCKED CODES DI SINI**
         print(f"[DEBUG] Before filtering: {len(seamancode_terfilter)} seamen")
 
-        # Convert seamancode_terfilter to strings untuk konsistensi
-        seamancode_terfilter = [str(code).strip() for code in seamancode_terfilter]
-
-        # Filter out locked codes
         seamancode_terfilter = [
-            code for code in seamancode_terfilter if code not in locked_codes
+            code
+            for code in seamancode_terfilter
+            if str(code).strip() not in locked_codes
         ]
 
         print(f"[DEBUG] After filtering: {len(seamancode_terfilter)} seamen")
 
-        # Filter df_history berdasarkan seamancode yang sudah difilter
-        df_mutasi_filtered = df_history[
-            df_history["seamancode"].astype(str).str.strip().isin(seamancode_terfilter)
-        ]
-
-        # Merge untuk mendapatkan nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[["seamancode", "name"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
+        # Riwayat kapal per seaman tanpa status darat/pending
+        histories = get_mutation_store().vessel_history(
+            seamancode_terfilter, exclude=lokasi_filter
         )
+        names = df_seamen.drop_duplicates("seamancode").set_index("seamancode")["name"]
 
-        # Buat dictionary: seamancode -> {'name': ..., 'vessels': [...]} dengan vessels yang difilter
-        mutasi_dict_filtered = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "name": g["name"].iloc[0],
-                    "vessels": g.loc[
-                        ~g["fromvesselname"].isin(lokasi_filter), "fromvesselname"
-                    ]
-                    .dropna()
-                    .unique()
-                    .tolist(),
-                }
-            )
-            .to_dict()
-        )
+        # Buat dictionary: seamancode -> {'name': ..., 'vessels': [...]}
+        mutasi_dict_filtered = {
+            code: {"name": names.get(code), "vessels": vessels}
+            for code, vessels in histories.items()
+        }
 
         print(f"[DEBUG] Final result count: {len(mutasi_dict_filtered)}")
 
         # Kirim response JSON
-        return jsonify({"status": "success", "data": mutasi_dict_filtered})
+        return json_response({"status": "success", "data": mutasi_dict_filtered})
 
     except Exception as e:
         app.logger.error(f"Error in mutasi_filtered: {str(e)}", exc_info=True)
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/download_csv", methods=["POST"])
@@ -923,6 +1176,7 @@ def download_csv():
 
 @app.route("/api/options", methods=["POST"])
 def get_options():
+    original_df = get_original_df()
     copy_df = original_df.copy()
     data = request.get_json()
 
@@ -1012,7 +1266,7 @@ def get_options():
         "rank_option": rank_option,
         "vessel_option": vessel_option,
     }
-    return jsonify(data)
+    return json_response(data)
 
 
 @app.route("/get-recommendation", methods=["POST"])
@@ -1025,15 +1279,17 @@ def get_recommendation():
     age_range = (data_candidate["UMUR"], data_candidate["UMUR"])
 
     # Panggil getRecommendation dengan original_df sebagai parameter
+    original_df = get_original_df()
     recommendations = getRecommendation(
         original_df, data_candidate, bagian, vessel_name, rank, certificate, age_range
     )
     result = recommendations.to_dict(orient="records")
-    return jsonify(result)
+    return json_response(result)
 
 
 @app.route("/api/get-manual-search", methods=["POST"])
 def get_manual_search():
+    original_df = get_original_df()
     copy_df = original_df.copy()
     data_candidate = request.json
 
@@ -1057,7 +1313,7 @@ def get_manual_search():
     print("THIS IS VESSEL GROUP ID", filtered_candidates["VESSEL GROUP ID"])
 
     if filtered_candidates.empty:
-        return jsonify([])
+        return json_response([])
     print("DATAFRAME COLUMNS:", copy_df.columns)
 
     recommendations = getRecommendation(
@@ -1068,6 +1324,7 @@ def get_manual_search():
         data_candidate["RANK"],
         data_candidate["CERTIFICATE"],
         age_range,
+        crew_df=original_df,
     )
 
     # Ensure PHONE1, PHONE2, PHONE3, and PHONE4 are included in the response
@@ -1088,694 +1345,357 @@ def get_manual_search():
         ]
     ].to_dict(orient="records")
 
-    return jsonify(result)
+    return json_response(result)
+
+
+# Kapal yang disyaratkan untuk promosi bagian mesin
+KAPAL_DISYARATKAN = {
+    "KM. HIJAU SEJUK",
+    "KM. ORIENTAL DIAMOND",
+    "KM. ORIENTAL RUBY",
+    "KM. ORIENTAL JADE",
+    "KM. VERIZON",
+    "KM. SPIL HANA",
+    "KM. SPIL HAPSRI",
+    "KM. SPIL HAYU",
+    "KM. SPIL HASYA",
+    "KM. HIJAU JELITA",
+    "KM. HIJAU SAMUDERA",
+    "KM. ORIENTAL GOLD",
+    "KM. ORIENTAL GALAXY",
+    "KM. LUZON",
+    "KM. ARMADA PERMATA",
+    "KM. ORIENTAL SILVER",
+    "KM. ORIENTAL EMERALD",
+}
+
+
+def build_promotion_result(histories, with_talent=False):
+    """
+    Susun response promotion candidates dari MutationStore.vessel_history
+
+    Args:
+        histories: Dict {seamancode: [riwayat kapal]} urut seamancode
+        with_talent: Sertakan field is_talent
+
+    Returns:
+        List dict berisi code, name, rank, (is_talent) dan history
+    """
+    seamen_index = get_seamen_index()
+
+    result = []
+    for code, history in histories.items():
+        seaman = seamen_index.row(code)
+        if seaman is None:
+            continue
+
+        candidate = {
+            "code": int(code),
+            "name": seaman["name"],
+            "rank": seaman["last_position"],
+        }
+        if with_talent:
+            is_talent = seaman["is_talent"]
+            candidate["is_talent"] = bool(is_talent) if pd.notna(is_talent) else False
+        candidate["history"] = history
+        result.append(candidate)
+
+    return result
 
 
 @app.route("/api/seamen/promotion_candidates", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 2 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=2 * 365)
 
         # Filter seamen berdasarkan posisi dan sertifikat
-        seamancode_terfilter = df_seamen[
-            (df_seamen["last_position"] == "MUALIM I")
-            & (df_seamen["certificate"] == "ANT-I")
-        ]["seamancode"].unique()
-
-        # Filter df_history untuk pengalaman lebih dari 2 tahun
-        df_mutasi_filtered = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
+        df_seamen = get_seamen_as_data(where={"last_position": "MUALIM I"})
+        seamancode_terfilter = df_seamen[df_seamen["certificate"] == "ANT-I"][
+            "seamancode"
         ]
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[["seamancode", "name", "last_position"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
+        # Riwayat kapal dari mutations lebih dari 2 tahun lalu
+        histories = store.vessel_history(
+            seamancode_terfilter,
+            before=cutoff_date,
+            exclude=["PENDING GAJI", "PENDING CUTI"],
         )
 
-        # Group jadi dict dan hilangkan history yang tidak relevan
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "history": g[
-                        ~g["fromvesselname"].isin(["PENDING GAJI", "PENDING CUTI"])
-                    ]["fromvesselname"]
-                    .dropna()
-                    .unique()
-                    .tolist(),
-                }
-            )
-            .tolist()
-        )
+        result = build_promotion_result(histories)
 
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_kkm", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_kkm():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
-        # Tanggal cutoff pengalaman 2 tahun
+        # Tanggal cutoff pengalaman 4 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=4 * 365)
 
         # Filter seamen berdasarkan posisi
-        seamancode_terfilter = df_seamen[(df_seamen["last_position"] == "MASINIS II")][
-            "seamancode"
-        ].unique()
+        df_seamen = get_seamen_as_data(where={"last_position": "MASINIS II"})
+        seamancode_terfilter = df_seamen["seamancode"]
 
-        # Filter df_history untuk pengalaman lebih dari 2 tahun
-        df_mutasi_filtered = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]
-
-        # Daftar kapal yang disyaratkan
-        kapal_disyaratkan = {
-            "KM. HIJAU SEJUK",
-            "KM. ORIENTAL DIAMOND",
-            "KM. ORIENTAL RUBY",
-            "KM. ORIENTAL JADE",
-            "KM. VERIZON",
-            "KM. SPIL HANA",
-            "KM. SPIL HAPSRI",
-            "KM. SPIL HAYU",
-            "KM. SPIL HASYA",
-            "KM. HIJAU JELITA",
-            "KM. HIJAU SAMUDERA",
-            "KM. ORIENTAL GOLD",
-            "KM. ORIENTAL GALAXY",
-            "KM. LUZON",
-            "KM. ARMADA PERMATA",
-            "KM. ORIENTAL SILVER",
-            "KM. ORIENTAL EMERALD",
-        }
-
-        # Hitung jumlah kapal unik dari daftar di atas yang pernah disinggahi oleh tiap seamancode
-        df_kapal = df_mutasi_filtered.copy()
-        df_kapal["kapal_terkait"] = df_kapal["fromvesselname"].where(
-            df_kapal["fromvesselname"].isin(kapal_disyaratkan), None
-        )
-        df_kapal.loc[
-            df_kapal["tovesselname"].isin(kapal_disyaratkan), "kapal_terkait"
-        ] = df_kapal["tovesselname"]
-
-        # Ambil hanya yang punya >= 2 kapal unik dari daftar
-        df_kapal_valid = (
-            df_kapal.dropna(subset=["kapal_terkait"])
-            .groupby("seamancode")["kapal_terkait"]
-            .nunique()
-            .reset_index()
+        # Pengalaman lebih dari 4 tahun di minimal 2 kapal yang disyaratkan
+        seamancode_terfilter = store.codes_with_vessels(
+            seamancode_terfilter, KAPAL_DISYARATKAN, min_count=2, before=cutoff_date
         )
-        df_kapal_valid = df_kapal_valid[df_kapal_valid["kapal_terkait"] >= 2]
 
-        # Filter df_mutasi_filtered berdasarkan hasil di atas
-        df_mutasi_filtered = df_mutasi_filtered[
-            df_mutasi_filtered["seamancode"].isin(df_kapal_valid["seamancode"])
-        ]
+        # Riwayat kapal dari mutations lebih dari 4 tahun lalu
+        histories = store.vessel_history(seamancode_terfilter, before=cutoff_date)
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[["seamancode", "name", "last_position"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
-        )
+        result = build_promotion_result(histories)
 
-        # Group jadi dict
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "history": g["fromvesselname"].dropna().unique().tolist(),
-                }
-            )
-            .tolist()
-        )
-
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_mualimI", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_mualimI():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 2 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=2 * 365)
 
-        # Filter seamen berdasarkan posisi dan sertifikat (sertifikat mualin 2 itu apa?)
-        seamancode_terfilter = df_seamen[
-            (df_seamen["last_position"] == "MUALIM II")
-            & (df_seamen["certificate"] == "ANT-I")
-        ]["seamancode"].unique()
-
-        # Filter df_history untuk pengalaman lebih dari 2 tahun
-        df_mutasi_filtered = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
+        # Filter seamen berdasarkan posisi dan sertifikat
+        df_seamen = get_seamen_as_data(where={"last_position": "MUALIM II"})
+        seamancode_terfilter = df_seamen[df_seamen["certificate"] == "ANT-I"][
+            "seamancode"
         ]
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[["seamancode", "name", "last_position"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
+        # Riwayat kapal dari mutations lebih dari 2 tahun lalu
+        histories = store.vessel_history(
+            seamancode_terfilter,
+            before=cutoff_date,
+            exclude=["PENDING GAJI", "PENDING CUTI"],
         )
 
-        # Group jadi dict dan hilangkan history yang tidak relevan
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "history": g[
-                        ~g["fromvesselname"].isin(["PENDING GAJI", "PENDING CUTI"])
-                    ]["fromvesselname"]
-                    .dropna()
-                    .unique()
-                    .tolist(),
-                }
-            )
-            .tolist()
-        )
+        result = build_promotion_result(histories)
 
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_masinisII", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_masinisII():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
-        # Tanggal cutoff pengalaman 2 tahun
+        # Tanggal cutoff pengalaman 4 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=4 * 365)
 
         # Filter seamen berdasarkan posisi
-        seamancode_terfilter = df_seamen[(df_seamen["last_position"] == "MASINIS III")][
-            "seamancode"
-        ].unique()
-
-        # Filter df_history untuk pengalaman lebih dari 2 tahun
-        df_mutasi_filtered = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]
+        df_seamen = get_seamen_as_data(where={"last_position": "MASINIS III"})
+        seamancode_terfilter = df_seamen["seamancode"]
 
-        # Daftar kapal yang disyaratkan
-        kapal_disyaratkan = {
-            "KM. HIJAU SEJUK",
-            "KM. ORIENTAL DIAMOND",
-            "KM. ORIENTAL RUBY",
-            "KM. ORIENTAL JADE",
-            "KM. VERIZON",
-            "KM. SPIL HANA",
-            "KM. SPIL HAPSRI",
-            "KM. SPIL HAYU",
-            "KM. SPIL HASYA",
-            "KM. HIJAU JELITA",
-            "KM. HIJAU SAMUDERA",
-            "KM. ORIENTAL GOLD",
-            "KM. ORIENTAL GALAXY",
-            "KM. LUZON",
-            "KM. ARMADA PERMATA",
-            "KM. ORIENTAL SILVER",
-            "KM. ORIENTAL EMERALD",
-        }
-
-        # Hitung jumlah kapal unik dari daftar di atas yang pernah disinggahi oleh tiap seamancode
-        df_kapal = df_mutasi_filtered.copy()
-        df_kapal["kapal_terkait"] = df_kapal["fromvesselname"].where(
-            df_kapal["fromvesselname"].isin(kapal_disyaratkan), None
+        # Pengalaman lebih dari 4 tahun di minimal 2 kapal yang disyaratkan
+        seamancode_terfilter = store.codes_with_vessels(
+            seamancode_terfilter, KAPAL_DISYARATKAN, min_count=2, before=cutoff_date
         )
-        df_kapal.loc[
-            df_kapal["tovesselname"].isin(kapal_disyaratkan), "kapal_terkait"
-        ] = df_kapal["tovesselname"]
-
-        # Ambil hanya yang punya >= 2 kapal unik dari daftar
-        df_kapal_valid = (
-            df_kapal.dropna(subset=["kapal_terkait"])
-            .groupby("seamancode")["kapal_terkait"]
-            .nunique()
-            .reset_index()
-        )
-        df_kapal_valid = df_kapal_valid[df_kapal_valid["kapal_terkait"] >= 2]
 
-        # Filter df_mutasi_filtered berdasarkan hasil di atas
-        df_mutasi_filtered = df_mutasi_filtered[
-            df_mutasi_filtered["seamancode"].isin(df_kapal_valid["seamancode"])
-        ]
+        # Riwayat kapal dari mutations lebih dari 4 tahun lalu
+        histories = store.vessel_history(seamancode_terfilter, before=cutoff_date)
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[["seamancode", "name", "last_position"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
-        )
-
-        # Group jadi dict
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "history": g["fromvesselname"].dropna().unique().tolist(),
-                }
-            )
-            .tolist()
-        )
+        result = build_promotion_result(histories)
 
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 # ISSUE
 
 
 @app.route("/api/seamen/promotion_candidates_mualimII", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_mualimII():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 2 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=2 * 365)
 
         # Filter seamen berdasarkan posisi dan sertifikat
-        seamancode_terfilter = df_seamen[
-            (df_seamen["last_position"] == "MUALIM III")
-            & (df_seamen["certificate"] == "ANT-I")
-        ]["seamancode"].unique()
+        df_seamen = get_seamen_as_data(where={"last_position": "MUALIM III"})
+        seamancode_terfilter = df_seamen[df_seamen["certificate"] == "ANT-I"][
+            "seamancode"
+        ]
 
         # Cari seamancode yang punya pengalaman >= 2 tahun
-        seamancode_with_experience = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]["seamancode"].unique()
+        seamancode_with_experience = store.codes_with_history(
+            seamancode_terfilter, before=cutoff_date
+        )
 
         # Tambahkan seamen dengan is_talent di posisi MUALIM III
-        seamancode_talent = df_seamen[
-            (df_seamen["last_position"] == "MUALIM III") & (df_seamen["is_talent"])
-        ]["seamancode"].unique()
+        seamancode_talent = df_seamen[df_seamen["is_talent"].eq(True)]["seamancode"]
 
         # Gabungkan kedua kriteria (experience + talent)
-        seamancode_qualified = list(
-            set(seamancode_with_experience) | set(seamancode_talent)
-        )
+        seamancode_qualified = set(seamancode_with_experience) | set(seamancode_talent)
 
         # Ambil SEMUA history untuk seamancode yang qualified
-        df_mutasi_filtered = df_history[
-            df_history["seamancode"].isin(seamancode_qualified)
-        ]
-
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[
-                ["seamancode", "name", "last_position", "is_talent"]
-            ].drop_duplicates(),
-            on="seamancode",
-            how="left",
+        histories = store.vessel_history(
+            seamancode_qualified, exclude=["PENDING GAJI", "PENDING CUTI"]
         )
 
-        # Group jadi dict dan hilangkan history yang tidak relevan
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "is_talent": (
-                        bool(g["is_talent"].iloc[0])
-                        if pd.notna(g["is_talent"].iloc[0])
-                        else False
-                    ),
-                    "history": g[
-                        ~g["fromvesselname"].isin(["PENDING GAJI", "PENDING CUTI"])
-                    ]["fromvesselname"]
-                    .dropna()
-                    .unique()
-                    .tolist(),
-                }
-            )
-            .tolist()
-        )
+        result = build_promotion_result(histories, with_talent=True)
 
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_masinisIII", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_masinisIII():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 4 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=4 * 365)
 
         # Filter seamen berdasarkan posisi
-        seamancode_terfilter = df_seamen[(df_seamen["last_position"] == "MASINIS IV")][
-            "seamancode"
-        ].unique()
-
-        # Daftar kapal yang disyaratkan
-        kapal_disyaratkan = {
-            "KM. HIJAU SEJUK",
-            "KM. ORIENTAL DIAMOND",
-            "KM. ORIENTAL RUBY",
-            "KM. ORIENTAL JADE",
-            "KM. VERIZON",
-            "KM. SPIL HANA",
-            "KM. SPIL HAPSRI",
-            "KM. SPIL HAYU",
-            "KM. SPIL HASYA",
-            "KM. HIJAU JELITA",
-            "KM. HIJAU SAMUDERA",
-            "KM. ORIENTAL GOLD",
-            "KM. ORIENTAL GALAXY",
-            "KM. LUZON",
-            "KM. ARMADA PERMATA",
-            "KM. ORIENTAL SILVER",
-            "KM. ORIENTAL EMERALD",
-        }
+        df_seamen = get_seamen_as_data(where={"last_position": "MASINIS IV"})
+        seamancode_terfilter = df_seamen["seamancode"]
 
-        # Ambil SEMUA history untuk seamancode terfilter (untuk cek kapal requirement)
-        df_all_history = df_history[df_history["seamancode"].isin(seamancode_terfilter)]
-
-        # Hitung jumlah kapal unik dari daftar di atas yang pernah disinggahi oleh tiap seamancode
-        df_kapal = df_all_history.copy()
-        df_kapal["kapal_terkait"] = df_kapal["fromvesselname"].where(
-            df_kapal["fromvesselname"].isin(kapal_disyaratkan), None
-        )
-        df_kapal.loc[
-            df_kapal["tovesselname"].isin(kapal_disyaratkan), "kapal_terkait"
-        ] = df_kapal["tovesselname"]
-
-        # Ambil hanya yang punya >= 2 kapal unik dari daftar
-        df_kapal_valid = (
-            df_kapal.dropna(subset=["kapal_terkait"])
-            .groupby("seamancode")["kapal_terkait"]
-            .nunique()
-            .reset_index()
+        # Cek kapal requirement dari SEMUA history
+        seamancode_terfilter = store.codes_with_vessels(
+            seamancode_terfilter, KAPAL_DISYARATKAN, min_count=2
         )
-        df_kapal_valid = df_kapal_valid[df_kapal_valid["kapal_terkait"] >= 2]
 
         # Cari seamancode yang punya pengalaman >= 4 tahun DAN memenuhi kapal requirement
-        seamancode_with_experience = df_history[
-            (df_history["seamancode"].isin(df_kapal_valid["seamancode"]))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]["seamancode"].unique()
+        seamancode_with_experience = store.codes_with_history(
+            seamancode_terfilter, before=cutoff_date
+        )
 
         # Tambahkan seamen dengan is_talent di posisi MASINIS IV
-        seamancode_talent = df_seamen[
-            (df_seamen["last_position"] == "MASINIS IV") & (df_seamen["is_talent"])
-        ]["seamancode"].unique()
+        seamancode_talent = df_seamen[df_seamen["is_talent"].eq(True)]["seamancode"]
 
         # Gabungkan kedua kriteria (experience + talent)
-        seamancode_qualified = list(
-            set(seamancode_with_experience) | set(seamancode_talent)
-        )
+        seamancode_qualified = set(seamancode_with_experience) | set(seamancode_talent)
 
         # Ambil SEMUA history untuk seamancode yang qualified
-        df_mutasi_filtered = df_history[
-            df_history["seamancode"].isin(seamancode_qualified)
-        ]
+        histories = store.vessel_history(seamancode_qualified)
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[
-                ["seamancode", "name", "last_position", "is_talent"]
-            ].drop_duplicates(),
-            on="seamancode",
-            how="left",
-        )
+        result = build_promotion_result(histories, with_talent=True)
 
-        # Group jadi dict
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "is_talent": (
-                        bool(g["is_talent"].iloc[0])
-                        if pd.notna(g["is_talent"].iloc[0])
-                        else False
-                    ),
-                    "history": g["fromvesselname"].dropna().unique().tolist(),
-                }
-            )
-            .tolist()
-        )
-
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_mualimIII", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_mualimIII():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 2 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=2 * 365)
 
         # Filter seamen berdasarkan posisi dan sertifikat
-        seamancode_terfilter = df_seamen[
-            (df_seamen["last_position"] == "JURU MUDI")
-            & (df_seamen["certificate"] == "ANT-III")
-        ]["seamancode"].unique()
+        df_seamen = get_seamen_as_data(where={"last_position": "JURU MUDI"})
+        seamancode_terfilter = df_seamen[df_seamen["certificate"] == "ANT-III"][
+            "seamancode"
+        ]
 
         # Cari seamancode yang punya pengalaman >= 2 tahun
-        seamancode_with_experience = df_history[
-            (df_history["seamancode"].isin(seamancode_terfilter))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]["seamancode"].unique()
+        seamancode_with_experience = store.codes_with_history(
+            seamancode_terfilter, before=cutoff_date
+        )
 
         # Tambahkan seamen dengan is_talent di posisi JURU MUDI
-        seamancode_talent = df_seamen[
-            (df_seamen["last_position"] == "JURU MUDI") & (df_seamen["is_talent"])
-        ]["seamancode"].unique()
+        seamancode_talent = df_seamen[df_seamen["is_talent"].eq(True)]["seamancode"]
 
         # Gabungkan kedua kriteria (experience + talent)
-        seamancode_qualified = list(
-            set(seamancode_with_experience) | set(seamancode_talent)
-        )
+        seamancode_qualified = set(seamancode_with_experience) | set(seamancode_talent)
 
         # Ambil SEMUA history untuk seamancode yang qualified
-        df_mutasi_filtered = df_history[
-            df_history["seamancode"].isin(seamancode_qualified)
-        ]
-
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[
-                ["seamancode", "name", "last_position", "is_talent"]
-            ].drop_duplicates(),
-            on="seamancode",
-            how="left",
+        histories = store.vessel_history(
+            seamancode_qualified, exclude=["PENDING GAJI", "PENDING CUTI"]
         )
 
-        # Group jadi dict dan hilangkan history yang tidak relevan
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "is_talent": (
-                        bool(g["is_talent"].iloc[0])
-                        if pd.notna(g["is_talent"].iloc[0])
-                        else False
-                    ),
-                    "history": g[
-                        ~g["fromvesselname"].isin(["PENDING GAJI", "PENDING CUTI"])
-                    ]["fromvesselname"]
-                    .dropna()
-                    .unique()
-                    .tolist(),
-                }
-            )
-            .tolist()
-        )
+        result = build_promotion_result(histories, with_talent=True)
 
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/seamen/promotion_candidates_masinisIV", methods=["GET"])
+@conditional_get("seamen", "mutations", "date")
 def get_promotion_candidates_masinisIV():
     try:
         from datetime import datetime, timedelta, timezone
 
-        # Load from Supabase instead of Excel
-        df_history = get_mutations_as_data()
-        df_seamen = get_seamen_as_data()
+        store = get_mutation_store()
 
         # Tanggal cutoff pengalaman 4 tahun
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=4 * 365)
 
         # Filter seamen berdasarkan posisi
-        seamancode_terfilter = df_seamen[(df_seamen["last_position"] == "JURU MINYAK")][
-            "seamancode"
-        ].unique()
-
-        # Daftar kapal yang disyaratkan
-        kapal_disyaratkan = {
-            "KM. HIJAU SEJUK",
-            "KM. ORIENTAL DIAMOND",
-            "KM. ORIENTAL RUBY",
-            "KM. ORIENTAL JADE",
-            "KM. VERIZON",
-            "KM. SPIL HANA",
-            "KM. SPIL HAPSRI",
-            "KM. SPIL HAYU",
-            "KM. SPIL HASYA",
-            "KM. HIJAU JELITA",
-            "KM. HIJAU SAMUDERA",
-            "KM. ORIENTAL GOLD",
-            "KM. ORIENTAL GALAXY",
-            "KM. LUZON",
-            "KM. ARMADA PERMATA",
-            "KM. ORIENTAL SILVER",
-            "KM. ORIENTAL EMERALD",
-        }
-
-        # Ambil SEMUA history untuk seamancode terfilter (untuk cek kapal requirement)
-        df_all_history = df_history[df_history["seamancode"].isin(seamancode_terfilter)]
+        df_seamen = get_seamen_as_data(where={"last_position": "JURU MINYAK"})
+        seamancode_terfilter = df_seamen["seamancode"]
 
-        # Hitung jumlah kapal unik dari daftar di atas yang pernah disinggahi oleh tiap seamancode
-        df_kapal = df_all_history.copy()
-        df_kapal["kapal_terkait"] = df_kapal["fromvesselname"].where(
-            df_kapal["fromvesselname"].isin(kapal_disyaratkan), None
+        # Cek kapal requirement dari SEMUA history
+        seamancode_terfilter = store.codes_with_vessels(
+            seamancode_terfilter, KAPAL_DISYARATKAN, min_count=2
         )
-        df_kapal.loc[
-            df_kapal["tovesselname"].isin(kapal_disyaratkan), "kapal_terkait"
-        ] = df_kapal["tovesselname"]
-
-        # Ambil hanya yang punya >= 2 kapal unik dari daftar
-        df_kapal_valid = (
-            df_kapal.dropna(subset=["kapal_terkait"])
-            .groupby("seamancode")["kapal_terkait"]
-            .nunique()
-            .reset_index()
-        )
-        df_kapal_valid = df_kapal_valid[df_kapal_valid["kapal_terkait"] >= 2]
 
         # Cari seamancode yang punya pengalaman >= 4 tahun DAN memenuhi kapal requirement
-        seamancode_with_experience = df_history[
-            (df_history["seamancode"].isin(df_kapal_valid["seamancode"]))
-            & (pd.to_datetime(df_history["transactiondate"]) <= cutoff_date)
-        ]["seamancode"].unique()
+        seamancode_with_experience = store.codes_with_history(
+            seamancode_terfilter, before=cutoff_date
+        )
 
         # Tambahkan seamen dengan is_talent di posisi JURU MINYAK
-        seamancode_talent = df_seamen[
-            (df_seamen["last_position"] == "JURU MINYAK") & (df_seamen["is_talent"])
-        ]["seamancode"].unique()
+        seamancode_talent = df_seamen[df_seamen["is_talent"].eq(True)]["seamancode"]
 
         # Gabungkan kedua kriteria (experience + talent)
-        seamancode_qualified = list(
-            set(seamancode_with_experience) | set(seamancode_talent)
-        )
+        seamancode_qualified = set(seamancode_with_experience) | set(seamancode_talent)
 
         # Ambil SEMUA history untuk seamancode yang qualified
-        df_mutasi_filtered = df_history[
-            df_history["seamancode"].isin(seamancode_qualified)
-        ]
+        histories = store.vessel_history(seamancode_qualified)
 
-        # Merge untuk ambil nama
-        df_mutasi_filtered = df_mutasi_filtered.merge(
-            df_seamen[
-                ["seamancode", "name", "last_position", "is_talent"]
-            ].drop_duplicates(),
-            on="seamancode",
-            how="left",
-        )
+        result = build_promotion_result(histories, with_talent=True)
 
-        # Group jadi dict
-        result = (
-            df_mutasi_filtered.groupby("seamancode")
-            .apply(
-                lambda g: {
-                    "code": int(g["seamancode"].iloc[0]),
-                    "name": g["name"].iloc[0],
-                    "rank": g["last_position"].iloc[0],
-                    "is_talent": (
-                        bool(g["is_talent"].iloc[0])
-                        if pd.notna(g["is_talent"].iloc[0])
-                        else False
-                    ),
-                    "history": g["fromvesselname"].dropna().unique().tolist(),
-                }
-            )
-            .tolist()
-        )
-
-        return jsonify({"status": "success", "data": result})
+        return json_response({"status": "success", "data": result})
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/save-excel", methods=["POST"])
@@ -1796,12 +1716,15 @@ def save_excel():
         save_path = data_dir / "seaman_selected.xlsx"
         df.to_excel(save_path, index=False)
 
-        return jsonify({"status": "success", "message": "File berhasil disimpan!"})
+        return json_response(
+            {"status": "success", "message": "File berhasil disimpan!"}
+        )
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/filter_history", methods=["GET"])
+@conditional_get("seamen", "mutations")
 def filter_history():
     allowed_status = [
         "PENDING CUTI",
@@ -1812,77 +1735,65 @@ def filter_history():
     ]
 
     try:
-        # Ganti Excel dengan fetch dari database
-        df_history = get_mutations_as_data()  # Ini fungsi yang sudah ada
-        df_seamen = get_seamen_as_data()  # Untuk ambil nama
-
-        # Merge untuk dapat nama
-        df = df_history.merge(
-            df_seamen[["seamancode", "name"]].drop_duplicates(),
-            on="seamancode",
-            how="left",
-        )
-
-        # Cek kolom wajib - sesuaikan dengan struktur data Anda
-        if "seamancode" not in df.columns:
-            return (
-                jsonify(
-                    {
-                        "status": "error",
-                        "message": "Kolom 'seamancode' tidak ditemukan.",
-                    }
-                ),
-                400,
-            )
+        store = get_mutation_store()
+        seamen_index = get_seamen_index()  # Untuk ambil nama dan last location
 
         # Ambil parameter group kapal dari frontend
         group_vessels = request.args.getlist("group")
 
-        # Group by seamancode untuk gabungkan history
-        grouped = (
-            df.groupby("seamancode")
-            .agg(
-                {
-                    "name": "first",
-                    "fromvesselname": lambda x: x.dropna().tolist(),  # Collect all vessels
-                }
-            )
-            .reset_index()
+        # History semua seaman (urut tanggal), tanpa allowed_status
+        histories = store.vessel_history(
+            store.codes, exclude=allowed_status, unique=False
         )
 
-        result = []
-
-        for _, row in grouped.iterrows():
-            history_vessels = row.get("fromvesselname", [])
-
-            # Filter allowed_status dari history
-            filtered_vessels = [v for v in history_vessels if v not in allowed_status]
-
-            # Hitung match dengan group
-            match_count = sum(1 for v in filtered_vessels if v in group_vessels)
+        # Hitung match dengan group
+        match_counts = store.count_visits(
+            store.codes, [v for v in group_vessels if v not in allowed_status]
+        )
 
-            # Join jadi string
-            history_str = ", ".join(filtered_vessels)
+        result = []
 
-            # Lihat last location
-            last_location = df_seamen[df_seamen["seamancode"] == row["seamancode"]][
-                "last_location"
-            ].values
+        for code, filtered_vessels in histories.items():
+            seaman = seamen_index.row(code)
 
             result.append(
                 {
-                    "seamancode": row.get("seamancode", ""),
-                    "name": row.get("name", ""),
-                    "history": history_str,
-                    "matchCount": match_count,
-                    "last_location": last_location[0] if len(last_location) > 0 else "",
+                    "seamancode": code,
+                    "name": seaman["name"] if seaman is not None else None,
+                    "history": ", ".join(filtered_vessels),
+                    "matchCount": match_counts.get(code, 0),
+                    "last_location": (
+                        seaman["last_location"] if seaman is not None else ""
+                    ),
                 }
             )
 
-        return jsonify({"status": "success", "data": result, "count": len(result)})
+        return json_response(
+            {"status": "success", "data": result, "count": len(result)}
+        )
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/seamen/changes", methods=["GET"])
+@conditional_get("seamen")
+def seamen_changes():
+    """
+    GET - Perubahan seamen per sync setelah versi ?since_version=N
+
+    Jika has_more, halaman berikutnya diminta dengan since_version dan
+    after_id dari cursor response.
+    """
+    try:
+        since_version = request.args.get("since_version", 0, type=int)
+        after_id = request.args.get("after_id", type=int)
+        limit = min(request.args.get("limit", 5000, type=int), 50000)
+        result = get_seamen_changes(since_version, max(limit, 1), after_id)
+        return json_response({"status": "success", **result})
+
+    except Exception as e:
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 # ============================================================================
@@ -1891,6 +1802,7 @@ def filter_history():
 
 
 @app.route("/api/locked_rotations", methods=["GET"])
+@conditional_get("locked_rotations")
 def api_get_locked_rotations():
     """Get all locked rotations for a specific job"""
     try:
@@ -1898,18 +1810,18 @@ def api_get_locked_rotations():
 
         if not job:
             return (
-                jsonify({"status": "error", "message": "Job parameter required"}),
+                json_response({"status": "error", "message": "Job parameter required"}),
                 400,
             )
 
         # Fetch dari database menggunakan fungsi di database.py
         locked_data = get_locked_rotations(job=job)
 
-        return jsonify({"status": "success", "data": locked_data})
+        return json_response({"status": "success", "data": locked_data})
 
     except Exception as e:
         app.logger.error(f"Error fetching locked rotations: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/locked_rotations", methods=["POST"])
@@ -1929,7 +1841,9 @@ def api_save_locked_rotation():
         for field in required_fields:
             if field not in data:
                 return (
-                    jsonify({"status": "error", "message": f"Field {field} required"}),
+                    json_response(
+                        {"status": "error", "message": f"Field {field} required"}
+                    ),
                     400,
                 )
 
@@ -1944,7 +1858,7 @@ def api_save_locked_rotation():
         # Validasi seaman codes adalah list
         if not isinstance(locked_seaman_codes, list):
             return (
-                jsonify(
+                json_response(
                     {"status": "error", "message": "lockedSeamanCodes must be an array"}
                 ),
                 400,
@@ -1961,13 +1875,13 @@ def api_save_locked_rotation():
             locked_by=locked_by,
         )
 
-        return jsonify(
+        return json_response(
             {"status": "success", "message": result["message"], "id": result.get("id")}
         )
 
     except Exception as e:
         app.logger.error(f"Error saving locked rotation: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/locked_rotations/<group_key>", methods=["DELETE"])
@@ -1978,7 +1892,7 @@ def api_unlock_rotation(group_key):
 
         if not job:
             return (
-                jsonify({"status": "error", "message": "Job parameter required"}),
+                json_response({"status": "error", "message": "Job parameter required"}),
                 400,
             )
 
@@ -1986,16 +1900,17 @@ def api_unlock_rotation(group_key):
         result = unlock_rotation(group_key=group_key, job=job)
 
         if result["success"]:
-            return jsonify({"status": "success", "message": result["message"]})
+            return json_response({"status": "success", "message": result["message"]})
         else:
-            return jsonify({"status": "error", "message": result["message"]}), 404
+            return json_response({"status": "error", "message": result["message"]}), 404
 
     except Exception as e:
         app.logger.error(f"Error unlocking rotation: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/locked_seaman_codes", methods=["GET"])
+@conditional_get("locked_rotations")
 def api_get_locked_seaman_codes():
     """Get all locked seaman codes for filtering"""
     try:
@@ -2003,20 +1918,20 @@ def api_get_locked_seaman_codes():
 
         if not job:
             return (
-                jsonify({"status": "error", "message": "Job parameter required"}),
+                json_response({"status": "error", "message": "Job parameter required"}),
                 400,
             )
 
         # Fetch locked codes menggunakan fungsi di database.py
         locked_codes = get_all_locked_seaman_codes(job=job)
 
-        return jsonify(
+        return json_response(
             {"status": "success", "data": locked_codes, "count": len(locked_codes)}
         )
 
     except Exception as e:
         app.logger.error(f"Error fetching locked seaman codes: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/get_crew_to_relieve", methods=["GET"])
@@ -2032,7 +1947,7 @@ def api_get_crew_to_relieve():
 
         if not vessel_group or not job:
             return (
-                jsonify(
+                json_response(
                     {
                         "status": "error",
                         "message": "vessel_group and job parameters required",
@@ -2045,13 +1960,11 @@ def api_get_crew_to_relieve():
         # Split dan normalize vessel names
         vessel_list = [v.strip().upper() for v in vessel_group.split(",")]
 
-        # Fetch all seamen data (no job parameter)
-        df_seamen = get_seamen_as_data()
+        # Fetch seamen untuk job ini saja
+        df_seamen = get_seamen_as_data(where={"last_position": job})
 
-        # Filter by job and convert to dict
-        all_seamen = df_seamen[df_seamen["last_position"] == job].to_dict(
-            orient="records"
-        )
+        # Convert to dict
+        all_seamen = df_seamen.to_dict(orient="records")
 
         # Filter crew yang perlu diganti
         crew_to_relieve = []
@@ -2146,7 +2059,7 @@ def api_get_crew_to_relieve():
 
         crew_to_relieve.sort(key=sort_key)
 
-        return jsonify(
+        return json_response(
             {
                 "status": "success",
                 "data": crew_to_relieve,
@@ -2170,7 +2083,7 @@ def api_get_crew_to_relieve():
 
     except Exception as e:
         app.logger.error(f"Error fetching crew to relieve: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/get_available_replacements", methods=["GET"])
@@ -2189,13 +2102,13 @@ def api_get_available_replacements():
 
         if not job:
             return (
-                jsonify({"status": "error", "message": "job parameter required"}),
+                json_response({"status": "error", "message": "job parameter required"}),
                 400,
             )
 
         if not vessel_group:
             return (
-                jsonify(
+                json_response(
                     {"status": "error", "message": "vessel_group parameter required"}
                 ),
                 400,
@@ -2203,7 +2116,7 @@ def api_get_available_replacements():
 
         if not next_group_vessels_str:
             return (
-                jsonify(
+                json_response(
                     {
                         "status": "error",
                         "message": "next_group_vessels parameter required",
@@ -2219,14 +2132,18 @@ def api_get_available_replacements():
 
         if not next_group_vessels:
             return (
-                jsonify(
+                json_response(
                     {"status": "error", "message": "next_group_vessels cannot be empty"}
                 ),
                 400,
             )
 
-        # Fetch all seamen data
-        df_seamen = get_seamen_as_data()
+        # Fetch seamen untuk job ini (dan promotion_job jika dikirim)
+        positions = [job]
+        promotion_job = request.args.get("promotion_job", "").upper()
+        if promotion_job:
+            positions.append(promotion_job)
+        df_seamen = get_seamen_as_data(where={"last_position": positions})
 
         # Define available last_location values (status khusus)
         AVAILABLE_LAST_LOCATIONS = [
@@ -2298,7 +2215,6 @@ def api_get_available_replacements():
         # PART 2: Promotion Candidates (Optional - jika frontend kirim)
         # ============================================================
         promotion_vessels_str = request.args.get("promotion_vessels", "")
-        promotion_job = request.args.get("promotion_job", "").upper()
 
         if promotion_vessels_str and promotion_job:
             promotion_vessels = [
@@ -2394,7 +2310,7 @@ def api_get_available_replacements():
         # ============================================================
         # RESPONSE
         # ============================================================
-        return jsonify(
+        return json_response(
             {
                 "status": "success",
                 "data": available_replacements,
@@ -2425,7 +2341,7 @@ def api_get_available_replacements():
         import traceback
 
         traceback.print_exc()
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/submit_schedule_rotation", methods=["POST"])
@@ -2436,7 +2352,9 @@ def api_submit_schedule_rotation():
 
         if not data or "rotations" not in data:
             return (
-                jsonify({"status": "error", "message": "rotations data required"}),
+                json_response(
+                    {"status": "error", "message": "rotations data required"}
+                ),
                 400,
             )
 
@@ -2449,7 +2367,9 @@ def api_submit_schedule_rotation():
         # Validate rotations
         if not rotations:
             return (
-                jsonify({"status": "error", "message": "No rotation data provided"}),
+                json_response(
+                    {"status": "error", "message": "No rotation data provided"}
+                ),
                 400,
             )
 
@@ -2495,7 +2415,7 @@ def api_submit_schedule_rotation():
             except Exception as e:
                 failed_rotations.append({"rotation": rotation, "reason": str(e)})
 
-        return jsonify(
+        return json_response(
             {
                 "status": "success",
                 "message": f"Successfully processed {len(processed_rotations)} rotations",
@@ -2512,7 +2432,7 @@ def api_submit_schedule_rotation():
 
     except Exception as e:
         app.logger.error(f"Error submitting schedule rotation: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/api/get_rotation_summary", methods=["GET"])
@@ -2524,7 +2444,7 @@ def api_get_rotation_summary():
 
         if not vessel_group or not job:
             return (
-                jsonify(
+                json_response(
                     {
                         "status": "error",
                         "message": "vessel_group and job parameters required",
@@ -2536,14 +2456,15 @@ def api_get_rotation_summary():
         # Parse vessel_group
         vessel_list = [v.strip().upper() for v in vessel_group.split(",")]
 
-        # Get crew data (no job parameter)
-        df_seamen = get_seamen_as_data()
-
-        # Filter by job and convert to dict
-        all_seamen = df_seamen[df_seamen["last_position"] == job].to_dict(
-            orient="records"
+        # Get crew data untuk job ini saja
+        df_seamen = get_seamen_as_data(
+            columns=["last_location", "status", "day_remains"],
+            where={"last_position": job},
         )
 
+        # Convert to dict
+        all_seamen = df_seamen.to_dict(orient="records")
+
         total_crew = 0
         needs_relief_30 = 0
         needs_relief_60 = 0
@@ -2573,7 +2494,7 @@ def api_get_rotation_summary():
                 except (ValueError, TypeError):
                     pass
 
-        return jsonify(
+        return json_response(
             {
                 "status": "success",
                 "data": {
@@ -2600,7 +2521,7 @@ def api_get_rotation_summary():
 
     except Exception as e:
         app.logger.error(f"Error fetching rotation summary: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 
 # ============================================================================
@@ -2609,29 +2530,31 @@ def api_get_rotation_summary():
 
 
 @app.route("/api/rotation-configs", methods=["GET"])
+@conditional_get("rotation_configs")
 def api_get_rotation_configs():
     """GET - Ambil semua rotation configs"""
     try:
         rotation_type = request.args.get("type")  # Optional filter
         configs = get_rotation_configs(rotation_type)
-        return jsonify(configs), 200
+        return json_response(configs), 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route("/api/rotation-configs/<int:config_id>", methods=["GET"])
+@conditional_get("rotation_configs")
 def api_get_rotation_config(config_id):
     """GET - Ambil single rotation config by ID"""
     try:
         config = get_rotation_config_by_id(config_id)
 
         if config:
-            return jsonify(config), 200
+            return json_response(config), 200
         else:
-            return jsonify({"error": "Config not found"}), 404
+            return json_response({"error": "Config not found"}), 404
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route("/api/rotation-configs", methods=["POST"])
@@ -2644,7 +2567,7 @@ def api_create_rotation_config():
         required_fields = ["job_title", "vessel", "type", "part", "groups"]
         for field in required_fields:
             if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+                return json_response({"error": f"Missing required field: {field}"}), 400
 
         result = create_rotation_config(
             job_title=data["job_title"],
@@ -2654,12 +2577,12 @@ def api_create_rotation_config():
             groups=data["groups"],
         )
 
-        return jsonify(result), 201
+        return json_response(result), 201
 
     except ValueError as e:  # ✅ TAMBAHKAN INI - Handle validation errors
-        return jsonify({"error": str(e)}), 400
+        return json_response({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route("/api/rotation-configs/<int:config_id>", methods=["PUT"])
@@ -2672,7 +2595,7 @@ def api_update_rotation_config(config_id):
         required_fields = ["job_title", "vessel", "type", "part", "groups"]
         for field in required_fields:
             if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+                return json_response({"error": f"Missing required field: {field}"}), 400
 
         result = update_rotation_config(
             config_id=config_id,
@@ -2683,12 +2606,12 @@ def api_update_rotation_config(config_id):
             groups=data["groups"],
         )
 
-        return jsonify(result), 200
+        return json_response(result), 200
 
     except ValueError as e:  # ✅ TAMBAHKAN INI - Handle validation errors
-        return jsonify({"error": str(e)}), 400
+        return json_response({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route("/api/rotation-configs/<int:config_id>", methods=["DELETE"])
@@ -2698,17 +2621,57 @@ def api_delete_rotation_config(config_id):
         result = delete_rotation_config(config_id)
 
         if result["success"]:
-            return jsonify(result), 200
+            return json_response(result), 200
         else:
-            return jsonify(result), 404
+            return json_response(result), 404
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
+
+
+# ============================================================================
+# MONITORING ROUTES
+# ============================================================================
+
+
+@app.route("/api/pool-status", methods=["GET"])
+def api_get_pool_status():
+    """GET - Statistik connection pool database"""
+    try:
+        return json_response(get_pool_status()), 200
+    except Exception as e:
+        return json_response({"error": str(e)}), 500
+
+
+@app.route("/api/sync-locks", methods=["GET"])
+def api_get_sync_locks():
+    """GET - Pemegang lease sync per tabel (null jika tidak ada sync berjalan)"""
+    try:
+        return json_response(get_sync_lease_holders()), 200
+    except Exception as e:
+        return json_response({"error": str(e)}), 500
+
+
+@app.route("/api/sync-logs", methods=["GET"])
+def api_get_sync_logs():
+    """GET - Riwayat sync seamen/mutations beserta durasi per fase"""
+    try:
+        table_name = request.args.get("table")  # Optional filter
+        limit = min(request.args.get("limit", 50, type=int), 500)
+        return json_response(get_sync_logs(table_name, max(limit, 1))), 200
+    except Exception as e:
+        return json_response({"error": str(e)}), 500
 
 
 if __name__ == "__main__":
     port = 8048
     host = "0.0.0.0"
+
+    try:
+        export_sorted_seamen_csv()
+    except Exception as e:
+        print(f"WARNING - Failed to export sorted seamen CSV: {str(e)}")
+
     print(f"Flask app running on port {port}")
 
     app.run(debug=True, port=port, host=host)
@@ -0,0 +1,96 @@
+# Benchmark load mutations: to_sql per batch vs COPY FROM STDIN
+# Jalankan: python bench_mutations_copy.py --rows 200000
+#
+# Data diambil dari tabel mutations (diulang sampai jumlah --rows) lalu
+# di-load ke tabel sementara bench_mutations yang dihapus setelah selesai.
+# Tabel mutations sendiri tidak diubah.
+
+import argparse
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from database import (
+    MUTATIONS_BATCH_SIZE,
+    copy_dataframe,
+    engine,
+    insert_dataframe_batches,
+)
+
+BENCH_TABLE = "bench_mutations"
+
+
+def build_sample(rows):
+    """Ambil mutations dari database dan ulangi sampai sejumlah rows"""
+    with engine.connect() as conn:
+        df = pd.read_sql_query(
+            text("SELECT * FROM mutations LIMIT :rows"), conn, params={"rows": rows}
+        )
+
+    if df.empty:
+        raise Exception("Tabel mutations kosong, tidak ada data untuk benchmark")
+
+    repeat = (rows + len(df) - 1) // len(df)
+    return pd.concat([df] * repeat, ignore_index=True).iloc[:rows]
+
+
+def reset_bench_table(conn):
+    conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    conn.execute(text(f"CREATE TABLE {BENCH_TABLE} (LIKE mutations)"))
+    conn.commit()
+
+
+def run_insert(conn, df, batch_size):
+    insert_dataframe_batches(conn, df, BENCH_TABLE, batch_size)
+
+
+def run_copy(conn, df, batch_size):
+    copy_dataframe(conn, df, BENCH_TABLE)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load mutations")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=MUTATIONS_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = build_sample(args.rows)
+    print(f"Benchmark {len(df)} rows, {len(df.columns)} columns\n")
+
+    results = {}
+    try:
+        with engine.connect() as conn:
+            for name, run in [("insert", run_insert), ("copy", run_copy)]:
+                timings = []
+                for _ in range(args.repeat):
+                    reset_bench_table(conn)
+                    start = time.perf_counter()
+                    run(conn, df, args.batch_size)
+                    timings.append(time.perf_counter() - start)
+
+                    loaded = conn.execute(
+                        text(f"SELECT COUNT(*) FROM {BENCH_TABLE}")
+                    ).scalar()
+                    if loaded != len(df):
+                        raise Exception(f"{name}: loaded {loaded} of {len(df)} rows")
+
+                results[name] = min(timings)
+    finally:
+        with engine.connect() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+            conn.commit()
+
+    print("\n" + "=" * 60)
+    print(f"{'Method':<10} {'Best (s)':>10} {'Rows/s':>14}")
+    print("-" * 60)
+    for name, seconds in results.items():
+        print(f"{name:<10} {seconds:>10.2f} {len(df) / seconds:>14,.0f}")
+    print("-" * 60)
+    print(f"Speedup COPY vs INSERT: {results['insert'] / results['copy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Benchmark pemilihan top-k: sort_values + head vs top_k_positions
+# Jalankan: python bench_topk.py --crew 10000 100000
+#
+# Data crew dibangkitkan acak dengan kolom seperti snapshot seamen. Dua kasus
+# diukur: top 20 getRecommendation (rank_match lalu final_score) dan top 5
+# get_top_5_similar (similarity). Hasil kedua cara dicek harus identik.
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from model import top_k_positions
+
+CASES = [
+    ("recommendation", ["rank_match", "final_score"], 20),
+    ("top_5_similar", ["similarity"], 5),
+]
+
+
+def build_crew(rows, seed):
+    """DataFrame crew sintetis dengan skor seperti getRecommendation"""
+    rng = np.random.default_rng(seed)
+    # Skor dari sedikit kombinasi rank + certificate, jadi banyak nilai seri
+    similarity = rng.random(300).round(4)[rng.integers(0, 300, rows)]
+    df = pd.DataFrame(
+        {
+            "seamancode": 20000000 + np.arange(rows),
+            "seafarercode": (6200000000 + np.arange(rows)).astype(str),
+            "name": [f"SEAMAN {i}" for i in range(rows)],
+            "last_position": rng.choice(["NAKHODA", "MUALIM I", "KKM"], rows),
+            "last_location": rng.choice(["KM. LUZON", "KM. VERIZON"], rows),
+            "age": rng.integers(19, 60, rows),
+            "certificate": rng.choice(["ANT-I", "ATT-I", "ETO"], rows),
+            "phone_number_1": "-",
+            "phone_number_2": "-",
+            "phone_number_3": "-",
+            "phone_number_4": "-",
+            "day_remains": rng.integers(-30, 400, rows),
+            "rank_match": rng.integers(0, 2, rows),
+            "similarity": similarity,
+        }
+    )
+    df["final_score"] = 0.4 * df["similarity"] + 0.2 * df["rank_match"]
+    return df
+
+
+def run_sort(df, keys, k):
+    return df.sort_values(by=keys, ascending=[False] * len(keys)).head(k)
+
+
+def run_top_k(df, keys, k):
+    return df.iloc[top_k_positions([df[key] for key in keys], k)]
+
+
+def best_of(run, df, keys, k, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run(df, keys, k)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark top-k selection")
+    parser.add_argument("--crew", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.crew:
+        df = build_crew(rows, args.seed)
+        for name, keys, k in CASES:
+            sort_seconds, expected = best_of(run_sort, df, keys, k, args.repeat)
+            top_k_seconds, result = best_of(run_top_k, df, keys, k, args.repeat)
+            # Urutan seri sort_values satu kolom tidak stabil, bandingkan kuncinya
+            if (
+                not result[keys]
+                .reset_index(drop=True)
+                .equals(expected[keys].reset_index(drop=True))
+            ):
+                raise Exception(f"{name} ({rows} crew): top-k result differs")
+            results.append((rows, name, k, sort_seconds, top_k_seconds))
+
+    print("\n" + "=" * 72)
+    print(
+        f"{'Crew':>8} {'Case':<16} {'k':>3} {'Sort (ms)':>11} "
+        f"{'Top-k (ms)':>11} {'Speedup':>9}"
+    )
+    print("-" * 72)
+    for rows, name, k, sort_seconds, top_k_seconds in results:
+        print(
+            f"{rows:>8,} {name:<16} {k:>3} {sort_seconds * 1000:>11.2f} "
+            f"{top_k_seconds * 1000:>11.2f} {sort_seconds / top_k_seconds:>8.1f}x"
+        )
+    print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
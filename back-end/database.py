@@ -4,17 +4,40 @@
 # 2. Data Fetcher: Fungsi untuk Frontend fetch dari Supabase
 # 3. Orphaned Records Report: Track data yang di-drop karena tidak ada seamancode
 
+import hashlib
 import json
 import os
-from datetime import datetime
-
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import partial
+
+import numpy as np
 import pandas as pd
 import requests
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from requests.adapters import HTTPAdapter
+from sqlalchemy import bindparam, create_engine, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+from urllib3.util.retry import Retry
+
+try:
+    import pyarrow as pa
+except ImportError:  # Snapshot file dinonaktifkan, fallback ke database
+    pa = None
+
+try:
+    import ijson
+except ImportError:  # Payload upstream di-parse sekaligus dengan response.json()
+    ijson = None
 
 load_dotenv()
 
@@ -23,7 +46,97 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise Exception("DATABASE_URL not found in .env file")
 
-engine = create_engine(DATABASE_URL, poolclass=NullPool, echo=False)
+# Connection pool settings
+# DB_POOL_MODE=null untuk kembali ke NullPool (koneksi baru setiap connect)
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool yang mencatat waktu tunggu checkout untuk monitoring"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkout_count = 0
+        self.timeout_count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self.stats_lock:
+                self.timeout_count += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            with self.stats_lock:
+                self.checkout_count += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+
+def build_engine(database_url=DATABASE_URL):
+    """Buat SQLAlchemy engine sesuai DB_POOL_MODE"""
+    if DB_POOL_MODE == "null":
+        return create_engine(database_url, poolclass=NullPool, echo=False)
+
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=False,
+    )
+
+
+engine = build_engine()
+
+
+def get_pool_status():
+    """
+    Statistik connection pool untuk monitoring
+
+    Returns:
+        Dict berisi mode pool, jumlah koneksi checked-out/idle/overflow,
+        dan statistik waktu tunggu checkout (detik)
+    """
+    pool = engine.pool
+
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"mode": "null", "status": pool.status()}
+
+    with pool.stats_lock:
+        checkout_count = pool.checkout_count
+        total_wait = pool.total_wait
+        max_wait = pool.max_wait
+        timeout_count = pool.timeout_count
+
+    return {
+        "mode": "queue",
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_count": checkout_count,
+        "timeout_count": timeout_count,
+        "avg_wait_ms": (
+            round(total_wait / checkout_count * 1000, 3) if checkout_count else 0.0
+        ),
+        "max_wait_ms": round(max_wait * 1000, 3),
+        "status": pool.status(),
+    }
+
 
 print("=" * 60)
 print("SEAMEN & MUTATIONS SYNC + DATA FETCHER")
@@ -35,51 +148,493 @@ print("=" * 60)
 # ============================================================================
 
 
-def get_seamen_as_data():
+def get_seamen_as_data(columns=None, where=None):
     """
     Fetch data seamen dari Supabase Database
     Digunakan oleh app.py untuk melayani request frontend
+
+    Data diambil dari snapshot cache (lihat get_snapshot), query ulang ke
+    database hanya dilakukan setelah ada sync sukses yang baru.
+    Jangan mengubah nilai DataFrame secara in-place (.loc/.at/inplace=True)
+    karena data kolomnya dibagi dengan caller lain.
+
+    Args:
+        columns: Optional list kolom yang diambil (default semua kolom)
+        where: Optional dict {kolom: nilai} atau {kolom: [nilai, ...]},
+            semua kondisi digabung dengan AND
+
+    Jika columns/where diisi dan snapshot belum dimuat, filter dijalankan
+    sebagai query SQL berparameter sehingga hanya baris/kolom yang
+    dibutuhkan yang ditransfer dari database.
     """
     try:
-        query = "SELECT * FROM seamen"
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn)
-            print(f"DONE - Fetched {len(df)} seamen records from database")
-            return df
+        conditions = []
+        for column, value in (where or {}).items():
+            conditions.append((column, "in" if _is_value_list(value) else "=", value))
+
+        return _select_from_table("seamen", columns, conditions)
     except Exception as e:
         print(f"FAIL - Database Error: {str(e)}")
         raise Exception(f"Failed to fetch seamen data: {str(e)}")
 
 
-def get_mutations_as_data():
+def get_mutations_as_data(columns=None, since=None, seamancodes=None):
     """
     Fetch data mutations dari Supabase Database
     Digunakan oleh app.py untuk melayani request frontend
+
+    Sama seperti get_seamen_as_data: dilayani dari snapshot cache.
+
+    Args:
+        columns: Optional list kolom yang diambil (default semua kolom)
+        since: Optional datetime, hanya mutations dengan transactiondate >= since
+        seamancodes: Optional list seamancode yang diambil mutations-nya
     """
     try:
-        query = "SELECT * FROM mutations"
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn)
-            print(f"DONE - Fetched {len(df)} mutation records from database")
-            return df
+        conditions = []
+        if since is not None:
+            conditions.append(("transactiondate", ">=", since))
+        if seamancodes is not None:
+            conditions.append(("seamancode", "in", seamancodes))
+
+        return _select_from_table("mutations", columns, conditions)
     except Exception as e:
         print(f"FAIL - Database Error: {str(e)}")
         raise Exception(f"Failed to fetch mutations data: {str(e)}")
 
 
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _is_value_list(value):
+    return isinstance(value, (list, tuple, set, frozenset, pd.Index, pd.Series))
+
+
+def _to_python_value(value):
+    """Ubah numpy/pandas scalar menjadi tipe Python agar bisa dikirim sebagai parameter"""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _quote_identifier(name):
+    if not _IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid column name: '{name}'")
+    return f'"{name}"'
+
+
+def _select_from_table(table_name, columns, conditions):
+    """
+    Ambil data tabel dengan projection (columns) dan predicate (conditions)
+
+    conditions adalah list tuple (kolom, operator, nilai) dengan operator
+    "=", ">=" atau "in". Jika snapshot tabel sudah dimuat, filter dijalankan
+    di memory; jika belum, dibuat query SQL berparameter.
+    """
+    if not columns and not conditions:
+        # Snapshot dibagi ke semua caller, shallow copy supaya penambahan
+        # kolom di caller tidak mengubah snapshot
+        return get_snapshot(table_name).copy(deep=False)
+
+    snapshot = get_snapshot(table_name, load=False)
+    if snapshot is not None:
+        if table_name == "seamen":
+            seamen_index = get_seamen_index()
+            if all(op != ">=" for _, op, _ in conditions) and seamen_index.can_filter(
+                [column for column, _, _ in conditions]
+            ):
+                return seamen_index.select(conditions, columns)
+        return _filter_dataframe(snapshot, columns, conditions)
+
+    select_list = ", ".join(_quote_identifier(c) for c in columns) if columns else "*"
+    clauses = []
+    params = {}
+    expanding = []
+
+    for idx, (column, operator, value) in enumerate(conditions):
+        param = f"p{idx}"
+        if operator == "in":
+            clauses.append(f"{_quote_identifier(column)} IN :{param}")
+            params[param] = [_to_python_value(v) for v in value]
+            expanding.append(param)
+        else:
+            clauses.append(f"{_quote_identifier(column)} {operator} :{param}")
+            params[param] = _to_python_value(value)
+
+    query = f"SELECT {select_list} FROM {table_name}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+
+    statement = text(query)
+    if expanding:
+        statement = statement.bindparams(
+            *[bindparam(name, expanding=True) for name in expanding]
+        )
+
+    with engine.connect() as conn:
+        df = pd.read_sql_query(statement, conn, params=params)
+
+    print(f"DONE - Fetched {len(df)} {table_name} records from database (filtered)")
+    return df
+
+
+def _filter_dataframe(df, columns, conditions):
+    """Versi in-memory dari _select_from_table untuk snapshot yang sudah dimuat"""
+    mask = pd.Series(True, index=df.index)
+
+    for column, operator, value in conditions:
+        series = df[column]
+        if operator == "in":
+            mask &= series.isin(list(value))
+        elif operator == "=":
+            mask &= series == value
+        else:
+            series = pd.to_datetime(series, errors="coerce")
+            bound = pd.Timestamp(value)
+            if series.dt.tz is not None and bound.tzinfo is None:
+                bound = bound.tz_localize(series.dt.tz)
+            elif series.dt.tz is None and bound.tzinfo is not None:
+                bound = bound.tz_convert(None)
+            mask &= series >= bound
+
+    result = df[mask]
+    if columns:
+        result = result[list(columns)]
+    return result.reset_index(drop=True)
+
+
+# ============================================================================
+# BAGIAN 1A: SNAPSHOT CACHE (Versi data mengikuti sync_logs)
+# ============================================================================
+
+# Interval (detik) antar pengecekan versi ke sync_logs
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_CHECK_INTERVAL", "30"))
+
+SNAPSHOT_TABLES = ["seamen", "mutations"]
+
+# Folder snapshot Arrow (dipakai bersama oleh scheduler dan semua worker API)
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "snapshots")),
+)
+
+_snapshots = {}
+_snapshot_locks = {table: threading.Lock() for table in SNAPSHOT_TABLES}
+
+
+def get_data_version(table_name):
+    """
+    Ambil versi data sebuah tabel, yaitu sync_timestamp terakhir yang sukses
+
+    Returns:
+        datetime atau None jika belum pernah ada sync sukses
+    """
+    query = """
+        SELECT MAX(sync_timestamp)
+        FROM sync_logs
+        WHERE table_name = :table_name AND status = 'success'
+    """
+    with engine.connect() as conn:
+        return conn.execute(text(query), {"table_name": table_name}).scalar()
+
+
+def get_snapshot_path(table_name):
+    """Path file snapshot Arrow untuk table_name"""
+    return os.path.join(SNAPSHOT_DIR, f"{table_name}.arrow")
+
+
+def write_snapshot_file(table_name, df, version):
+    """
+    Tulis DataFrame ke file Arrow IPC (tanpa kompresi) beserta versinya
+
+    File ditulis ke file sementara lalu di-rename, sehingga worker lain
+    tidak pernah membaca file yang setengah jadi.
+
+    Returns:
+        True jika berhasil, False jika gagal atau pyarrow tidak tersedia
+    """
+    if pa is None:
+        return False
+
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"snapshot_version"] = str(version).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        path = get_snapshot_path(table_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        print(f"DONE - Wrote {table_name} snapshot file (version: {version})")
+        return True
+
+    except Exception as e:
+        print(f"WARNING - Failed to write {table_name} snapshot file: {str(e)}")
+        return False
+
+
+def read_snapshot_file(table_name, version=None):
+    """
+    Baca file snapshot Arrow dengan memory mapping
+
+    Args:
+        table_name: 'seamen' atau 'mutations'
+        version: Versi yang diharapkan; None berarti terima versi apa pun
+
+    Returns:
+        Tuple (DataFrame, versi di file) atau (None, None) jika file tidak
+        ada, versinya berbeda, atau pyarrow tidak tersedia
+    """
+    path = get_snapshot_path(table_name)
+    if pa is None or not os.path.exists(path):
+        return None, None
+
+    try:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        file_version = (table.schema.metadata or {}).get(b"snapshot_version")
+        file_version = file_version.decode() if file_version else None
+        if version is not None and file_version != str(version):
+            return None, None
+
+        return table.to_pandas(split_blocks=True), file_version
+
+    except Exception as e:
+        print(f"WARNING - Failed to read {table_name} snapshot file: {str(e)}")
+        return None, None
+
+
+def publish_snapshot_file(table_name):
+    """
+    Tulis ulang file snapshot dari isi tabel setelah sync sukses
+
+    Data dibaca kembali dari database agar dtype sama persis dengan yang
+    dimuat oleh API.
+    """
+    if pa is None:
+        print("WARNING - pyarrow not installed, skipping snapshot file")
+        return False
+
+    try:
+        version = get_data_version(table_name)
+        with engine.connect() as conn:
+            df = pd.read_sql_query(text(f"SELECT * FROM {table_name}"), conn)
+        return write_snapshot_file(table_name, df, version)
+
+    except Exception as e:
+        print(f"WARNING - Failed to publish {table_name} snapshot file: {str(e)}")
+        return False
+
+
+def _get_snapshot_entry(table_name, load=True):
+    """
+    Ambil snapshot (DataFrame beserta versinya) untuk table_name
+
+    Snapshot hanya di-rebuild jika versi di sync_logs berubah. Pengecekan
+    versi dibatasi sekali per SNAPSHOT_CHECK_INTERVAL detik, sehingga
+    request di antaranya murni bekerja di memory. Saat rebuild, file
+    snapshot Arrow dipakai lebih dulu jika versinya cocok; query ke
+    database hanya dilakukan jika file tidak ada atau sudah kedaluwarsa.
+
+    Args:
+        table_name: 'seamen' atau 'mutations'
+        load: Jika False, kembalikan None (bukan query ke database) saat
+            snapshot belum ada atau sudah kedaluwarsa
+
+    Returns:
+        Dict version dan data (DataFrame yang sama untuk semua caller, jangan
+        diubah in-place), atau None jika load=False dan snapshot tidak ada
+    """
+    if table_name not in _snapshot_locks:
+        raise ValueError(f"Snapshot tidak tersedia untuk tabel '{table_name}'")
+
+    with _snapshot_locks[table_name]:
+        entry = _snapshots.get(table_name)
+        now = time.monotonic()
+
+        if entry and now - entry["checked_at"] < SNAPSHOT_CHECK_INTERVAL:
+            return entry
+
+        if not entry and not load:
+            return None
+
+        version_failed = False
+        try:
+            version = get_data_version(table_name)
+        except Exception as e:
+            # Tanpa versi, snapshot dianggap kedaluwarsa setiap interval
+            print(f"WARNING - Failed to read {table_name} sync version: {str(e)}")
+            version = None
+            version_failed = True
+
+        if entry and version is not None and entry["version"] == version:
+            entry["checked_at"] = now
+            return entry
+
+        if not load:
+            return None
+
+        df = None
+        source = "snapshot file"
+        if version is not None:
+            df, _ = read_snapshot_file(table_name, version)
+        elif version_failed and not entry:
+            # Database tidak bisa dihubungi saat start, pakai file versi terakhir
+            df, file_version = read_snapshot_file(table_name)
+            source = f"snapshot file (unverified, file version: {file_version})"
+
+        if df is None:
+            with engine.connect() as conn:
+                df = pd.read_sql_query(text(f"SELECT * FROM {table_name}"), conn)
+            source = "database"
+            if version is not None:
+                write_snapshot_file(table_name, df, version)
+
+        entry = {"version": version, "data": df, "checked_at": now}
+        _snapshots[table_name] = entry
+        print(
+            f"DONE - Loaded {len(df)} {table_name} records into snapshot "
+            f"from {source} (version: {version})"
+        )
+        return entry
+
+
+def get_snapshot(table_name, load=True):
+    """
+    Snapshot DataFrame untuk table_name (lihat _get_snapshot_entry)
+
+    Returns:
+        DataFrame yang sama untuk semua caller (jangan diubah in-place), atau
+        None jika load=False dan snapshot belum ada/kedaluwarsa
+    """
+    entry = _get_snapshot_entry(table_name, load)
+    return entry["data"] if entry else None
+
+
+def get_snapshot_version(table_name):
+    """Versi snapshot yang sedang dipakai (dimuat dulu jika belum ada)"""
+    return _get_snapshot_entry(table_name)["version"]
+
+
+def invalidate_snapshot_cache(table_name=None):
+    """Paksa snapshot dimuat ulang pada pemanggilan berikutnya"""
+    tables = [table_name] if table_name else SNAPSHOT_TABLES
+    for table in tables:
+        with _snapshot_locks[table]:
+            _snapshots.pop(table, None)
+
+
 # ============================================================================
 # BAGIAN 1B: ORPHANED RECORDS MANAGEMENT (Untuk Report Dropped Data)
 # ============================================================================
 
 
+# Folder laporan orphan (default di luar folder back-end: ../data/reports)
+REPORTS_DIR = os.getenv(
+    "REPORTS_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "reports")),
+)
+
+# Semua orphan yang sudah pernah dilaporkan (seamancode, seamanname,
+# mutation_count). Laporan baru hanya berisi orphan di luar daftar ini.
+ORPHAN_KNOWN_FILE = os.path.join(REPORTS_DIR, "orphaned_mutations_known.csv")
+
+ORPHAN_COLUMNS = ["seamancode", "seamanname", "mutation_count"]
+
+
+def find_orphaned_mutations(df, valid_seamancodes):
+    """
+    Anti-join mutations terhadap seamancode yang valid dalam satu pass
+
+    Args:
+        df: DataFrame mutations (seamancode sudah integer)
+        valid_seamancodes: Array seamancode dari tabel seamen
+
+    Returns:
+        Tuple (mutations valid, ringkasan orphan per seamancode/seamanname,
+        jumlah baris orphan)
+    """
+    is_orphan = ~df["seamancode"].isin(valid_seamancodes).to_numpy()
+    orphan_count = int(is_orphan.sum())
+
+    if not orphan_count:
+        return df, pd.DataFrame(columns=ORPHAN_COLUMNS), 0
+
+    summary = (
+        df.loc[is_orphan]
+        .groupby(["seamancode", "seamanname"], dropna=False)
+        .size()
+        .reset_index(name="mutation_count")
+    )
+    return df.loc[~is_orphan], summary, orphan_count
+
+
+def select_new_orphans(summary, valid_seamancodes):
+    """
+    Orphan yang belum pernah dilaporkan (atau jumlah mutasinya bertambah)
+
+    Returns:
+        Tuple (orphan baru, daftar orphan yang sudah dilaporkan setelah
+        diperbarui). Daftar baru disimpan lewat save_known_orphans oleh
+        pemanggil setelah laporan tertulis dan sync ter-commit. Seamancode
+        yang sudah kembali ada di tabel seamen dihapus dari daftar.
+    """
+    if os.path.exists(ORPHAN_KNOWN_FILE):
+        known = pd.read_csv(ORPHAN_KNOWN_FILE)
+        known = known[~known["seamancode"].isin(valid_seamancodes)]
+    else:
+        known = pd.DataFrame(columns=ORPHAN_COLUMNS)
+
+    keys = ["seamancode", "seamanname"]
+    summary = summary.astype({"seamanname": str})
+    known = known.astype({"seamancode": np.int64, "seamanname": str})
+
+    merged = summary.merge(
+        known, on=keys, how="left", suffixes=("", "_known"), validate="one_to_one"
+    )
+    is_new = merged["mutation_count"] > merged["mutation_count_known"].fillna(0)
+
+    updated = (
+        pd.concat([known, summary], ignore_index=True)
+        .groupby(keys, as_index=False)["mutation_count"]
+        .max()
+    )
+    return summary.loc[is_new.to_numpy()], updated
+
+
+def save_known_orphans(known):
+    """
+    Simpan daftar orphan yang sudah dilaporkan ke ORPHAN_KNOWN_FILE (atomik)
+
+    Dipanggil setelah sync ter-commit, jadi kegagalan hanya dicatat: orphan
+    yang sama akan dilaporkan lagi pada sync berikutnya.
+    """
+    try:
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        temp_path = f"{ORPHAN_KNOWN_FILE}.tmp"
+        known.to_csv(temp_path, index=False)
+        os.replace(temp_path, ORPHAN_KNOWN_FILE)
+        return True
+    except Exception as e:
+        print(f"FAIL - Error saving known orphaned records: {str(e)}")
+        return False
+
+
 def save_orphaned_records_report(orphaned_records, deleted_count):
     """
     Simpan laporan orphaned mutation records ke file CSV dan TXT
     (Sama seperti migrate.py - hanya simpan ke file, tidak ke database)
 
     Args:
-        orphaned_records: List of tuples (seamancode, seamanname, mutation_count)
-        deleted_count: Total jumlah mutation records yang dihapus
+        orphaned_records: List of tuples (seamancode, seamanname, mutation_count),
+            hanya orphan baru sejak laporan sebelumnya (select_new_orphans)
+        deleted_count: Total jumlah mutation records milik orphaned_records
     """
     if not orphaned_records:
         print("INFO - No orphaned records to report")
@@ -87,9 +642,7 @@ def save_orphaned_records_report(orphaned_records, deleted_count):
 
     try:
         # Create reports directory if not exists (outside back-end folder)
-        reports_dir = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "..", "data", "reports")
-        )
+        reports_dir = REPORTS_DIR
         os.makedirs(reports_dir, exist_ok=True)
 
         # Generate timestamp
@@ -121,7 +674,8 @@ def save_orphaned_records_report(orphaned_records, deleted_count):
             f.write("SUMMARY\n")
             f.write("-" * 80 + "\n")
             f.write(f"Total seamen with orphaned records: {len(orphaned_records)}\n")
-            f.write(f"Total orphaned mutation records: {deleted_count}\n\n")
+            f.write(f"Total orphaned mutation records: {deleted_count}\n")
+            f.write("Only seamen not listed in a previous report are included.\n\n")
             f.write("-" * 80 + "\n\n")
             f.write("DETAILED LIST\n")
             f.write("-" * 80 + "\n")
@@ -345,166 +899,1969 @@ def get_all_locked_seaman_codes(job):
         raise Exception(f"Failed to fetch locked seaman codes: {str(e)}")
 
 
+def get_locked_rotations_version():
+    """
+    Versi data locked rotations (berubah setiap lock/unlock)
+
+    Returns:
+        String gabungan jumlah baris dan waktu lock/unlock terakhir
+    """
+    query = """
+        SELECT COUNT(*), MAX(locked_at), MAX(unlocked_at)
+        FROM locked_rotation_schedules
+    """
+    with engine.connect() as conn:
+        count, locked_at, unlocked_at = conn.execute(text(query)).one()
+    return f"{count}:{locked_at}:{unlocked_at}"
+
+
 # ============================================================================
-# BAGIAN 2: FETCH DATA DARI API ASLI (Untuk Scheduler)
+# BAGIAN 1D: SEAMEN INDEX (Lookup cepat di atas snapshot seamen)
 # ============================================================================
 
 
-def fetch_seamen_from_original_api():
-    """Fetch data seamen dari API URL ASLI"""
-    print(f"START - [{datetime.now()}] Starting seamen sync from ORIGINAL API...")
+class SeamenIndex:
+    """
+    Hash index di atas satu versi snapshot seamen
 
-    try:
-        url = "http://nanika.spil.co.id:3021/get-seamen"
-        payload = json.dumps(
-            {
-                "age": 0,
-                "status": "",
-                "education": "",
-                "experience": "",
-                "certificate": "",
-                "last_location": "",
-                "last_position": "",
-            }
-        )
-        headers = {"Content-Type": "application/json"}
+    seamancode -> posisi baris, dan last_position/last_location/status ->
+    array posisi baris. Lookup dan filter equality menjadi O(1)/O(k)
+    dibanding boolean mask O(n) di seluruh DataFrame.
+    """
 
-        response = requests.get(url, headers=headers, data=payload, timeout=30)
+    INDEXED_COLUMNS = ["last_position", "last_location", "status"]
 
-        if response.status_code == 200:
-            response_dict = response.json()
-            data_seamen = response_dict.get("data_seamen", [])
+    def __init__(self, df, version=None):
+        self.data = df
+        # Versi snapshot asal df (pasangan data dan versi selalu konsisten)
+        self.version = version
 
-            if data_seamen:
-                df = pd.DataFrame(data_seamen)
-                print(f"DONE - Fetched {len(df)} seamen records from ORIGINAL API")
-                return df
-            else:
-                print("WARNING - ORIGINAL API returned empty data")
+        # Jika seamancode duplikat, baris pertama yang dipakai (sama seperti .iloc[0])
+        codes = df["seamancode"]
+        first = ~codes.duplicated()
+        self._code_rows = dict(zip(codes[first], np.flatnonzero(first.to_numpy())))
+
+        self._column_rows = {
+            column: df.groupby(column, sort=False).indices
+            for column in self.INDEXED_COLUMNS
+            if column in df.columns
+        }
+
+    def can_filter(self, columns):
+        """True jika semua kolom bisa difilter lewat index"""
+        return all(
+            column == "seamancode" or column in self._column_rows for column in columns
+        )
+
+    def position(self, seamancode):
+        """Posisi baris seamancode, atau None jika tidak ada"""
+        position = self._code_rows.get(seamancode)
+        if position is None and not isinstance(seamancode, (int, np.integer)):
+            try:
+                position = self._code_rows.get(int(seamancode))
+            except (TypeError, ValueError):
                 return None
-        else:
-            print(f"FAIL - ORIGINAL API returned status code {response.status_code}")
-            return None
+        return position
+
+    def row(self, seamancode):
+        """Baris seamen (Series) untuk seamancode, atau None jika tidak ada"""
+        position = self.position(seamancode)
+        return None if position is None else self.data.iloc[position]
+
+    def positions(self, column, values):
+        """Array posisi baris (urut) dengan column bernilai salah satu values"""
+        if column == "seamancode":
+            found = (self.position(value) for value in values)
+            return np.unique([p for p in found if p is not None]).astype(np.intp)
+
+        rows = self._column_rows[column]
+        parts = [rows[value] for value in values if value in rows]
+        if not parts:
+            return np.array([], dtype=np.intp)
+        return np.unique(np.concatenate(parts))
+
+    def match(self, conditions):
+        """
+        Posisi baris (urut) yang memenuhi semua conditions
+
+        Returns:
+            Array posisi, atau None jika conditions kosong (semua baris)
+        """
+        result = None
+        for column, operator, value in conditions:
+            values = list(value) if operator == "in" else [value]
+            found = self.positions(column, values)
+            result = found if result is None else np.intersect1d(result, found)
+        return result
+
+    def select(self, conditions, columns=None):
+        """
+        Filter equality/IN lewat index
+
+        Args:
+            conditions: List tuple (kolom, operator, nilai) dengan operator
+                "=" atau "in", digabung dengan AND
+            columns: Optional list kolom yang diambil
+        """
+        result = self.match(conditions)
+        df = self.data if result is None else self.data.iloc[result]
+        if columns:
+            df = df[list(columns)]
+        return df.reset_index(drop=True)
+
+
+_seamen_index = None
+_seamen_index_lock = threading.Lock()
+
+
+def get_seamen_index():
+    """
+    SeamenIndex untuk snapshot seamen saat ini
+
+    Index dibangun sekali per versi snapshot dan dipakai bersama oleh
+    semua request.
+    """
+    global _seamen_index
+
+    entry = _get_snapshot_entry("seamen")
+    with _seamen_index_lock:
+        if _seamen_index is None or _seamen_index.data is not entry["data"]:
+            _seamen_index = SeamenIndex(entry["data"], entry["version"])
+        return _seamen_index
+
+
+# ============================================================================
+# BAGIAN 1E: MUTATION STORE (Riwayat mutations per seaman, format CSR)
+# ============================================================================
+
+
+def _to_utc_ns(value):
+    """Datetime (naive dianggap UTC) menjadi int64 nanodetik UTC"""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC").value
+
+
+class MutationStore:
+    """
+    Mutations tersusun per seaman, urut (seamancode, transactiondate)
+
+    Mutations milik codes[i] ada di baris offsets[i]:offsets[i + 1], jadi
+    riwayat satu seaman cukup berupa slice. transactiondate disimpan sebagai
+    int64 nanodetik UTC dengan NaT diletakkan paling akhir (tidak pernah lolos
+    filter "before"), dan nama kapal sebagai id integer ke vessels (-1 = kosong).
+    """
+
+    NAT_LAST = np.iinfo(np.int64).max
+
+    def __init__(self, df):
+        self.source = df
+        n = len(df)
+
+        dates = pd.to_datetime(df["transactiondate"], errors="coerce", utc=True)
+        dates = dates.dt.tz_convert(None).astype("datetime64[ns]").to_numpy()
+        missing = np.isnat(dates)
+        dates = dates.view(np.int64).copy()
+        dates[missing] = self.NAT_LAST
+
+        codes = df["seamancode"].to_numpy()
+        order = np.lexsort((dates, codes))
+
+        self.codes, starts = np.unique(codes[order], return_index=True)
+        self.offsets = np.append(starts, n)
+        self.dates = dates[order]
+
+        vessel_ids, vessels = pd.factorize(
+            pd.concat([df["fromvesselname"], df["tovesselname"]], ignore_index=True)
+        )
+        self.vessels = np.asarray(vessels, dtype=object)
+        self.from_vessel = vessel_ids[:n][order]
+        self.to_vessel = vessel_ids[n:][order]
+        self._vessel_ids = {name: idx for idx, name in enumerate(self.vessels)}
+
+    def history_slice(self, seamancode):
+        """Slice baris mutations milik seamancode (kosong jika tidak ada)"""
+        positions = self._positions([seamancode])
+        if len(positions) == 0:
+            return slice(0, 0)
+        return slice(self.offsets[positions[0]], self.offsets[positions[0] + 1])
+
+    def codes_with_history(self, seamancodes, before=None):
+        """
+        Seamancode yang punya mutations (dengan transactiondate <= before
+        jika diisi)
+        """
+        positions = self._positions(seamancodes)
+        if before is not None:
+            # Baris pertama tiap seaman adalah transactiondate paling awal
+            earliest = self.dates[self.offsets[positions]]
+            positions = positions[earliest <= _to_utc_ns(before)]
+        return self.codes[positions]
+
+    def codes_with_vessels(self, seamancodes, vessel_names, min_count=1, before=None):
+        """
+        Seamancode yang pernah di minimal min_count kapal berbeda dari
+        vessel_names (dicek di tovesselname lalu fromvesselname)
+        """
+        positions = self._positions(seamancodes)
+        owner, rows = self._gather(positions, before)
+        required = self._ids(vessel_names)
+
+        to_ids = self.to_vessel[rows]
+        from_ids = self.from_vessel[rows]
+        vessel = np.where(
+            np.isin(to_ids, required),
+            to_ids,
+            np.where(np.isin(from_ids, required), from_ids, -1),
+        )
+
+        keep = vessel >= 0
+        width = max(len(self.vessels), 1)
+        pairs = np.unique(owner[keep] * width + vessel[keep])
+        counts = np.bincount(pairs // width, minlength=len(positions))
+        return self.codes[positions[counts >= min_count]]
+
+    def count_visits(self, seamancodes, vessel_names):
+        """Jumlah baris mutations per seaman dengan fromvesselname di vessel_names"""
+        positions = self._positions(seamancodes)
+        owner, rows = self._gather(positions)
+        hits = np.isin(self.from_vessel[rows], self._ids(vessel_names))
+        counts = np.bincount(owner[hits], minlength=len(positions))
+        return dict(zip(self.codes[positions].tolist(), counts.tolist()))
+
+    def vessel_history(self, seamancodes, before=None, exclude=(), unique=True):
+        """
+        Riwayat fromvesselname per seaman, urut transactiondate
+
+        Args:
+            seamancodes: Seamancode yang diambil
+            before: Optional datetime, hanya mutations dengan transactiondate <= before
+            exclude: Nama kapal/status yang tidak dimasukkan ke riwayat
+            unique: Jika True, hanya kemunculan pertama tiap kapal yang disimpan
+
+        Returns:
+            Dict {seamancode: [nama kapal, ...]} urut seamancode, untuk setiap
+            seaman yang punya minimal satu mutations yang lolos filter before
+        """
+        positions = self._positions(seamancodes)
+        owner, rows = self._gather(positions, before)
+        present = np.unique(owner)
+
+        vessel = self.from_vessel[rows]
+        keep = (vessel >= 0) & ~np.isin(vessel, self._ids(exclude))
+        owner, vessel = owner[keep], vessel[keep]
+
+        if unique:
+            width = max(len(self.vessels), 1)
+            _, first = np.unique(owner * width + vessel, return_index=True)
+            first.sort()
+            owner, vessel = owner[first], vessel[first]
+
+        names = self.vessels[vessel]
+        starts = np.searchsorted(owner, present)
+        ends = np.searchsorted(owner, present, side="right")
+        codes = self.codes[positions[present]].tolist()
+        return {
+            code: names[start:end].tolist()
+            for code, start, end in zip(codes, starts, ends)
+        }
+
+    def _ids(self, vessel_names):
+        ids = [
+            self._vessel_ids[name] for name in vessel_names if name in self._vessel_ids
+        ]
+        return np.array(ids, dtype=np.intp)
+
+    def _positions(self, seamancodes):
+        """Posisi (urut, unik) di self.codes untuk seamancodes yang punya mutations"""
+        values = np.unique(np.asarray(list(seamancodes), dtype=self.codes.dtype))
+        if len(self.codes) == 0 or len(values) == 0:
+            return np.array([], dtype=np.intp)
+        positions = np.searchsorted(self.codes, values)
+        found = positions < len(self.codes)
+        found[found] = self.codes[positions[found]] == values[found]
+        return positions[found]
+
+    def _gather(self, positions, before=None):
+        """
+        Semua baris milik positions
+
+        Returns:
+            Tuple (owner, rows): owner adalah indeks ke positions untuk tiap
+            baris, urut owner lalu transactiondate
+        """
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+        owner = np.repeat(np.arange(len(positions)), lengths)
+        rows = np.arange(lengths.sum()) + np.repeat(
+            starts - (np.cumsum(lengths) - lengths), lengths
+        )
+        if before is not None:
+            keep = self.dates[rows] <= _to_utc_ns(before)
+            owner, rows = owner[keep], rows[keep]
+        return owner, rows
+
+
+_mutation_store = None
+_mutation_store_lock = threading.Lock()
+
+
+def get_mutation_store():
+    """
+    MutationStore untuk snapshot mutations saat ini
+
+    Dibangun sekali per versi snapshot dan dipakai bersama oleh semua request.
+    """
+    global _mutation_store
+
+    snapshot = get_snapshot("mutations")
+    with _mutation_store_lock:
+        if _mutation_store is None or _mutation_store.source is not snapshot:
+            _mutation_store = MutationStore(snapshot)
+        return _mutation_store
+
+
+# ============================================================================
+# BAGIAN 2: FETCH DATA DARI API ASLI (Untuk Scheduler)
+# ============================================================================
+
+
+# Base URL API asli (fake_upstream.py bisa dipakai sebagai pengganti lokal)
+UPSTREAM_API_URL = os.getenv(
+    "UPSTREAM_API_URL", "http://nanika.spil.co.id:3021"
+).rstrip("/")
+
+# Session HTTP bersama untuk semua request ke API asli: koneksi keep-alive
+# dipakai ulang antar chunk/dataset, error transient di-retry dengan backoff
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "3"))
+UPSTREAM_BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", "1"))
+
+_upstream_session = None
+_upstream_session_lock = threading.Lock()
+
+
+def get_upstream_session():
+    """Session requests bersama dengan retry untuk API asli"""
+    global _upstream_session
+
+    with _upstream_session_lock:
+        if _upstream_session is None:
+            retry = Retry(
+                total=UPSTREAM_RETRIES,
+                backoff_factor=UPSTREAM_BACKOFF,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry, pool_maxsize=MUTATIONS_FETCH_WORKERS + 1
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _upstream_session = session
+
+        return _upstream_session
+
+
+# Parsing payload upstream secara streaming (ijson): record dibaca bertahap
+# dari body response dan dikonversi per chunk, tanpa menyimpan seluruh JSON,
+# list dict dan DataFrame mentah sekaligus di memori
+FETCH_STREAMING = os.getenv("FETCH_STREAMING", "true").lower() == "true"
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "10000"))
+
+SEAMEN_DATE_COLUMNS = ["start_date", "end_date"]
+
+
+def convert_seamen_columns(df):
+    """Konversi kolom tanggal seamen dari DD/MM/YYYY ke datetime"""
+    for col in SEAMEN_DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y", errors="coerce")
+    return df
+
+
+def convert_mutation_columns(df):
+    """Konversi seamancode ke integer dan transactiondate ke datetime"""
+    if "seamancode" in df.columns:
+        df["seamancode"] = (
+            pd.to_numeric(df["seamancode"], errors="coerce").fillna(0).astype(int)
+        )
+    if "transactiondate" in df.columns:
+        df["transactiondate"] = pd.to_datetime(df["transactiondate"], errors="coerce")
+    return df
+
+
+def iter_record_chunks(response, key, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield list record dari array response[key] per chunk_rows"""
+    response.raw.decode_content = True
+    records = ijson.items(response.raw, f"{key}.item", use_float=True)
+
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_records_frame(response, key, convert):
+    """
+    DataFrame bertipe dari array response[key]
+
+    Dengan streaming, setiap chunk langsung dikonversi (convert) sehingga
+    yang tertahan di memori hanya data bertipe ditambah satu chunk mentah.
+
+    Args:
+        response: Response requests (dibuat dengan stream=True)
+        key: Nama array di payload (data_seamen / data_mutation)
+        convert: Fungsi konversi kolom DataFrame
+    """
+    if ijson is None or not FETCH_STREAMING:
+        records = response.json().get(key, [])
+        return convert(pd.DataFrame(records)) if records else pd.DataFrame()
+
+    frames = [
+        convert(pd.DataFrame(chunk)) for chunk in iter_record_chunks(response, key)
+    ]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _upstream_validators(response):
+    """ETag/Last-Modified dari response upstream (None jika tidak dikirim)"""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def fetch_seamen_from_original_api(validators=None, raise_errors=False):
+    """
+    Fetch data seamen dari API URL ASLI
+
+    Args:
+        validators: ETag/Last-Modified dari sync terakhir
+            (get_upstream_validators). Jika upstream membalas 304, hasilnya
+            DataFrame kosong dengan attrs["not_modified"] = True.
+        raise_errors: Lempar ulang error request/status (untuk run_with_retries)
+            alih-alih mengembalikan None. Payload kosong tetap None.
+    """
+    print(f"START - [{datetime.now()}] Starting seamen sync from ORIGINAL API...")
+
+    try:
+        url = f"{UPSTREAM_API_URL}/get-seamen"
+        payload = json.dumps(
+            {
+                "age": 0,
+                "status": "",
+                "education": "",
+                "experience": "",
+                "certificate": "",
+                "last_location": "",
+                "last_position": "",
+            }
+        )
+        headers = {"Content-Type": "application/json"}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = get_upstream_session().get(
+            url, headers=headers, data=payload, timeout=30, stream=True
+        )
+
+        with response:
+            if response.status_code == 304:
+                print("INFO - Seamen data not modified since last sync")
+                df = pd.DataFrame()
+                df.attrs["not_modified"] = True
+                return df
+
+            if response.status_code != 200:
+                raise Exception(
+                    f"ORIGINAL API returned status code {response.status_code}"
+                )
+
+            df = read_records_frame(response, "data_seamen", convert_seamen_columns)
+            df.attrs["upstream_validators"] = _upstream_validators(response)
+
+        if df.empty:
+            print("WARNING - ORIGINAL API returned empty data")
+            return None
+
+        print(f"DONE - Fetched {len(df)} seamen records from ORIGINAL API")
+        return df
+
+    except Exception as e:
+        print(f"FAIL - Error fetching from ORIGINAL API: {str(e)}")
+        if raise_errors:
+            raise
+        return None
+
+
+# Window fetch mutations: mulai dari watermark sync terakhir dikurangi overlap
+# (menangkap mutasi yang terlambat masuk / dikoreksi upstream)
+MUTATIONS_SYNC_MODE = os.getenv("MUTATIONS_SYNC_MODE", "incremental").lower()
+MUTATIONS_START_DATE = os.getenv("MUTATIONS_START_DATE", "01/01/2020")
+MUTATIONS_OVERLAP_DAYS = int(os.getenv("MUTATIONS_OVERLAP_DAYS", "7"))
+MUTATIONS_CHUNK_DAYS = int(os.getenv("MUTATIONS_CHUNK_DAYS", "90"))
+MUTATIONS_FETCH_WORKERS = int(os.getenv("MUTATIONS_FETCH_WORKERS", "4"))
+# Mode incremental tetap full sync jika full sync sukses terakhir lebih lama
+# dari ini (hari): memulihkan mutasi yang ter-cascade saat seaman sempat
+# hilang, orphan yang seamannya baru masuk, dan koreksi upstream di luar
+# overlap. 0 untuk mematikan.
+MUTATIONS_FULL_SYNC_DAYS = int(os.getenv("MUTATIONS_FULL_SYNC_DAYS", "7"))
+
+UPSTREAM_DATE_FORMAT = "%d/%m/%Y"
+
+
+def get_mutations_watermark():
+    """Watermark dari sync mutations sukses terakhir, atau None"""
+    with engine.connect() as conn:
+        ensure_sync_logs_columns(conn)
+        return conn.execute(
+            text(
+                """
+            SELECT MAX(watermark)
+            FROM sync_logs
+            WHERE table_name = 'mutations' AND status IN ('success', 'unchanged')
+        """
+            )
+        ).scalar()
+
+
+def get_last_full_mutations_sync():
+    """Waktu full sync mutations sukses terakhir, atau None"""
+    with engine.connect() as conn:
+        ensure_sync_logs_columns(conn)
+        return conn.execute(
+            text(
+                """
+            SELECT MAX(sync_timestamp)
+            FROM sync_logs
+            WHERE table_name = 'mutations' AND status IN ('success', 'unchanged')
+              AND sync_mode = 'full'
+        """
+            )
+        ).scalar()
+
+
+def mutations_full_sync_due():
+    """True jika full sync terakhir lebih lama dari MUTATIONS_FULL_SYNC_DAYS"""
+    if MUTATIONS_FULL_SYNC_DAYS <= 0:
+        return False
+
+    last_full = get_last_full_mutations_sync()
+    return last_full is None or datetime.now() - last_full >= timedelta(
+        days=MUTATIONS_FULL_SYNC_DAYS
+    )
+
+
+def get_mutations_window(mode=None):
+    """
+    Window tanggal fetch mutations
+
+    Args:
+        mode: "incremental" atau "full" (default: MUTATIONS_SYNC_MODE)
+
+    Returns:
+        Dict date_from, date_to (date, inklusif) dan incremental (bool).
+        Tanpa watermark, atau jika full sync sudah jatuh tempo
+        (mutations_full_sync_due), window dimulai dari MUTATIONS_START_DATE
+        (full).
+    """
+    mode = mode or MUTATIONS_SYNC_MODE
+    watermark = None
+    if mode == "incremental":
+        if mutations_full_sync_due():
+            print("INFO - Periodic full mutations sync due, reloading full history")
+        else:
+            watermark = get_mutations_watermark()
+
+    if watermark is None:
+        date_from = datetime.strptime(MUTATIONS_START_DATE, UPSTREAM_DATE_FORMAT)
+        date_from = date_from.date()
+    else:
+        date_from = watermark.date() - timedelta(days=MUTATIONS_OVERLAP_DAYS)
+
+    return {
+        "date_from": date_from,
+        "date_to": date.today(),
+        "incremental": watermark is not None,
+    }
+
+
+def split_date_range(date_from, date_to, chunk_days=MUTATIONS_CHUNK_DAYS):
+    """
+    Pecah rentang tanggal inklusif menjadi [(awal, akhir)] per chunk_days
+
+    Chunk inklusif dan tidak saling tumpang tindih; batas eksklusif ke upstream
+    dibentuk di fetch_mutations_chunk.
+    """
+    chunks = []
+    start = date_from
+    while start <= date_to:
+        end = min(start + timedelta(days=chunk_days - 1), date_to)
+        chunks.append((start, end))
+        start = end + timedelta(days=1)
+    return chunks
+
+
+def fetch_mutations_chunk(date_from, date_to):
+    """
+    Fetch mutations satu rentang tanggal inklusif [date_from, date_to]
+
+    transaction_date_2 upstream dianggap batas eksklusif, jadi yang dikirim
+    date_to + 1 hari. Jika upstream ternyata inklusif, hari tambahan itu hanya
+    tumpang tindih dengan chunk berikutnya dan dibuang lewat dedupe
+    mutationnoid, sehingga tidak ada hari di dalam rentang yang terlewat.
+
+    Returns:
+        DataFrame (kosong jika tidak ada data)
+    """
+    url = f"{UPSTREAM_API_URL}/get-mutation"
+    payload = json.dumps(
+        {
+            "seaman_name": "",
+            "transaction_date_1": date_from.strftime(UPSTREAM_DATE_FORMAT),
+            "transaction_date_2": (date_to + timedelta(days=1)).strftime(
+                UPSTREAM_DATE_FORMAT
+            ),
+            "from_rank_name": "",
+            "to_rank_name": "",
+            "from_vessel_code": "",
+            "to_vessel_code": "",
+            "jenis": "",
+        }
+    )
+    headers = {"Content-Type": "application/json"}
+
+    response = get_upstream_session().get(
+        url, headers=headers, data=payload, timeout=30, stream=True
+    )
+
+    with response:
+        if response.status_code != 200:
+            raise Exception(f"ORIGINAL API returned status code {response.status_code}")
+
+        return read_records_frame(response, "data_mutation", convert_mutation_columns)
+
+
+def fetch_mutations_from_original_api(date_from=None, date_to=None, raise_errors=False):
+    """
+    Fetch data mutations dari API URL ASLI
+
+    Rentang tanggal dipecah per MUTATIONS_CHUNK_DAYS dan di-fetch paralel.
+    Jika satu chunk gagal, seluruh fetch dianggap gagal supaya watermark
+    tidak melompati data yang belum terambil.
+
+    Args:
+        date_from, date_to: Rentang tanggal inklusif
+            (default: window dari get_mutations_window)
+        raise_errors: Lempar ulang error fetch (untuk run_with_retries)
+            alih-alih mengembalikan None
+
+    Returns:
+        DataFrame (bisa kosong jika tidak ada mutasi baru) atau None jika gagal
+    """
+    print(f"START - [{datetime.now()}] Starting mutations sync from ORIGINAL API...")
+
+    try:
+        if date_from is None or date_to is None:
+            window = get_mutations_window()
+            date_from, date_to = window["date_from"], window["date_to"]
+
+        chunks = split_date_range(date_from, date_to)
+        print(
+            f"FETCHING - {date_from:%d/%m/%Y} - {date_to:%d/%m/%Y} "
+            f"in {len(chunks)} chunks..."
+        )
+
+        with ThreadPoolExecutor(max_workers=MUTATIONS_FETCH_WORKERS) as executor:
+            frames = list(executor.map(lambda c: fetch_mutations_chunk(*c), chunks))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            print("INFO - ORIGINAL API returned no mutations in window")
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        if "mutationnoid" in df.columns:
+            df = df.drop_duplicates(subset="mutationnoid", keep="last")
+            df = df.reset_index(drop=True)
+
+        print(f"DONE - Fetched {len(df)} mutation records from ORIGINAL API")
+        return df
+
+    except Exception as e:
+        print(f"FAIL - Error fetching from ORIGINAL API: {str(e)}")
+        if raise_errors:
+            raise
+        return None
+
+
+# ============================================================================
+# BAGIAN 3: SYNC KE DATABASE (Untuk Scheduler)
+# ============================================================================
+
+
+# Tabel staging untuk full sync: data baru di-load ke <tabel>_staging lalu
+# ditukar dengan tabel asli dalam satu transaksi (rename), sehingga reader
+# tetap melihat data lama yang lengkap selama proses load
+STAGING_SUFFIX = "_staging"
+OLD_SUFFIX = "_old"
+
+# Swap dibatalkan jika staging < rasio ini dari jumlah baris tabel asli
+# (melindungi dari payload upstream yang terpotong)
+SYNC_MIN_ROW_RATIO = float(os.getenv("SYNC_MIN_ROW_RATIO", "0.5"))
+
+# Batas tunggu lock saat swap agar query reader tidak antre terlalu lama
+SWAP_LOCK_TIMEOUT = os.getenv("SWAP_LOCK_TIMEOUT", "10s")
+
+
+def create_staging_table(conn, table_name):
+    """
+    Buat ulang <table_name>_staging dengan kolom, default dan CHECK yang sama
+
+    Primary key, foreign key dan index dibuat setelah load
+    (build_staging_constraints) supaya load lebih cepat.
+
+    Returns:
+        Nama tabel staging
+    """
+    staging = f"{table_name}{STAGING_SUFFIX}"
+    conn.execute(text(f"DROP TABLE IF EXISTS {_quote_identifier(staging)}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {_quote_identifier(staging)} "
+            f"(LIKE {_quote_identifier(table_name)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    conn.commit()
+    return staging
+
+
+def _get_table_constraints(conn, table_name):
+    """Primary key, unique dan foreign key milik tabel: [(name, definition)]"""
+    rows = conn.execute(
+        text(
+            """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = CAST(:table_name AS regclass) AND contype IN ('p', 'u', 'f')
+        ORDER BY contype DESC, conname
+    """
+        ),
+        {"table_name": table_name},
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def _get_table_indexes(conn, table_name):
+    """Index tabel yang bukan bagian dari constraint: [(name, definition)]"""
+    rows = conn.execute(
+        text(
+            """
+        SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        WHERE ix.indrelid = CAST(:table_name AS regclass)
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c WHERE c.conindid = ix.indexrelid
+          )
+        ORDER BY i.relname
+    """
+        ),
+        {"table_name": table_name},
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def _get_referencing_foreign_keys(conn, table_name):
+    """
+    Foreign key dari tabel lain yang mengarah ke table_name
+
+    Returns:
+        List dict: name, table, definition, cascade, columns, ref_columns
+    """
+    rows = conn.execute(
+        text(
+            """
+        SELECT
+            con.conname,
+            con.conrelid::regclass::text,
+            pg_get_constraintdef(con.oid),
+            con.confdeltype = 'c',
+            ARRAY(
+                SELECT a.attname::text FROM unnest(con.conkey) WITH ORDINALITY k(attnum, n)
+                JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                ORDER BY k.n
+            ),
+            ARRAY(
+                SELECT a.attname::text FROM unnest(con.confkey) WITH ORDINALITY k(attnum, n)
+                JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+                ORDER BY k.n
+            )
+        FROM pg_constraint con
+        WHERE con.contype = 'f' AND con.confrelid = CAST(:table_name AS regclass)
+          AND con.conrelid <> con.confrelid
+    """
+        ),
+        {"table_name": table_name},
+    ).fetchall()
+    return [
+        {
+            "name": row[0],
+            "table": row[1],
+            "definition": row[2],
+            "cascade": row[3],
+            "columns": list(row[4]),
+            "ref_columns": list(row[5]),
+        }
+        for row in rows
+    ]
+
+
+def build_staging_constraints(conn, table_name):
+    """
+    Salin primary key, unique, foreign key dan index tabel asli ke staging
+
+    Nama di staging diberi akhiran STAGING_SUFFIX dan dikembalikan ke nama
+    asli saat swap.
+    """
+    staging = f"{table_name}{STAGING_SUFFIX}"
+
+    for name, definition in _get_table_constraints(conn, table_name):
+        conn.execute(
+            text(
+                f"ALTER TABLE {_quote_identifier(staging)} "
+                f"ADD CONSTRAINT {_quote_identifier(name + STAGING_SUFFIX)} {definition}"
+            )
+        )
+
+    for name, definition in _get_table_indexes(conn, table_name):
+        definition = re.sub(
+            r" INDEX \S+ ON (ONLY )?\S+ ",
+            f" INDEX {_quote_identifier(name + STAGING_SUFFIX)} "
+            f"ON {_quote_identifier(staging)} ",
+            definition,
+            count=1,
+        )
+        conn.execute(text(definition))
+
+    conn.commit()
+
+
+def check_min_row_ratio(source, rows, table_name, live_rows):
+    """
+    Tolak data pengganti yang jauh lebih kecil dari isi tabel
+
+    Melempar exception jika rows < SYNC_MIN_ROW_RATIO * live_rows (payload
+    upstream kemungkinan terpotong), sehingga transaksi pemanggil di-rollback.
+    """
+    if live_rows and rows < live_rows * SYNC_MIN_ROW_RATIO:
+        raise Exception(
+            f"{source} has {rows} rows, less than "
+            f"{SYNC_MIN_ROW_RATIO:.0%} of {live_rows} rows in {table_name}"
+        )
+
+
+def swap_staging_table(conn, table_name, expected_rows):
+    """
+    Tukar <table_name>_staging dengan tabel asli dalam transaksi conn
+
+    Jumlah baris staging divalidasi dulu. Foreign key dari tabel lain di-drop
+    lalu dibuat ulang ke tabel baru; untuk FK ON DELETE CASCADE baris yang
+    tidak punya pasangan lagi ikut dihapus (sama seperti DELETE lama).
+    Commit dilakukan pemanggil.
+    """
+    staging = f"{table_name}{STAGING_SUFFIX}"
+    old = f"{table_name}{OLD_SUFFIX}"
+
+    staged_rows = conn.execute(
+        text(f"SELECT COUNT(*) FROM {_quote_identifier(staging)}")
+    ).scalar()
+    if staged_rows != expected_rows:
+        raise Exception(
+            f"Staging {staging} has {staged_rows} rows, expected {expected_rows}"
+        )
+
+    live_rows = conn.execute(
+        text(f"SELECT COUNT(*) FROM {_quote_identifier(table_name)}")
+    ).scalar()
+    check_min_row_ratio(f"Staging {staging}", staged_rows, table_name, live_rows)
+
+    constraints = _get_table_constraints(conn, staging)
+    indexes = _get_table_indexes(conn, staging)
+    foreign_keys = _get_referencing_foreign_keys(conn, table_name)
+
+    print(f"Swapping {staging} -> {table_name} ({staged_rows} rows)...")
+    conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+
+    for fk in foreign_keys:
+        conn.execute(
+            text(
+                f"ALTER TABLE {fk['table']} DROP CONSTRAINT {_quote_identifier(fk['name'])}"
+            )
+        )
+
+    conn.execute(
+        text(
+            f"ALTER TABLE {_quote_identifier(table_name)} RENAME TO {_quote_identifier(old)}"
+        )
+    )
+    conn.execute(text(f"DROP TABLE {_quote_identifier(old)}"))
+    conn.execute(
+        text(
+            f"ALTER TABLE {_quote_identifier(staging)} RENAME TO {_quote_identifier(table_name)}"
+        )
+    )
+
+    for name, _ in constraints:
+        conn.execute(
+            text(
+                f"ALTER TABLE {_quote_identifier(table_name)} "
+                f"RENAME CONSTRAINT {_quote_identifier(name)} "
+                f"TO {_quote_identifier(name.removesuffix(STAGING_SUFFIX))}"
+            )
+        )
+    for name, _ in indexes:
+        conn.execute(
+            text(
+                f"ALTER INDEX {_quote_identifier(name)} "
+                f"RENAME TO {_quote_identifier(name.removesuffix(STAGING_SUFFIX))}"
+            )
+        )
+
+    for fk in foreign_keys:
+        if fk["cascade"]:
+            columns = ", ".join(_quote_identifier(c) for c in fk["columns"])
+            ref_columns = ", ".join(_quote_identifier(c) for c in fk["ref_columns"])
+            result = conn.execute(
+                text(
+                    f"DELETE FROM {fk['table']} WHERE ({columns}) NOT IN "
+                    f"(SELECT {ref_columns} FROM {_quote_identifier(table_name)})"
+                )
+            )
+            if result.rowcount:
+                print(
+                    f"INFO - Removed {result.rowcount} rows from {fk['table']} "
+                    f"referencing deleted {table_name}"
+                )
+        conn.execute(
+            text(
+                f"ALTER TABLE {fk['table']} "
+                f"ADD CONSTRAINT {_quote_identifier(fk['name'])} {fk['definition']}"
+            )
+        )
+
+    print(f"DONE - Swapped {staging} into {table_name}")
+
+
+# Mode sync seamen: "incremental" (hanya baris yang berubah) atau "full"
+# (load semua baris ke staging lalu swap)
+SEAMEN_SYNC_MODE = os.getenv("SEAMEN_SYNC_MODE", "incremental").lower()
+SEAMEN_BATCH_SIZE = 500
+
+
+_sync_logs_ready = False
+
+
+def ensure_sync_logs_columns(conn):
+    """Tambahkan kolom sync_logs yang dipakai sync (sekali per proses)"""
+    global _sync_logs_ready
+    if _sync_logs_ready:
+        return
+
+    # watermark: batas akhir window data upstream yang sudah tersinkron
+    conn.execute(
+        text("ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS watermark TIMESTAMP")
+    )
+    # phase_timings: durasi per fase/batch dari SyncTimer
+    conn.execute(
+        text("ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS phase_timings JSONB")
+    )
+    # content_hash: hash payload yang tersinkron (compute_content_hash);
+    # upstream_etag/last_modified: validator untuk conditional request
+    # sync_mode: "full" atau "incremental" (untuk jadwal full sync berkala)
+    for column in [
+        "content_hash",
+        "upstream_etag",
+        "upstream_last_modified",
+        "sync_mode",
+    ]:
+        conn.execute(
+            text(f"ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS {column} TEXT")
+        )
+    conn.commit()
+    _sync_logs_ready = True
+
+
+class SyncTimer:
+    """
+    Durasi tiap fase sync (detik) untuk kolom sync_logs.phase_timings
+
+    Fase dengan nama sama dijumlahkan (misalnya saat retry). Durasi batch
+    dicatat per operasi (insert/upsert) agar batch yang lambat terlihat.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.batches = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = round(self.phases.get(name, 0.0) + elapsed, 3)
+
+    def timed(self, name, func, *args):
+        """Jalankan func(*args) sebagai fase name"""
+        with self.phase(name):
+            return func(*args)
+
+    def add_batch(self, name, rows, seconds):
+        batch = self.batches.setdefault(name, {"rows": 0, "seconds": []})
+        batch["rows"] += rows
+        batch["seconds"].append(round(seconds, 3))
+
+    def to_dict(self):
+        return {
+            "total": round(time.perf_counter() - self.started, 3),
+            "phases": dict(self.phases),
+            "batches": self.batches,
+        }
+
+
+def write_sync_log(
+    table_name,
+    records_synced,
+    status,
+    error_message=None,
+    watermark=None,
+    timer=None,
+    conn=None,
+    content_hash=None,
+    upstream_validators=None,
+    sync_mode=None,
+):
+    """
+    Catat hasil sync ke sync_logs
+
+    Args:
+        status: "success", "unchanged" (tidak ada yang ditulis) atau "failed"
+        watermark: Batas akhir window upstream yang sudah tersinkron
+            (mutations) atau tanggal acuan day_remains di tabel (seamen)
+        timer: SyncTimer, disimpan sebagai phase_timings
+        conn: Koneksi yang sedang dipakai sync (commit dilakukan pemanggil).
+            Jika None, buka koneksi baru dan langsung commit.
+        content_hash: Hash payload yang tersinkron
+        upstream_validators: ETag/Last-Modified response upstream
+        sync_mode: "full" atau "incremental"
+    """
+    upstream_validators = upstream_validators or {}
+    sync_log = {
+        "table_name": table_name,
+        "records_synced": records_synced,
+        "sync_timestamp": datetime.now(),
+        "status": status,
+        "error_message": error_message,
+        "watermark": watermark,
+        "phase_timings": json.dumps(timer.to_dict()) if timer else None,
+        "content_hash": content_hash,
+        "upstream_etag": upstream_validators.get("etag"),
+        "upstream_last_modified": upstream_validators.get("last_modified"),
+        "sync_mode": sync_mode,
+    }
+    query = text(
+        """
+        INSERT INTO sync_logs (
+            table_name, records_synced, sync_timestamp, status, error_message,
+            watermark, phase_timings, content_hash, upstream_etag,
+            upstream_last_modified, sync_mode
+        )
+        VALUES (
+            :table_name, :records_synced, :sync_timestamp, :status, :error_message,
+            :watermark, CAST(:phase_timings AS JSONB), :content_hash, :upstream_etag,
+            :upstream_last_modified, :sync_mode
+        )
+    """
+    )
+
+    if conn is not None:
+        conn.execute(query, sync_log)
+        return
+
+    with engine.connect() as log_conn:
+        ensure_sync_logs_columns(log_conn)
+        log_conn.execute(query, sync_log)
+        log_conn.commit()
+
+
+def get_sync_logs(table_name=None, limit=50):
+    """
+    Riwayat sync terbaru beserta phase_timings
+
+    Args:
+        table_name: Optional filter ('seamen' / 'mutations')
+        limit: Jumlah log maksimal, terbaru dulu
+
+    Returns:
+        List of dicts
+    """
+    try:
+        query = """
+            SELECT table_name, records_synced, sync_timestamp, status,
+                   error_message, watermark, phase_timings
+            FROM sync_logs
+        """
+        params = {"limit": limit}
+        if table_name:
+            query += " WHERE table_name = :table_name"
+            params["table_name"] = table_name
+        query += " ORDER BY sync_timestamp DESC LIMIT :limit"
+
+        with engine.connect() as conn:
+            ensure_sync_logs_columns(conn)
+            rows = conn.execute(text(query), params).fetchall()
+
+        logs = []
+        for row in rows:
+            phase_timings = row[6]
+            if isinstance(phase_timings, str):
+                phase_timings = json.loads(phase_timings)
+
+            logs.append(
+                {
+                    "table_name": row[0],
+                    "records_synced": row[1],
+                    "sync_timestamp": row[2].isoformat() if row[2] else None,
+                    "status": row[3],
+                    "error_message": row[4],
+                    "watermark": row[5].isoformat() if row[5] else None,
+                    "phase_timings": phase_timings,
+                }
+            )
+
+        return logs
+
+    except Exception as e:
+        print(f"FAIL - Database Error: {str(e)}")
+        raise Exception(f"Failed to fetch sync logs: {str(e)}")
+
+
+def get_last_sync_state(table_name, conn=None):
+    """
+    Sync terakhir yang berhasil (success/unchanged) untuk table_name
+
+    Returns:
+        Dict synced_at, content_hash, etag, last_modified, watermark, atau None
+    """
+    query = text(
+        """
+        SELECT sync_timestamp, content_hash, upstream_etag, upstream_last_modified,
+               watermark
+        FROM sync_logs
+        WHERE table_name = :table_name AND status IN ('success', 'unchanged')
+        ORDER BY sync_timestamp DESC
+        LIMIT 1
+    """
+    )
+
+    if conn is None:
+        with engine.connect() as state_conn:
+            ensure_sync_logs_columns(state_conn)
+            row = state_conn.execute(query, {"table_name": table_name}).first()
+    else:
+        row = conn.execute(query, {"table_name": table_name}).first()
+
+    if row is None:
+        return None
+
+    return {
+        "synced_at": row[0],
+        "content_hash": row[1],
+        "etag": row[2],
+        "last_modified": row[3],
+        "watermark": row[4],
+    }
+
+
+def get_upstream_validators(table_name):
+    """ETag/Last-Modified dari sync terakhir untuk conditional request, atau None"""
+    state = get_last_sync_state(table_name)
+    if state is None or not (state["etag"] or state["last_modified"]):
+        return None
+    return {"etag": state["etag"], "last_modified": state["last_modified"]}
+
+
+def upsert_method(key, timer=None):
+    """
+    Method untuk DataFrame.to_sql: INSERT ... ON CONFLICT (key) DO UPDATE,
+    hanya untuk baris yang isinya berubah
+
+    Args:
+        key: Kolom primary key tabel tujuan
+        timer: Optional SyncTimer, durasi tiap chunk dicatat sebagai batch "upsert"
+    """
+
+    def method(pd_table, conn, keys, data_iter):
+        start = time.perf_counter()
+        rows = [dict(zip(keys, row)) for row in data_iter]
+        columns = [column for column in keys if column != key]
+        stmt = pg_insert(pd_table.table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: stmt.excluded[column] for column in columns},
+            # Baris yang isinya sama tidak ditulis ulang (tidak dihitung rowcount)
+            where=tuple_(
+                *[pd_table.table.c[column] for column in columns]
+            ).is_distinct_from(tuple_(*[stmt.excluded[column] for column in columns])),
+        )
+        rowcount = conn.execute(stmt).rowcount
+        if timer is not None:
+            timer.add_batch("upsert", len(rows), time.perf_counter() - start)
+        return rowcount
+
+    return method
+
+
+def _integral_to_int(value):
+    """Float bulat (5.0) menjadi int (5), nilai lain tetap"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _hash_text(column):
+    """
+    Teks kanonik satu kolom untuk hash baris
+
+    Angka bulat selalu ditulis sebagai int, jadi 5 di kolom int64, 5.0 di
+    kolom float64 (karena ada null) dan 5.0 di kolom object sama-sama "5".
+    """
+    if pd.api.types.is_float_dtype(column):
+        integral = (column % 1 == 0).to_numpy()
+        values = column.to_numpy(dtype=object)
+        values[integral] = column.to_numpy()[integral].astype(np.int64)
+    elif pd.api.types.is_object_dtype(column):
+        # Tanpa Series.map: hasilnya diinferensi ulang menjadi float64
+        values = np.array([_integral_to_int(value) for value in column], dtype=object)
+    else:
+        values = column.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return pd.Series(values, index=column.index, dtype=object).astype(str)
+
+
+# Tanggal acuan proyeksi kolom hitung mundur untuk hash
+DAY_COUNTER_EPOCH = date(2000, 1, 1)
+
+
+def _hashed_frame(df, ignored_columns=(), day_counters=(), today=None):
+    """
+    Frame yang di-hash: tanpa ignored_columns (kecuali day_counters)
+
+    Kolom day_counters diproyeksikan ke DAY_COUNTER_EPOCH sehingga data yang
+    hanya berubah karena hari berganti menghasilkan hash yang sama.
+    """
+    frame = df.drop(
+        columns=[
+            column
+            for column in ignored_columns
+            if column in df.columns and column not in day_counters
+        ]
+    )
+
+    offset = ((today or date.today()) - DAY_COUNTER_EPOCH).days
+    for column in day_counters:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce") + offset
+    return frame
+
+
+def compute_row_hashes(
+    df, key="seamancode", ignored_columns=(), day_counters=(), today=None
+):
+    """
+    Hash 64-bit per baris (tanpa kolom key) untuk deteksi perubahan
+
+    Nilai dinormalisasi ke teks kanonik (lihat _hash_text) supaya hash tidak
+    bergantung pada dtype hasil parsing JSON.
+
+    Args:
+        ignored_columns: Kolom yang tidak ikut di-hash (kecuali day_counters)
+        day_counters: Kolom hitung mundur harian, diproyeksikan ke
+            DAY_COUNTER_EPOCH (lihat _hashed_frame)
+        today: Tanggal data di-fetch (default: hari ini)
+    """
+    frame = _hashed_frame(df, ignored_columns, day_counters, today)
+    columns = sorted(column for column in frame.columns if column != key)
+    normalized = pd.DataFrame(
+        {column: _hash_text(frame[column]) for column in columns}, index=frame.index
+    )
+    hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+    return hashes.view(np.int64)
+
+
+def compute_content_hash(df, key, ignored_columns=(), day_counters=(), today=None):
+    """
+    SHA-256 isi payload (urut key) untuk mendeteksi sync tanpa perubahan
+
+    Args:
+        ignored_columns, day_counters, today: Lihat compute_row_hashes
+    """
+    frame = df.sort_values(key)
+    columns = [
+        column
+        for column in frame.columns
+        if column not in ignored_columns or column in day_counters
+    ]
+
+    digest = hashlib.sha256()
+    digest.update(",".join(sorted(columns)).encode())
+    digest.update(frame[key].to_numpy(dtype=np.int64).tobytes())
+    digest.update(
+        compute_row_hashes(frame, key, ignored_columns, day_counters, today).tobytes()
+    )
+    return digest.hexdigest()
+
+
+def ensure_seamen_row_hashes_table(conn):
+    """Buat tabel hash baris seamen jika belum ada"""
+    conn.execute(
+        text(
+            """
+        CREATE TABLE IF NOT EXISTS seamen_row_hashes (
+            seamancode BIGINT PRIMARY KEY,
+            row_hash BIGINT NOT NULL
+        )
+    """
+        )
+    )
+
+
+# Kolom turunan yang berubah tiap hari/urutan tanpa perubahan data seaman
+# (diabaikan oleh change feed dan hash baris/content; day_remains di tabel
+# dijaga lewat _shift_seamen_day_counters)
+SEAMEN_DERIVED_COLUMNS = ["day_remains", "no"]
+
+# Kolom hitung mundur harian di seamen (day_remains = end_date - hari ini)
+SEAMEN_DAY_COUNTERS = ["day_remains"]
+
+
+def ensure_seamen_changes_table(conn):
+    """Buat tabel change feed seamen jika belum ada"""
+    conn.execute(
+        text(
+            """
+        CREATE TABLE IF NOT EXISTS seamen_changes (
+            id BIGSERIAL PRIMARY KEY,
+            version BIGINT NOT NULL,
+            seamancode BIGINT NOT NULL,
+            change_type TEXT NOT NULL,
+            changed_columns JSONB,
+            old_values JSONB,
+            new_values JSONB,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS idx_seamen_changes_version "
+            "ON seamen_changes(version)"
+        )
+    )
+
+
+def _canonical_value(value):
+    """Nilai sebanding antara data database dan data API (dan bisa di-JSON)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _canonical_frame(frame):
+    """_canonical_value per kolom, tetap dtype object (tanpa inferensi ulang)"""
+    return pd.DataFrame(
+        {
+            column: np.array(
+                [_canonical_value(value) for value in frame[column]], dtype=object
+            )
+            for column in frame.columns
+        },
+        index=frame.index,
+    )
+
+
+def diff_seamen(old, new):
+    """
+    Perubahan per seaman antara data lama dan baru
+
+    Kolom di SEAMEN_DERIVED_COLUMNS diabaikan, sehingga seaman yang hanya
+    berubah day_remains tidak dianggap berubah.
+
+    Args:
+        old: DataFrame seamen sebelum sync (dari database)
+        new: DataFrame seamen hasil sync
+
+    Returns:
+        List dict seamancode, change_type (inserted/updated/deleted),
+        changed_columns, old_values, new_values
+    """
+    columns = [
+        column
+        for column in new.columns
+        if column in old.columns
+        and column != "seamancode"
+        and column not in SEAMEN_DERIVED_COLUMNS
+    ]
+    old_rows = _canonical_frame(old.set_index("seamancode")[columns])
+    new_rows = _canonical_frame(new.set_index("seamancode")[columns])
+
+    changes = []
+    for code in new_rows.index.difference(old_rows.index):
+        changes.append(
+            {
+                "seamancode": int(code),
+                "change_type": "inserted",
+                "changed_columns": columns,
+                "old_values": None,
+                "new_values": new_rows.loc[code].to_dict(),
+            }
+        )
+
+    for code in old_rows.index.difference(new_rows.index):
+        changes.append(
+            {
+                "seamancode": int(code),
+                "change_type": "deleted",
+                "changed_columns": columns,
+                "old_values": old_rows.loc[code].to_dict(),
+                "new_values": None,
+            }
+        )
+
+    common = new_rows.index.intersection(old_rows.index)
+    before = old_rows.loc[common]
+    after = new_rows.loc[common]
+    differs = ~((before == after) | (before.isna() & after.isna()))
+
+    for code in differs.index[differs.any(axis=1).to_numpy()]:
+        changed_columns = differs.columns[differs.loc[code].to_numpy()].tolist()
+        changes.append(
+            {
+                "seamancode": int(code),
+                "change_type": "updated",
+                "changed_columns": changed_columns,
+                "old_values": before.loc[code, changed_columns].to_dict(),
+                "new_values": after.loc[code, changed_columns].to_dict(),
+            }
+        )
+
+    return changes
+
+
+def record_seamen_changes(conn, changes):
+    """
+    Simpan perubahan ke seamen_changes dengan nomor versi baru
+
+    Berjalan di transaksi sync (commit dilakukan pemanggil).
+
+    Returns:
+        Nomor versi, atau None jika tidak ada perubahan
+    """
+    if not changes:
+        return None
+
+    version = conn.execute(
+        text("SELECT COALESCE(MAX(version), 0) + 1 FROM seamen_changes")
+    ).scalar()
+    conn.execute(
+        text(
+            """
+        INSERT INTO seamen_changes (
+            version, seamancode, change_type, changed_columns, old_values, new_values
+        )
+        VALUES (
+            :version, :seamancode, :change_type, CAST(:changed_columns AS JSONB),
+            CAST(:old_values AS JSONB), CAST(:new_values AS JSONB)
+        )
+    """
+        ),
+        [
+            {
+                "version": version,
+                "seamancode": change["seamancode"],
+                "change_type": change["change_type"],
+                "changed_columns": json.dumps(change["changed_columns"]),
+                "old_values": json.dumps(change["old_values"], default=str),
+                "new_values": json.dumps(change["new_values"], default=str),
+            }
+            for change in changes
+        ],
+    )
+
+    counts = pd.Series([change["change_type"] for change in changes]).value_counts()
+    print(f"DONE - Recorded seamen changes version {version}: {counts.to_dict()}")
+    return version
+
+
+def get_seamen_changes(since_version=0, limit=5000, after_id=None):
+    """
+    Change feed seamen setelah since_version, per halaman (keyset version, id)
+
+    Satu versi (satu sync) bisa lebih besar dari limit, jadi halaman bisa
+    berhenti di tengah versi. Halaman berikutnya diminta dengan
+    since_version dan after_id dari cursor.
+
+    Args:
+        since_version: Versi terakhir yang sudah diterima lengkap, atau versi
+            dari cursor
+        limit: Jumlah perubahan maksimal per halaman
+        after_id: id dari cursor; jika diisi, perubahan versi since_version
+            setelah id ini ikut dikirim
+
+    Returns:
+        Dict berisi:
+            version: Versi terakhir yang sudah terkirim lengkap sampai halaman ini
+            latest_version: Versi terbaru di change feed
+            has_more: True jika masih ada perubahan setelah halaman ini
+            cursor: {"since_version", "after_id"} untuk halaman berikutnya
+            changes: Perubahan urut version, id
+    """
+    try:
+        with engine.connect() as conn:
+            ensure_seamen_changes_table(conn)
+            conn.commit()
+
+            latest = conn.execute(
+                text("SELECT COALESCE(MAX(version), 0) FROM seamen_changes")
+            ).scalar()
+
+            # Tanpa after_id, versi since_version dianggap sudah diterima lengkap
+            condition = "version > :since_version"
+            if after_id is not None:
+                condition += " OR (version = :since_version AND id > :after_id)"
+
+            # Satu baris ekstra untuk mengetahui apakah masih ada halaman lagi
+            rows = conn.execute(
+                text(
+                    f"""
+                SELECT id, version, seamancode, change_type, changed_columns,
+                       old_values, new_values, created_at
+                FROM seamen_changes
+                WHERE {condition}
+                ORDER BY version, id
+                LIMIT :limit
+            """
+                ),
+                {
+                    "since_version": since_version,
+                    "after_id": after_id,
+                    "limit": limit + 1,
+                },
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        next_row = rows[limit] if has_more else None
+        rows = rows[:limit]
+
+        changes = []
+        for row in rows:
+            values = [
+                json.loads(value) if isinstance(value, str) else value
+                for value in row[4:7]
+            ]
+            changes.append(
+                {
+                    "id": row[0],
+                    "version": row[1],
+                    "seamancode": row[2],
+                    "change_type": row[3],
+                    "changed_columns": values[0],
+                    "old_values": values[1],
+                    "new_values": values[2],
+                    "created_at": row[7].isoformat() if row[7] else None,
+                }
+            )
+
+        # Jika masih ada halaman, versi baris berikutnya belum terkirim lengkap
+        if has_more:
+            version = next_row[1] - 1
+        else:
+            version = max([latest] + [row[1] for row in rows[-1:]])
+
+        if rows:
+            cursor = {"since_version": rows[-1][1], "after_id": rows[-1][0]}
+        else:
+            cursor = {"since_version": since_version, "after_id": after_id}
+
+        return {
+            "version": version,
+            "latest_version": latest,
+            "has_more": has_more,
+            "cursor": cursor,
+            "changes": changes,
+        }
+
+    except Exception as e:
+        print(f"FAIL - Database Error: {str(e)}")
+        raise Exception(f"Failed to fetch seamen changes: {str(e)}")
+
+
+def _prepare_seamen_frame(df):
+    """Konversi tanggal dan seamancode, buang baris tanpa seamancode/duplikat"""
+    # Convert date columns dari DD/MM/YYYY ke datetime (no-op jika sudah
+    # dikonversi saat fetch streaming)
+    print("Converting start_date/end_date format...")
+    df = convert_seamen_columns(df)
+
+    df["seamancode"] = pd.to_numeric(df["seamancode"], errors="coerce")
+    invalid = df["seamancode"].isna()
+    if invalid.any():
+        print(f"WARNING - Dropped {int(invalid.sum())} seamen without seamancode")
+        df = df[~invalid]
+
+    df = df.astype({"seamancode": np.int64})
+    duplicated = df["seamancode"].duplicated(keep="last")
+    if duplicated.any():
+        print(f"WARNING - Dropped {int(duplicated.sum())} duplicated seamancodes")
+        df = df[~duplicated]
+
+    print("DONE - Date conversion completed")
+    return df.reset_index(drop=True)
+
+
+def _sync_seamen_full(conn, df, row_hashes, timer):
+    """Load semua seamen ke staging lalu swap, hash dibangun ulang"""
+    with timer.phase("insert"):
+        create_staging_table(conn, "seamen")
+        insert_dataframe_batches(
+            conn, df, "seamen" + STAGING_SUFFIX, SEAMEN_BATCH_SIZE, timer
+        )
+    with timer.phase("constraints"):
+        build_staging_constraints(conn, "seamen")
+    print("DONE - INSERT completed")
+
+    with timer.phase("changes"):
+        previous = pd.read_sql_query(text("SELECT * FROM seamen"), conn)
+        changes = diff_seamen(previous, df)
+
+    with timer.phase("swap"):
+        swap_staging_table(conn, "seamen", len(df))
+
+    with timer.phase("changes"):
+        record_seamen_changes(conn, changes)
+
+    with timer.phase("hashes"):
+        conn.execute(text("DELETE FROM seamen_row_hashes"))
+        pd.DataFrame({"seamancode": df["seamancode"], "row_hash": row_hashes}).to_sql(
+            "seamen_row_hashes",
+            conn,
+            if_exists="append",
+            index=False,
+            chunksize=SEAMEN_BATCH_SIZE * 10,
+        )
+
+
+def _sync_seamen_incremental(conn, df, row_hashes, counters_at, timer):
+    """
+    Terapkan hanya insert/update/delete terhadap hash yang tersimpan
+
+    Hash baris tidak ikut berubah karena day_remains berkurang tiap hari,
+    jadi kolom hitung mundur seluruh tabel dimajukan dulu sejak counters_at
+    (lihat seamen_counters_date) sebelum baris yang berubah ditulis.
+
+    Returns:
+        Dict jumlah baris inserted/updated/deleted, atau None jika hash
+        tersimpan tidak cocok dengan isi tabel seamen (perlu full sync)
+
+    Raises:
+        Exception jika payload kurang dari SYNC_MIN_ROW_RATIO baris tersimpan
+        (lihat check_min_row_ratio); belum ada yang ditulis
+    """
+    with timer.phase("diff"):
+        stored = pd.read_sql_query(
+            text("SELECT seamancode, row_hash FROM seamen_row_hashes"), conn
+        )
+        total, hashed = conn.execute(
+            text(
+                """
+            SELECT COUNT(*), COUNT(h.seamancode)
+            FROM seamen s
+            LEFT JOIN seamen_row_hashes h ON h.seamancode = s.seamancode
+        """
+            )
+        ).one()
+
+        if stored.empty or not total == hashed == len(stored):
+            print("WARNING - Stored row hashes out of date, falling back to full sync")
+            return None
+
+        # Baris yang tidak ada di payload dihapus (cascade ke mutations), jadi
+        # payload terpotong ditolak dengan aturan yang sama seperti swap
+        check_min_row_ratio("Seamen payload", len(df), "seamen", len(stored))
+
+        codes = df["seamancode"].to_numpy()
+        stored_codes = stored["seamancode"].to_numpy(dtype=np.int64)
+        stored_hashes = stored["row_hash"].to_numpy(dtype=np.int64)
+
+        positions = pd.Index(stored_codes).get_indexer(codes)
+        is_new = positions == -1
+        is_changed = is_new | (stored_hashes[positions] != row_hashes)
+        deleted_codes = stored_codes[~np.isin(stored_codes, codes)].tolist()
+
+    counts = {
+        "inserted": int(is_new.sum()),
+        "updated": int((is_changed & ~is_new).sum()),
+        "deleted": len(deleted_codes),
+    }
+    print(
+        f"PROCESS - {counts['inserted']} new, {counts['updated']} changed, "
+        f"{counts['deleted']} removed seamen"
+    )
+
+    with timer.phase("shift"):
+        _shift_seamen_day_counters(conn, counters_at)
+
+    with timer.phase("changes"):
+        touched_codes = codes[is_changed & ~is_new].tolist() + deleted_codes
+        previous = df.iloc[0:0]
+        if touched_codes:
+            previous = pd.read_sql_query(
+                text("SELECT * FROM seamen WHERE seamancode IN :codes").bindparams(
+                    bindparam("codes", expanding=True)
+                ),
+                conn,
+                params={"codes": touched_codes},
+            )
+        changes = diff_seamen(previous, df[is_changed])
+
+    if deleted_codes:
+        print("Starting DELETE operation...")
+        with timer.phase("delete"):
+            for table_name in ["seamen", "seamen_row_hashes"]:
+                conn.execute(
+                    text(
+                        f"DELETE FROM {table_name} WHERE seamancode IN :codes"
+                    ).bindparams(bindparam("codes", expanding=True)),
+                    {"codes": deleted_codes},
+                )
+
+    if is_changed.any():
+        print(f"Starting UPSERT operation for {int(is_changed.sum())} rows...")
+        with timer.phase("upsert"):
+            df[is_changed].to_sql(
+                "seamen",
+                conn,
+                if_exists="append",
+                index=False,
+                chunksize=SEAMEN_BATCH_SIZE,
+                method=upsert_method("seamancode", timer),
+            )
+        with timer.phase("hashes"):
+            pd.DataFrame(
+                {"seamancode": codes[is_changed], "row_hash": row_hashes[is_changed]}
+            ).to_sql(
+                "seamen_row_hashes",
+                conn,
+                if_exists="append",
+                index=False,
+                chunksize=SEAMEN_BATCH_SIZE * 10,
+                method=upsert_method("seamancode"),
+            )
+
+    with timer.phase("changes"):
+        record_seamen_changes(conn, changes)
+
+    print("DONE - Incremental sync completed")
+    return counts
 
-    except Exception as e:
-        print(f"FAIL - Error fetching from ORIGINAL API: {str(e)}")
-        return None
 
+def seamen_counters_date(last_state):
+    """
+    Tanggal acuan day_remains di tabel seamen menurut sync terakhir
 
-def fetch_mutations_from_original_api():
-    """Fetch data mutations dari API URL ASLI"""
-    print(f"START - [{datetime.now()}] Starting mutations sync from ORIGINAL API...")
+    Disimpan sebagai watermark log seamen. Sync 304 tidak memajukannya,
+    karena day_remains tidak ikut diperbarui. Log lama tanpa watermark
+    memakai waktu sync.
+    """
+    return last_state["watermark"] or last_state["synced_at"]
 
-    try:
-        url = "http://nanika.spil.co.id:3021/get-mutation"
-        payload = json.dumps(
-            {
-                "seaman_name": "",
-                "transaction_date_1": "01/01/2020",
-                "transaction_date_2": "01/01/2025",
-                "from_rank_name": "",
-                "to_rank_name": "",
-                "from_vessel_code": "",
-                "to_vessel_code": "",
-                "jenis": "",
-            }
-        )
-        headers = {"Content-Type": "application/json"}
 
-        response = requests.get(url, headers=headers, data=payload, timeout=30)
+def _shift_seamen_day_counters(conn, counters_at):
+    """
+    Majukan kolom hitung mundur seamen sejak tanggal acuannya
 
-        if response.status_code == 200:
-            response_dict = response.json()
-            data_mutation = response_dict.get("data_mutation", [])
+    Dipakai jika isi payload sama dengan sync terakhir: day_remains cukup
+    dikurangi jumlah hari sejak counters_at (lihat seamen_counters_date),
+    tanpa menulis ulang tabel.
 
-            if data_mutation:
-                df = pd.DataFrame(data_mutation)
-                print(f"DONE - Fetched {len(df)} mutation records from ORIGINAL API")
-                return df
-            else:
-                print("WARNING - ORIGINAL API returned empty data")
-                return None
-        else:
-            print(f"FAIL - ORIGINAL API returned status code {response.status_code}")
-            return None
+    Returns:
+        Jumlah baris yang diperbarui
+    """
+    days = (date.today() - counters_at.date()).days
+    if days <= 0:
+        return 0
 
-    except Exception as e:
-        print(f"FAIL - Error fetching from ORIGINAL API: {str(e)}")
-        return None
+    assignments = ", ".join(
+        f"{column} = {column} - :days" for column in SEAMEN_DAY_COUNTERS
+    )
+    conditions = " OR ".join(f"{column} IS NOT NULL" for column in SEAMEN_DAY_COUNTERS)
+    result = conn.execute(
+        text(f"UPDATE seamen SET {assignments} WHERE {conditions}"), {"days": days}
+    )
+    print(f"DONE - Shifted day counters by {days} day(s) for {result.rowcount} seamen")
+    return result.rowcount
 
 
-# ============================================================================
-# BAGIAN 3: SYNC KE DATABASE (Untuk Scheduler)
-# ============================================================================
+def sync_seamen_to_database(df, mode=None, timer=None, raise_errors=False):
+    """
+    Simpan/Update data seamen ke Supabase
 
+    Jika isi payload sama dengan sync terakhir (selain kolom turunan), tabel
+    tidak ditulis ulang: hanya day_remains yang dimajukan. Jika upstream
+    membalas 304, tidak ada yang ditulis. Sync dicatat sebagai "unchanged"
+    bila tidak ada yang berubah.
 
-def sync_seamen_to_database(df):
-    """Simpan/Update data seamen ke Supabase dengan batch insert"""
-    if df is None or df.empty:
+    Args:
+        df: DataFrame seamen dari API asli
+        mode: "incremental" atau "full" (default: SEAMEN_SYNC_MODE). Mode full
+            selalu menulis ulang tabel.
+        timer: SyncTimer yang sudah berjalan (misalnya sejak fetch)
+        raise_errors: Lempar ulang error setelah dicatat di sync_logs (untuk
+            run_with_retries) alih-alih mengembalikan False
+    """
+    not_modified = df is not None and df.attrs.get("not_modified", False)
+    if not not_modified and (df is None or df.empty):
         print("WARNING - No seamen data to sync")
         return False
 
-    try:
-        print(f"PROCESS - Processing {len(df)} seamen records...")
-
-        # Convert date columns dari DD/MM/YYYY ke YYYY-MM-DD
-        date_columns = ["start_date", "end_date"]
-        for col in date_columns:
-            if col in df.columns:
-                print(f"Converting {col} format...")
-                # Convert DD/MM/YYYY to datetime, then to YYYY-MM-DD
-                df[col] = pd.to_datetime(df[col], format="%d/%m/%Y", errors="coerce")
+    mode = mode or SEAMEN_SYNC_MODE
+    timer = timer or SyncTimer()
+    validators = df.attrs.get("upstream_validators")
 
-        print("DONE - Date conversion completed")
+    try:
+        content_hash = None
+        if not not_modified:
+            print(f"PROCESS - Processing {len(df)} seamen records...")
+
+            with timer.phase("convert"):
+                df = _prepare_seamen_frame(df)
+            with timer.phase("hash"):
+                row_hashes = compute_row_hashes(
+                    df,
+                    ignored_columns=SEAMEN_DERIVED_COLUMNS,
+                    day_counters=SEAMEN_DAY_COUNTERS,
+                )
+                content_hash = compute_content_hash(
+                    df,
+                    "seamancode",
+                    ignored_columns=SEAMEN_DERIVED_COLUMNS,
+                    day_counters=SEAMEN_DAY_COUNTERS,
+                )
 
         with engine.connect() as conn:
             # Set statement timeout lebih tinggi (5 menit)
             print("SETTING - Setting statement timeout to 5 minutes...")
             conn.execute(text("SET statement_timeout = '300000';"))
+            ensure_seamen_row_hashes_table(conn)
+            ensure_seamen_changes_table(conn)
+            ensure_sync_logs_columns(conn)
+
+            last_state = get_last_sync_state("seamen", conn)
+            if not_modified and last_state is None:
+                raise Exception("Upstream returned 304 but no previous sync exists")
+
+            unchanged = not_modified or (
+                mode != "full"
+                and last_state is not None
+                and last_state["content_hash"] == content_hash
+            )
+            if unchanged:
+                print("INFO - Seamen content unchanged since last sync")
+                if not_modified:
+                    # 304: payload identik byte per byte termasuk day_remains,
+                    # isi tabel sudah sama dengan upstream
+                    shifted = 0
+                    counters_at = seamen_counters_date(last_state)
+                else:
+                    with timer.phase("shift"):
+                        shifted = _shift_seamen_day_counters(
+                            conn, seamen_counters_date(last_state)
+                        )
+                    counters_at = datetime.now()
+
+                write_sync_log(
+                    "seamen",
+                    shifted,
+                    "success" if shifted else "unchanged",
+                    watermark=counters_at,
+                    timer=timer,
+                    conn=conn,
+                    content_hash=last_state["content_hash"],
+                    upstream_validators=validators
+                    or {
+                        "etag": last_state["etag"],
+                        "last_modified": last_state["last_modified"],
+                    },
+                )
+                conn.commit()
+                print("=" * 60)
 
-            # Gunakan DELETE instead of TRUNCATE (lebih reliable, no CASCADE lock)
-            print("Starting DELETE operation...")
-            conn.execute(text("DELETE FROM seamen"))
-            conn.commit()
-            print("DONE - DELETE completed")
-
-            # Batch insert untuk data besar
-            batch_size = 500
-            total_batches = (len(df) + batch_size - 1) // batch_size
+                if shifted:
+                    publish_snapshot_file("seamen")
+                return True
 
-            print(f"Starting INSERT operation in {total_batches} batches...")
-            for i in range(0, len(df), batch_size):
-                batch_df = df.iloc[i : i + batch_size]
-                batch_num = (i // batch_size) + 1
-                print(
-                    f"   Inserting batch {batch_num}/{total_batches} ({len(batch_df)} rows)..."
+            counts = None
+            if mode == "incremental" and last_state is not None:
+                counts = _sync_seamen_incremental(
+                    conn, df, row_hashes, seamen_counters_date(last_state), timer
                 )
-                batch_df.to_sql("seamen", conn, if_exists="append", index=False)
-                conn.commit()
+            if counts is None:
+                _sync_seamen_full(conn, df, row_hashes, timer)
 
-            print("DONE - INSERT completed")
             print(f"DONE - Synced {len(df)} seamen records to database")
             print("=" * 60)
 
-            # Log sync time
-            sync_log = {
-                "table_name": "seamen",
-                "records_synced": len(df),
-                "sync_timestamp": datetime.now(),
-                "status": "success",
-            }
-            conn.execute(
-                text(
-                    """
-                INSERT INTO sync_logs (table_name, records_synced, sync_timestamp, status)
-                VALUES (:table_name, :records_synced, :sync_timestamp, :status)
-            """
-                ),
-                sync_log,
+            # Log sync time (satu transaksi dengan perubahan incremental/swap)
+            write_sync_log(
+                "seamen",
+                len(df),
+                "success",
+                watermark=datetime.now(),
+                timer=timer,
+                conn=conn,
+                content_hash=content_hash,
+                upstream_validators=validators,
             )
             conn.commit()
 
-            return True
+        # Tulis file snapshot untuk worker API
+        publish_snapshot_file("seamen")
+
+        return True
 
     except Exception as e:
         print(f"FAIL - Error syncing seamen to database: {str(e)}")
@@ -512,51 +2869,269 @@ def sync_seamen_to_database(df):
 
         # Log error
         try:
-            with engine.connect() as conn:
-                error_log = {
-                    "table_name": "seamen",
-                    "records_synced": 0,
-                    "sync_timestamp": datetime.now(),
-                    "status": "failed",
-                    "error_message": str(e)[:500],
-                }
-                conn.execute(
-                    text(
-                        """
-                    INSERT INTO sync_logs (table_name, records_synced, sync_timestamp, status, error_message)
-                    VALUES (:table_name, :records_synced, :sync_timestamp, :status, :error_message)
-                """
-                    ),
-                    error_log,
-                )
-                conn.commit()
+            write_sync_log(
+                "seamen", 0, "failed", error_message=str(e)[:500], timer=timer
+            )
         except Exception:
             pass
 
+        if raise_errors:
+            raise
         return False
 
 
-def sync_mutations_to_database(df):
-    """Simpan/Update data mutations ke Supabase dengan batch insert"""
-    if df is None or df.empty:
+# Cara load mutations: "copy" (COPY FROM STDIN) atau "insert" (to_sql per batch)
+MUTATIONS_LOAD_METHOD = os.getenv("MUTATIONS_LOAD_METHOD", "copy").lower()
+MUTATIONS_BATCH_SIZE = 1000
+COPY_CHUNK_SIZE = 50000
+
+
+class DataFrameCsvStream:
+    """File-like read() yang menghasilkan CSV DataFrame per chunk untuk COPY"""
+
+    def __init__(self, df, chunk_size=COPY_CHUNK_SIZE):
+        self.chunks = iter_csv_chunks(df, chunk_size)
+        self.buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+# Penanda NULL di CSV COPY, jadi string kosong tetap '' (bukan NULL)
+COPY_NULL_MARKER = "\\N"
+
+
+def copy_frame(df):
+    """
+    Siapkan DataFrame untuk CSV COPY
+
+    Kolom float yang semua nilainya bulat (kolom integer yang jadi float64
+    karena ada null) di-cast ke Int64, supaya tertulis 123 bukan 123.0 yang
+    ditolak COPY ke kolom integer.
+    """
+    df = df.copy(deep=False)
+    for column in df.columns:
+        values = df[column]
+        if values.dtype.kind != "f":
+            continue
+        present = values.dropna()
+        if np.isfinite(present).all() and (present == np.floor(present)).all():
+            df[column] = values.astype("Int64")
+    return df
+
+
+def iter_csv_chunks(df, chunk_size=COPY_CHUNK_SIZE):
+    """CSV tanpa header per chunk baris; null ditulis sebagai COPY_NULL_MARKER"""
+    df = copy_frame(df)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size].to_csv(
+            index=False,
+            header=False,
+            na_rep=COPY_NULL_MARKER,
+            date_format="%Y-%m-%d %H:%M:%S%z",
+        )
+
+
+def copy_dataframe(conn, df, table_name):
+    """
+    Load DataFrame ke tabel dengan COPY FROM STDIN (format CSV) lewat satu cursor
+
+    Berjalan di transaksi conn, commit dilakukan pemanggil. Kolom DataFrame
+    harus sama dengan nama kolom tabel.
+
+    Returns:
+        Jumlah baris yang di-load
+    """
+    columns = ", ".join(_quote_identifier(column) for column in df.columns)
+    query = (
+        f"COPY {_quote_identifier(table_name)} ({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')"
+    )
+
+    cursor = conn.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(query, DataFrameCsvStream(df))
+        elif hasattr(cursor, "copy"):
+            # psycopg 3
+            with cursor.copy(query) as copy:
+                for chunk in iter_csv_chunks(df):
+                    copy.write(chunk)
+        else:
+            raise Exception("Database driver does not support COPY")
+    finally:
+        cursor.close()
+
+    return len(df)
+
+
+def insert_dataframe_batches(conn, df, table_name, batch_size, timer=None):
+    """
+    Load DataFrame dengan to_sql per batch, commit setiap batch
+
+    Args:
+        timer: Optional SyncTimer, durasi tiap batch dicatat sebagai "insert"
+    """
+    total_batches = (len(df) + batch_size - 1) // batch_size
+
+    print(f"Starting INSERT operation in {total_batches} batches...")
+    for i in range(0, len(df), batch_size):
+        batch_df = df.iloc[i : i + batch_size]
+        batch_num = (i // batch_size) + 1
+        print(
+            f"   Inserting batch {batch_num}/{total_batches} ({len(batch_df)} rows)..."
+        )
+        start = time.perf_counter()
+        batch_df.to_sql(table_name, conn, if_exists="append", index=False)
+        conn.commit()
+        if timer is not None:
+            timer.add_batch("insert", len(batch_df), time.perf_counter() - start)
+
+
+def load_mutations(conn, df, table_name="mutations", method=None, timer=None):
+    """
+    Load mutations ke tabel yang masih kosong
+
+    Args:
+        table_name: Tabel tujuan (biasanya mutations_staging)
+        method: "copy" atau "insert" (default: MUTATIONS_LOAD_METHOD).
+            Jika COPY gagal, transaksi di-rollback dan dilanjutkan dengan insert.
+        timer: Optional SyncTimer untuk durasi per batch insert
+    """
+    method = method or MUTATIONS_LOAD_METHOD
+
+    if method == "copy":
+        try:
+            print(f"Starting COPY operation ({len(df)} rows)...")
+            copy_dataframe(conn, df, table_name)
+            conn.commit()
+            return
+        except Exception as e:
+            conn.rollback()
+            print(f"WARNING - COPY failed, falling back to INSERT: {str(e)}")
+
+    insert_dataframe_batches(conn, df, table_name, MUTATIONS_BATCH_SIZE, timer)
+
+
+def merge_mutations(conn, df, window, timer=None):
+    """
+    Gabungkan mutations satu window ke tabel (upsert per mutationnoid)
+
+    Window dianggap otoritatif: mutations di tabel dengan transactiondate di
+    [date_from, date_to] (inklusif, semua hari yang pasti ter-fetch, lihat
+    fetch_mutations_chunk) yang tidak ada lagi di payload upstream ikut
+    dihapus. Commit dilakukan pemanggil.
+
+    Payload kosong berarti window kosong di upstream: semua mutations di
+    window dihapus.
+
+    Returns:
+        Jumlah baris yang benar-benar berubah (dihapus + ditulis)
+    """
+    ids = df["mutationnoid"].tolist() if "mutationnoid" in df.columns else []
+    start = pd.Timestamp(window["date_from"])
+    end = pd.Timestamp(window["date_to"]) + pd.Timedelta(days=1)
+    result = conn.execute(
+        text(
+            """
+        DELETE FROM mutations
+        WHERE transactiondate >= :start AND transactiondate < :end
+          AND mutationnoid NOT IN :ids
+    """
+        ).bindparams(bindparam("ids", expanding=True)),
+        {
+            "start": start.to_pydatetime(),
+            "end": end.to_pydatetime(),
+            "ids": ids,
+        },
+    )
+    if result.rowcount:
+        print(f"INFO - Removed {result.rowcount} mutations no longer in upstream")
+    if df.empty:
+        return result.rowcount
+
+    print(f"Starting UPSERT operation for {len(df)} rows...")
+    written = df.to_sql(
+        "mutations",
+        conn,
+        if_exists="append",
+        index=False,
+        chunksize=MUTATIONS_BATCH_SIZE,
+        method=upsert_method("mutationnoid", timer),
+    )
+    print(f"DONE - {written or 0} new or changed mutations written")
+    return result.rowcount + (written or 0)
+
+
+def sync_mutations_to_database(df, window=None, timer=None, raise_errors=False):
+    """
+    Simpan/Update data mutations ke Supabase
+
+    Args:
+        df: DataFrame mutations dari API asli
+        window: Window fetch dari get_mutations_window. Jika incremental,
+            data digabung ke tabel (merge_mutations); selain itu tabel diganti
+            seluruhnya lewat staging. date_to disimpan sebagai watermark.
+        timer: SyncTimer yang sudah berjalan (misalnya sejak fetch)
+        raise_errors: Lempar ulang error setelah dicatat di sync_logs (untuk
+            run_with_retries) alih-alih mengembalikan False
+
+    Jika isi payload (setelah orphan dibuang) sama dengan sync terakhir, atau
+    merge tidak mengubah apa pun, sync dicatat sebagai "unchanged" dan
+    snapshot tidak dibangun ulang.
+    """
+    incremental = window is not None and window["incremental"]
+    watermark = window["date_to"] if window is not None else None
+    sync_mode = "incremental" if incremental else "full"
+
+    if df is None or (df.empty and not incremental):
         print("WARNING - No mutations data to sync")
         return False
 
+    timer = timer or SyncTimer()
+    # Daftar orphan yang sudah dilaporkan, disimpan setelah sync ter-commit
+    known_orphans = None
+
     try:
+        if df.empty:
+            # Window otoritatif: mutations yang masih tersimpan di window ini
+            # sudah dihapus upstream
+            print("INFO - No mutations in window upstream")
+            with engine.connect() as conn:
+                ensure_sync_logs_columns(conn)
+                with timer.phase("merge"):
+                    changed = merge_mutations(conn, df, window, timer)
+                write_sync_log(
+                    "mutations",
+                    0,
+                    "success" if changed else "unchanged",
+                    watermark=watermark,
+                    timer=timer,
+                    conn=conn,
+                    sync_mode=sync_mode,
+                )
+                conn.commit()
+            if changed:
+                publish_snapshot_file("mutations")
+            return True
+
         print(f"PROCESS - Processing {len(df)} mutation records...")
 
         # Convert seamancode to integer untuk matching dengan database
-        print("Converting seamancode to integer...")
-        df["seamancode"] = (
-            pd.to_numeric(df["seamancode"], errors="coerce").fillna(0).astype(int)
-        )
-
-        # Convert date columns
-        if "transactiondate" in df.columns:
-            print("Converting transactiondate format...")
-            df["transactiondate"] = pd.to_datetime(
-                df["transactiondate"], errors="coerce"
-            )
+        # dan transactiondate ke datetime (no-op jika sudah saat fetch)
+        print("Converting seamancode and transactiondate...")
+        with timer.phase("convert"):
+            df = convert_mutation_columns(df)
 
         print("DONE - Data conversion completed")
 
@@ -564,100 +3139,117 @@ def sync_mutations_to_database(df):
             # Set statement timeout lebih tinggi (10 menit)
             print("SETTING - Setting statement timeout to 10 minutes...")
             conn.execute(text("SET statement_timeout = '600000';"))
-
-            # Get valid seamancodes from seamen table
-            print("FETCHING - Fetching valid seamancodes from seamen table...")
-            valid_seamancodes = pd.read_sql_query(
-                text("SELECT seamancode FROM seamen"), conn
-            )["seamancode"].tolist()
-            print(f"   Found {len(valid_seamancodes)} valid seamancodes")
-
-            # Identify orphaned records BEFORE filtering
-            print("IDENTIFYING - Checking for orphaned mutation records...")
-            orphaned_df = df[~df["seamancode"].isin(valid_seamancodes)]
-
-            if len(orphaned_df) > 0:
-                # Group by seamancode and get names
-                orphaned_summary = (
-                    orphaned_df.groupby(["seamancode", "seamanname"])
-                    .size()
-                    .reset_index(name="mutation_count")
-                )
-
-                orphaned_records = [
-                    (row["seamancode"], row["seamanname"], row["mutation_count"])
-                    for _, row in orphaned_summary.iterrows()
-                ]
-
-                print(
-                    f"WARNING - Found {len(orphaned_records)} seamen with orphaned mutations"
+            ensure_sync_logs_columns(conn)
+
+            with timer.phase("orphans"):
+                # Get valid seamancodes from seamen table
+                print("FETCHING - Fetching valid seamancodes from seamen table...")
+                valid_seamancodes = pd.read_sql_query(
+                    text("SELECT seamancode FROM seamen"), conn
+                )["seamancode"].to_numpy()
+                print(f"   Found {len(valid_seamancodes)} valid seamancodes")
+
+                # Pisahkan orphaned records dan ringkas dalam satu pass
+                print("IDENTIFYING - Checking for orphaned mutation records...")
+                df, orphaned_summary, orphaned_count = find_orphaned_mutations(
+                    df, valid_seamancodes
                 )
-                print(f"          Total orphaned mutation records: {len(orphaned_df)}")
-
-                # Save orphaned records report to database
-                save_orphaned_records_report(orphaned_records, len(orphaned_df))
-            else:
-                print("INFO - No orphaned mutation records found")
 
-            # Filter mutations to only include valid seamancodes
-            original_count = len(df)
-            df = df[df["seamancode"].isin(valid_seamancodes)]
-            filtered_count = original_count - len(df)
+                if orphaned_count > 0:
+                    print(
+                        f"WARNING - Found {len(orphaned_summary)} seamen with orphaned mutations"
+                    )
+                    print(
+                        f"          Total orphaned mutation records: {orphaned_count}"
+                    )
 
-            if filtered_count > 0:
-                print(
-                    f"WARNING - Filtered out {filtered_count} mutations with invalid seamancode"
-                )
+                    # Laporan hanya untuk orphan baru sejak laporan sebelumnya
+                    new_orphans, known_orphans = select_new_orphans(
+                        orphaned_summary, valid_seamancodes
+                    )
+                    if new_orphans.empty:
+                        print("INFO - No new orphaned seamen since previous report")
+                    elif not save_orphaned_records_report(
+                        list(new_orphans.itertuples(index=False, name=None)),
+                        int(new_orphans["mutation_count"].sum()),
+                    ):
+                        # Laporan gagal: orphan baru dilaporkan lagi sync berikutnya
+                        known_orphans = None
+
+                    print(
+                        f"WARNING - Filtered out {orphaned_count} mutations with invalid seamancode"
+                    )
+                else:
+                    print("INFO - No orphaned mutation records found")
 
-            print(f"PROCESS - Proceeding with {len(df)} valid mutation records")
+                print(f"PROCESS - Proceeding with {len(df)} valid mutation records")
 
-            if len(df) == 0:
+            if len(df) == 0 and not incremental:
                 print("WARNING - No valid mutations to insert, skipping...")
                 return False
 
-            # Gunakan DELETE instead of TRUNCATE
-            print("Starting DELETE operation...")
-            conn.execute(text("DELETE FROM mutations"))
-            conn.commit()
-            print("DONE - DELETE completed")
-
-            # Batch insert untuk data besar
-            batch_size = 1000
-            total_batches = (len(df) + batch_size - 1) // batch_size
-
-            print(f"Starting INSERT operation in {total_batches} batches...")
-            for i in range(0, len(df), batch_size):
-                batch_df = df.iloc[i : i + batch_size]
-                batch_num = (i // batch_size) + 1
-                print(
-                    f"   Inserting batch {batch_num}/{total_batches} ({len(batch_df)} rows)..."
+            with timer.phase("hash"):
+                # Hanya isi baris: awal window bergeser tiap malam sehingga
+                # hash yang ikut memuat window tidak pernah sama
+                content_hash = compute_content_hash(df, "mutationnoid")
+                last_state = get_last_sync_state("mutations", conn)
+
+            if last_state is not None and last_state["content_hash"] == content_hash:
+                print("INFO - Mutations content unchanged since last sync")
+                write_sync_log(
+                    "mutations",
+                    0,
+                    "unchanged",
+                    watermark=watermark,
+                    timer=timer,
+                    conn=conn,
+                    content_hash=content_hash,
+                    sync_mode=sync_mode,
                 )
-                batch_df.to_sql("mutations", conn, if_exists="append", index=False)
                 conn.commit()
-
-            print("DONE - INSERT completed")
+                if known_orphans is not None:
+                    save_known_orphans(known_orphans)
+                print("=" * 60)
+                return True
+
+            changed = None
+            if incremental:
+                with timer.phase("merge"):
+                    changed = merge_mutations(conn, df, window, timer)
+            else:
+                # Load ke staging, tabel mutations lama tetap terbaca sampai swap
+                with timer.phase("load"):
+                    staging = create_staging_table(conn, "mutations")
+                    load_mutations(conn, df, staging, timer=timer)
+                with timer.phase("constraints"):
+                    build_staging_constraints(conn, "mutations")
+                with timer.phase("swap"):
+                    swap_staging_table(conn, "mutations", len(df))
+
+            print("DONE - Load completed")
             print(f"DONE - Synced {len(df)} mutation records to database")
             print("=" * 60)
 
             # Log sync time
-            sync_log = {
-                "table_name": "mutations",
-                "records_synced": len(df),
-                "sync_timestamp": datetime.now(),
-                "status": "success",
-            }
-            conn.execute(
-                text(
-                    """
-                INSERT INTO sync_logs (table_name, records_synced, sync_timestamp, status)
-                VALUES (:table_name, :records_synced, :sync_timestamp, :status)
-            """
-                ),
-                sync_log,
+            write_sync_log(
+                "mutations",
+                len(df),
+                "success" if changed != 0 else "unchanged",
+                watermark=watermark,
+                timer=timer,
+                conn=conn,
+                content_hash=content_hash,
+                sync_mode=sync_mode,
             )
             conn.commit()
+            if known_orphans is not None:
+                save_known_orphans(known_orphans)
 
-            return True
+        # Tulis file snapshot untuk worker API (hanya jika ada perubahan)
+        if changed != 0:
+            publish_snapshot_file("mutations")
+
+        return True
 
     except Exception as e:
         print(f"FAIL - Error syncing mutations to database: {str(e)}")
@@ -665,27 +3257,14 @@ def sync_mutations_to_database(df):
 
         # Log error
         try:
-            with engine.connect() as conn:
-                error_log = {
-                    "table_name": "mutations",
-                    "records_synced": 0,
-                    "sync_timestamp": datetime.now(),
-                    "status": "failed",
-                    "error_message": str(e)[:500],
-                }
-                conn.execute(
-                    text(
-                        """
-                    INSERT INTO sync_logs (table_name, records_synced, sync_timestamp, status, error_message)
-                    VALUES (:table_name, :records_synced, :sync_timestamp, :status, :error_message)
-                """
-                    ),
-                    error_log,
-                )
-                conn.commit()
+            write_sync_log(
+                "mutations", 0, "failed", error_message=str(e)[:500], timer=timer
+            )
         except Exception:
             pass
 
+        if raise_errors:
+            raise
         return False
 
 
@@ -694,50 +3273,287 @@ def sync_mutations_to_database(df):
 # ============================================================================
 
 
-def scheduled_sync_seamen():
-    """Job untuk sync seamen - dijalankan setiap 00.01"""
-    df = fetch_seamen_from_original_api()
-    if df is not None:
-        sync_seamen_to_database(df)
-    else:
-        print("FAIL - Failed to fetch seamen data, skipping sync")
+# Lease sync per tabel (Postgres advisory lock, session-level) supaya proses
+# scheduler, manual_sync_all dan container yang restart tidak sync tabel yang
+# sama bersamaan. Policy "skip": langsung lewati jika lease dipegang proses
+# lain; "wait": antri sampai SYNC_LOCK_WAIT detik lalu lewati.
+# Butuh koneksi session (bukan pooler mode transaction).
+SYNC_LOCK_POLICY = os.getenv("SYNC_LOCK_POLICY", "skip").lower()
+SYNC_LOCK_WAIT = float(os.getenv("SYNC_LOCK_WAIT", "1800"))
+SYNC_LOCK_POLL_INTERVAL = 5
 
+# Key advisory lock: (SYNC_LOCK_CLASS, id tabel)
+SYNC_LOCK_CLASS = 8048
+SYNC_LOCK_IDS = {"seamen": 1, "mutations": 2}
 
-def scheduled_sync_mutations():
-    """Job untuk sync mutations - dijalankan setiap 00.01"""
-    df = fetch_mutations_from_original_api()
-    if df is not None:
-        sync_mutations_to_database(df)
-    else:
-        print("FAIL - Failed to fetch mutations data, skipping sync")
+
+def get_sync_lease_holders():
+    """
+    Proses yang sedang memegang lease sync per tabel
+
+    Returns:
+        Dict table_name -> dict pid, holder (application_name), client_addr,
+        acquired_at, atau None jika lease bebas
+    """
+    query = text(
+        """
+        SELECT l.objid::int, a.pid, a.application_name, a.client_addr::text,
+               a.state_change
+        FROM pg_locks l
+        JOIN pg_stat_activity a ON a.pid = l.pid
+        WHERE l.locktype = 'advisory' AND l.granted
+          AND l.classid::int = :class_id AND l.objsubid = 2
+    """
+    )
+    tables = {lock_id: table for table, lock_id in SYNC_LOCK_IDS.items()}
+    holders = {table: None for table in SYNC_LOCK_IDS}
+
+    with engine.connect() as conn:
+        for row in conn.execute(query, {"class_id": SYNC_LOCK_CLASS}):
+            if row[0] in tables:
+                holders[tables[row[0]]] = {
+                    "pid": row[1],
+                    "holder": row[2],
+                    "client_addr": row[3],
+                    # Koneksi lease idle sejak lock diambil
+                    "acquired_at": row[4].isoformat() if row[4] else None,
+                }
+
+    return holders
+
+
+@contextmanager
+def sync_lease(table_name, holder, policy=None, wait=None):
+    """
+    Pegang lease sync table_name selama blok with
+
+    Lock dipegang di koneksi tersendiri (application_name menandai pemegang
+    lease) dan otomatis lepas jika proses mati.
+
+    Args:
+        holder: Nama job pemegang lease (misalnya "scheduler", "manual")
+        policy: "skip" atau "wait" (default: SYNC_LOCK_POLICY)
+        wait: Batas antri dalam detik untuk policy "wait" (default: SYNC_LOCK_WAIT)
+
+    Yields:
+        True jika lease didapat, False jika dilewati
+    """
+    policy = policy or SYNC_LOCK_POLICY
+    wait = SYNC_LOCK_WAIT if wait is None else wait
+    key = {"class_id": SYNC_LOCK_CLASS, "lock_id": SYNC_LOCK_IDS[table_name]}
+    name = f"spm-sync:{table_name}:{holder}:{socket.gethostname()}:{os.getpid()}"
+
+    conn = engine.connect()
+    acquired = False
+    try:
+        deadline = time.monotonic() + (wait if policy == "wait" else 0)
+        while True:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:class_id, :lock_id)"), key
+            ).scalar()
+            conn.commit()
+            if acquired or time.monotonic() >= deadline:
+                break
+
+            current = get_sync_lease_holders()[table_name]
+            print(
+                f"WAITING - {table_name} sync lease held by "
+                f"{current['holder'] if current else 'another process'}..."
+            )
+            time.sleep(SYNC_LOCK_POLL_INTERVAL)
+
+        if not acquired:
+            current = get_sync_lease_holders()[table_name]
+            print(
+                f"SKIP - {table_name} sync already running "
+                f"({current['holder'] if current else 'another process'}), skipping"
+            )
+            yield False
+            return
+
+        conn.execute(
+            text("SELECT set_config('application_name', :name, false)"),
+            {"name": name[:63]},
+        )
+        conn.commit()
+        print(f"DONE - Acquired {table_name} sync lease ({holder})")
+        yield True
+
+    finally:
+        if acquired:
+            try:
+                conn.execute(
+                    text("SELECT pg_advisory_unlock(:class_id, :lock_id)"), key
+                )
+                conn.execute(text("SELECT set_config('application_name', '', false)"))
+                conn.commit()
+            except Exception as e:
+                # Buang koneksi supaya lock pasti lepas
+                print(f"WARNING - Failed to release {table_name} sync lease: {str(e)}")
+                conn.invalidate()
+        conn.close()
+
+
+# Retry fase sync database (backoff: SYNC_RETRY_BACKOFF * 2^percobaan detik)
+SYNC_RETRY_ATTEMPTS = int(os.getenv("SYNC_RETRY_ATTEMPTS", "3"))
+SYNC_RETRY_BACKOFF = float(os.getenv("SYNC_RETRY_BACKOFF", "10"))
+
+
+def run_with_retries(label, func, *args):
+    """
+    Jalankan func, ulangi hanya jika func melempar exception
+
+    Hasil None/False (misalnya payload kosong) bersifat deterministik dan
+    langsung dikembalikan tanpa retry. func harus melempar error yang bisa
+    sementara (request, koneksi database), lihat parameter raise_errors
+    pada fungsi fetch/sync.
+
+    Returns:
+        Hasil func, atau None jika semua percobaan melempar exception
+    """
+    for attempt in range(SYNC_RETRY_ATTEMPTS):
+        if attempt:
+            delay = SYNC_RETRY_BACKOFF * 2 ** (attempt - 1)
+            print(f"RETRY - {label} attempt {attempt + 1} in {delay:.0f}s...")
+            time.sleep(delay)
+
+        try:
+            return func(*args)
+        except Exception as e:
+            print(f"FAIL - {label}: {str(e)}")
+
+    return None
+
+
+def sync_all(holder="scheduler"):
+    """
+    Sync seamen dan mutations dalam satu job
+
+    Kedua dataset di-fetch paralel dari API asli. Fase database berjalan
+    berurutan: seamen dulu, karena sync mutations membaca tabel seamen
+    untuk mendeteksi orphan. Fetch mutations tetap berjalan selama seamen
+    ditulis, sehingga total waktu ~ fetch terlama + waktu tulis.
+
+    Tiap tabel hanya di-fetch dan di-sync jika lease-nya (sync_lease) didapat.
+    Lease mutations hanya diambil setelah lease seamen didapat: tanpa itu
+    deteksi orphan membaca tabel seamen yang sedang ditulis proses lain.
+
+    Args:
+        holder: Nama job untuk lease ("scheduler" atau "manual")
+
+    Returns:
+        Dict hasil per tabel (True/False, None jika dilewati karena lease
+        dipegang proses lain)
+    """
+    # Urutan lease selalu seamen lalu mutations (tidak saling menunggu)
+    with sync_lease("seamen", holder) as seamen_leased:
+        if not seamen_leased:
+            print("SKIP - Mutations sync needs the seamen lease, skipping")
+            return {"seamen": None, "mutations": None}
+
+        with sync_lease("mutations", holder) as mutations_leased:
+            return _sync_all({"seamen": True, "mutations": mutations_leased})
+
+
+def _sync_all(leased):
+    start = time.perf_counter()
+    results = {table: False if leased[table] else None for table in leased}
+    seamen_timer = SyncTimer()
+    mutations_timer = SyncTimer()
+
+    window = None
+    if leased["mutations"]:
+        try:
+            window = get_mutations_window()
+        except Exception as e:
+            print(f"FAIL - Failed to read mutations watermark: {str(e)}")
+
+    seamen_validators = None
+    if leased["seamen"]:
+        try:
+            seamen_validators = get_upstream_validators("seamen")
+        except Exception as e:
+            print(f"WARNING - Failed to read upstream validators: {str(e)}")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        seamen_future = None
+        if leased["seamen"]:
+            seamen_future = executor.submit(
+                seamen_timer.timed,
+                "fetch",
+                run_with_retries,
+                "Fetch seamen",
+                partial(fetch_seamen_from_original_api, raise_errors=True),
+                seamen_validators,
+            )
+        mutations_future = None
+        if window is not None:
+            mutations_future = executor.submit(
+                mutations_timer.timed,
+                "fetch",
+                run_with_retries,
+                "Fetch mutations",
+                partial(fetch_mutations_from_original_api, raise_errors=True),
+                window["date_from"],
+                window["date_to"],
+            )
+
+        if seamen_future is not None:
+            seamen_df = seamen_future.result()
+            if seamen_df is not None:
+                results["seamen"] = bool(
+                    run_with_retries(
+                        "Sync seamen",
+                        partial(sync_seamen_to_database, raise_errors=True),
+                        seamen_df,
+                        None,
+                        seamen_timer,
+                    )
+                )
+            else:
+                print("FAIL - Failed to fetch seamen data, skipping sync")
+
+        if leased["mutations"]:
+            mutations_df = mutations_future.result() if mutations_future else None
+            if mutations_df is not None:
+                results["mutations"] = bool(
+                    run_with_retries(
+                        "Sync mutations",
+                        partial(sync_mutations_to_database, raise_errors=True),
+                        mutations_df,
+                        window,
+                        mutations_timer,
+                    )
+                )
+            else:
+                print("FAIL - Failed to fetch mutations data, skipping sync")
+
+    print(
+        f"DONE - Sync finished in {time.perf_counter() - start:.1f}s "
+        f"(seamen: {results['seamen']}, mutations: {results['mutations']})"
+    )
+    return results
 
 
 def start_scheduler():
     """Mulai scheduler untuk sync otomatis setiap 00.01"""
     scheduler = BlockingScheduler()
 
-    # Sync seamen setiap pukul 00.01
-    scheduler.add_job(
-        scheduled_sync_seamen,
-        CronTrigger(hour=0, minute=1),
-        id="sync_seamen_job",
-        name="Sync Seamen Data dari Original API",
-        replace_existing=True,
-    )
-
-    # Sync mutations setiap pukul 00.01
+    # Sync seamen + mutations setiap pukul 00.01 (satu job, urutan terjaga)
     scheduler.add_job(
-        scheduled_sync_mutations,
+        sync_all,
         CronTrigger(hour=0, minute=1),
-        id="sync_mutations_job",
-        name="Sync Mutations Data dari Original API",
+        id="sync_all_job",
+        name="Sync Seamen & Mutations Data dari Original API",
         replace_existing=True,
+        # Jadwal yang terlewat (misalnya saat restart) dijalankan sekali saja
+        coalesce=True,
+        max_instances=1,
     )
 
     print("\nDONE - Scheduler started successfully!")
     print("Jobs scheduled:")
-    print("   - Seamen sync: Every day at 00:01")
-    print("   - Mutations sync: Every day at 00:01")
+    print("   - Seamen + mutations sync: Every day at 00:01")
     print("\nWaiting for scheduled time... (Press Ctrl+C to stop)\n")
 
     try:
@@ -749,8 +3565,7 @@ def start_scheduler():
 def manual_sync_all():
     """Sync manual semua data (untuk testing)"""
     print("\nManual sync initiated...\n")
-    scheduled_sync_seamen()
-    scheduled_sync_mutations()
+    sync_all(holder="manual")
     print("\nDONE - Manual sync completed!\n")
 
 
@@ -1236,6 +4051,22 @@ def delete_rotation_config(config_id):
         raise Exception(f"Failed to delete rotation config: {str(e)}")
 
 
+def get_rotation_configs_version():
+    """
+    Versi data rotation configs (berubah setiap create/update/delete)
+
+    Returns:
+        String gabungan jumlah config dan waktu create/update terakhir
+    """
+    query = """
+        SELECT COUNT(*), MAX(created_at), MAX(updated_at)
+        FROM rotation_configs
+    """
+    with engine.connect() as conn:
+        count, created_at, updated_at = conn.execute(text(query)).one()
+    return f"{count}:{created_at}:{updated_at}"
+
+
 # ============================================================================
 # BAGIAN 6: MAIN EXECUTION
 # ============================================================================
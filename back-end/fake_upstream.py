@@ -0,0 +1,289 @@
+# Pengganti lokal API asli (nanika) untuk test dan benchmark sync
+# Jalankan: python fake_upstream.py --scale 10 --port 3099
+# lalu set UPSTREAM_API_URL=http://127.0.0.1:3099 sebelum menjalankan sync.
+#
+# /get-seamen dan /get-mutation mengembalikan JSON dengan bentuk yang sama
+# seperti API asli ({"data_seamen": [...]} dan {"data_mutation": [...]}).
+# Data dibangkitkan deterministik dari --seed. Skala 1x mengikuti armada saat
+# ini: ~2.000 seamen dan ~32.000 mutations sejak 2020, dengan lebih dari
+# separuh seamancode di mutations sudah tidak ada di data seamen (orphan).
+
+import argparse
+import hashlib
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import orjson
+import pandas as pd
+from flask import Flask, Response, request
+
+BASE_SEAMEN = 2000
+BASE_MUTATIONS = 32000
+
+# Seaman lama (hanya muncul di mutations) per seaman aktif
+FORMER_SEAMEN_RATIO = 1.3
+
+MUTATIONS_START = date(2020, 1, 1)
+UPSTREAM_DATE_FORMAT = "%d/%m/%Y"
+
+VESSELS = [
+    ("MPR", "KM. MANALAGI PRITA"),
+    ("MAS", "KM. MANALAGI ASTA"),
+    ("MAI", "KM. MANALAGI ASTI"),
+    ("MDS", "KM. MANALAGI DASA"),
+    ("MEN", "KM. MANALAGI ENZI"),
+    ("MTR", "KM. MANALAGI TARA"),
+    ("MWD", "KM. MANALAGI WANDA"),
+    ("MTS", "KM. MANALAGI TISYA"),
+    ("MSB", "KM. MANALAGI SAMBA"),
+    ("MHT", "KM. MANALAGI HITA"),
+    ("MVR", "KM. MANALAGI VIRA"),
+    ("MYS", "KM. MANALAGI YASA"),
+    ("OEM", "KM. ORIENTAL EMERALD"),
+    ("ORB", "KM. ORIENTAL RUBY"),
+    ("OSL", "KM. ORIENTAL SILVER"),
+    ("OGD", "KM. ORIENTAL GOLD"),
+    ("OJD", "KM. ORIENTAL JADE"),
+    ("ODM", "KM. ORIENTAL DIAMOND"),
+    ("LZN", "KM. LUZON"),
+    ("VRZ", "KM. VERIZON"),
+    ("KLE", "KM. KALIMANTAN LEADER"),
+    ("TYY", "TB. YITNA YUWANA"),
+]
+
+# Lokasi non-kapal (asal/tujuan mutasi darat dan pending)
+SHORE_LOCATIONS = [
+    ("PENDING", "PENDING CUTI"),
+    ("PENDING", "PENDING GAJI"),
+    ("DR", "DARAT BIASA"),
+    ("DR", "DARAT STAND-BY"),
+    ("DR", "DARAT"),
+]
+
+RANKS = [
+    (1, "NAKHODA"),
+    (2, "MUALIM I"),
+    (3, "MUALIM II"),
+    (4, "MUALIM III"),
+    (5, "KKM"),
+    (6, "MASINIS I"),
+    (7, "MASINIS II"),
+    (8, "MASINIS III"),
+    (9, "MASINIS IV"),
+    (10, "SERANG"),
+    (11, "JURU MUDI"),
+    (12, "JURU MINYAK"),
+    (13, "JURU MASAK I"),
+    (14, "ELECTRICIAN"),
+    (18, "PELAYAN"),
+]
+
+# Jenis mutasi dengan bobot dari data mutations asli
+JENIS = {
+    "Mutasi Normal/General": 9224,
+    "Abk Pending Cuti": 5696,
+    "Mutasi ke Darat": 4639,
+    "Abk Pending Biasa": 3888,
+    "Resignation": 3723,
+    "Mutasi Awal Kerja": 2096,
+    "Re-entry": 1702,
+    "Mutasi Stand-by Crew": 1190,
+}
+
+CERTIFICATES = ["BASIC SAFETY TRAINING", "ANT-D", "ANT-III", "ATT-D", "ATT-III"]
+CERTIFICATES += ["ANT-II", "ATT-II", "ANT-I", "ATT-I", "ETO"]
+EXPERIENCES = ["<3 BULAN", "3-6 BULAN", "6-9 BULAN", ">9 BULAN"]
+EDU_LEVELS = ["SD/SMP", "SMA/SMK/SLTA", "D4/S1"]
+
+
+def _phone_numbers(rng, count, missing_ratio):
+    numbers = np.char.add("08", rng.integers(10**9, 10**10, count).astype(str))
+    return np.where(rng.random(count) < missing_ratio, "-", numbers)
+
+
+class FakeUpstream:
+    """
+    Data seamen dan mutations buatan untuk satu skala armada
+
+    Payload seamen dibangun sekali (di-cache). Mutations dibangkitkan per
+    hari dengan seed (seed, hari), sehingga window tanggal berapa pun selalu
+    menghasilkan record yang sama tanpa menyimpan seluruh riwayat di memori.
+    """
+
+    def __init__(self, scale=1, seed=0, today=None, etag=True):
+        self.scale = scale
+        self.seed = seed
+        self.etag = etag
+        self.today = today or date.today()
+
+        seamen_count = int(BASE_SEAMEN * scale)
+        former_count = int(seamen_count * FORMER_SEAMEN_RATIO)
+
+        rng = np.random.default_rng([seed, 0])
+        codes = 20000000 + rng.choice(
+            9000000, size=seamen_count + former_count, replace=False
+        )
+        self.seamancodes = codes[:seamen_count]
+        self.all_seamancodes = codes
+
+        days = (self.today - MUTATIONS_START).days + 1
+        self.mutations_per_day = BASE_MUTATIONS * scale / days
+
+        self._seamen_body = None
+
+    def seamen_frame(self):
+        """DataFrame seamen dengan kolom dan format seperti API asli"""
+        rng = np.random.default_rng([self.seed, 1])
+        count = len(self.seamancodes)
+        today = pd.Timestamp(self.today)
+
+        start = today - pd.to_timedelta(rng.integers(0, 365, count), unit="D")
+        end = start + pd.to_timedelta(rng.integers(180, 400, count), unit="D")
+        vessel_names = [name for _, name in VESSELS + SHORE_LOCATIONS]
+
+        return pd.DataFrame(
+            {
+                "age": rng.integers(19, 60, count),
+                "certificate": rng.choice(CERTIFICATES, count),
+                "day_remains": (end - today).days,
+                "edu_level": rng.choice(EDU_LEVELS, count, p=[0.95, 0.04, 0.01]),
+                "end_date": end.strftime(UPSTREAM_DATE_FORMAT),
+                "experience": rng.choice(EXPERIENCES, count),
+                "gender": "Pria",
+                "last_location": rng.choice(vessel_names, count),
+                "last_position": rng.choice([name for _, name in RANKS], count),
+                "name": [f"SEAMAN {code}" for code in self.seamancodes],
+                "no": np.arange(1, count + 1),
+                "phone_number_1": _phone_numbers(rng, count, 0.2),
+                "phone_number_2": _phone_numbers(rng, count, 0.6),
+                "phone_number_3": _phone_numbers(rng, count, 0.8),
+                "phone_number_4": _phone_numbers(rng, count, 0.95),
+                "seafarercode": (6200000000 + self.seamancodes).astype(str),
+                "seamancode": self.seamancodes,
+                "start_date": start.strftime(UPSTREAM_DATE_FORMAT),
+                "status": rng.choice(["ON BOARD", "OFF"], count, p=[0.9, 0.1]),
+            }
+        )
+
+    def mutations_frame(self, day):
+        """DataFrame mutations untuk satu tanggal transaksi"""
+        rng = np.random.default_rng([self.seed, 2, day.toordinal()])
+        count = int(rng.poisson(self.mutations_per_day))
+
+        codes = rng.choice(self.all_seamancodes, count)
+        from_location = rng.integers(0, len(VESSELS) + len(SHORE_LOCATIONS), count)
+        to_location = rng.integers(0, len(VESSELS) + len(SHORE_LOCATIONS), count)
+        from_rank = rng.integers(0, len(RANKS), count)
+        # Sebagian besar mutasi tetap di jabatan yang sama
+        promoted = rng.random(count) < 0.1
+        to_rank = np.where(promoted, np.maximum(from_rank - 1, 0), from_rank)
+
+        locations = np.array(VESSELS + SHORE_LOCATIONS, dtype=object)
+        ranks = np.array(RANKS, dtype=object)
+        weights = np.array(list(JENIS.values()), dtype=float)
+
+        return pd.DataFrame(
+            {
+                "fromrankcode": ranks[from_rank, 0].astype(int),
+                "fromrankname": ranks[from_rank, 1],
+                "fromvesselcode": locations[from_location, 0],
+                "fromvesselname": locations[from_location, 1],
+                "jenis": rng.choice(list(JENIS), count, p=weights / weights.sum()),
+                "mutationnoid": int(day.strftime("%Y%m%d")) * 10**7 + np.arange(count),
+                "seamancode": codes,
+                "seamanname": [f"SEAMAN {code}" for code in codes],
+                "torankcode": ranks[to_rank, 0].astype(int),
+                "torankname": ranks[to_rank, 1],
+                "tovesselcode": locations[to_location, 0],
+                "tovesselname": locations[to_location, 1],
+                "transactiondate": f"{day.isoformat()}T00:00:00Z",
+            }
+        )
+
+    def seamen_body(self):
+        if self._seamen_body is None:
+            records = self.seamen_frame().to_dict(orient="records")
+            self._seamen_body = orjson.dumps(
+                {"data_seamen": records}, option=orjson.OPT_SERIALIZE_NUMPY
+            )
+        return self._seamen_body
+
+    def mutations_body(self, date_from, date_to):
+        """Payload mutations dengan transactiondate di [date_from, date_to)"""
+        date_from = max(date_from, MUTATIONS_START)
+        date_to = min(date_to, self.today + timedelta(days=1))
+
+        records = []
+        day = date_from
+        while day < date_to:
+            records.extend(self.mutations_frame(day).to_dict(orient="records"))
+            day += timedelta(days=1)
+
+        return orjson.dumps(
+            {"data_mutation": records}, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def _parse_date(value, default):
+    try:
+        return datetime.strptime(value, UPSTREAM_DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        return default
+
+
+def create_app(upstream):
+    app = Flask(__name__)
+
+    @app.route("/")
+    def index():
+        return {
+            "status": "ok",
+            "scale": upstream.scale,
+            "seamen": len(upstream.seamancodes),
+        }
+
+    # API asli memakai GET dengan body JSON
+    @app.route("/get-seamen", methods=["GET", "POST"])
+    def get_seamen():
+        body = upstream.seamen_body()
+        response = Response(body, mimetype="application/json")
+        if upstream.etag:
+            # Conditional request: 304 jika If-None-Match cocok
+            response.set_etag(hashlib.sha1(body).hexdigest())
+            return response.make_conditional(request)
+        return response
+
+    # transaction_date_2 eksklusif, sama seperti asumsi fetch_mutations_chunk
+    @app.route("/get-mutation", methods=["GET", "POST"])
+    def get_mutation():
+        payload = request.get_json(force=True, silent=True) or {}
+        date_from = _parse_date(payload.get("transaction_date_1"), MUTATIONS_START)
+        date_to = _parse_date(
+            payload.get("transaction_date_2"), upstream.today + timedelta(days=1)
+        )
+        return Response(
+            upstream.mutations_body(date_from, date_to), mimetype="application/json"
+        )
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake upstream API untuk sync")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3099)
+    parser.add_argument("--no-etag", action="store_true", help="Tanpa ETag/304")
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(args.scale, args.seed, etag=not args.no_etag)
+    print(f"Building seamen payload ({len(upstream.seamancodes)} seamen)...")
+    upstream.seamen_body()
+
+    print(f"Fake upstream running on http://{args.host}:{args.port}")
+    create_app(upstream).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from datetime import datetime
 import pandas as pd
 from sqlalchemy import text
 
-from database import engine, test_connection
+from database import engine, ensure_sync_logs_columns, test_connection
 
 
 def clean_phone_number(phone):
@@ -61,6 +61,19 @@ def migrate():
         with engine.connect() as conn:
             conn.execute(text("DROP TABLE IF EXISTS mutations CASCADE"))
             conn.execute(text("DROP TABLE IF EXISTS seamen CASCADE"))
+            # Hash baris sync incremental harus dibangun ulang dari data baru
+            conn.execute(text("DROP TABLE IF EXISTS seamen_row_hashes"))
+            # Content hash/ETag sync sebelumnya tidak berlaku untuk data CSV
+            ensure_sync_logs_columns(conn)
+            conn.execute(
+                text(
+                    """
+                UPDATE sync_logs
+                SET content_hash = NULL, upstream_etag = NULL,
+                    upstream_last_modified = NULL
+            """
+                )
+            )
             conn.commit()
         print("Old tables dropped")
 
@@ -1,9 +1,10 @@
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 from gensim.models import Word2Vec
-from sklearn.metrics.pairwise import cosine_similarity
 
 KELOMPOK = {
     "container": [
@@ -132,6 +133,210 @@ def load_word2vec_model(model_path="word2vec_model.model"):
         print(f"Error loading Word2Vec model: {e}")
 
 
+def get_word2vec_vector(model, text):
+    """
+    Rata-rata vektor Word2Vec dari kata-kata di text
+
+    Returns:
+        Vektor float32, atau vektor nol jika text bukan string atau tidak ada
+        kata yang dikenal model
+    """
+    if not isinstance(text, str):
+        return np.zeros(model.vector_size, dtype=np.float32)
+    word_vectors = [model.wv[word] for word in text.split() if word in model.wv]
+    if word_vectors:
+        return np.mean(word_vectors, axis=0, dtype=np.float32)
+    return np.zeros(model.vector_size, dtype=np.float32)
+
+
+def normalize_rows(vectors):
+    """Normalisasi L2 per baris, baris nol tetap nol (seperti cosine_similarity)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def crew_features(df):
+    """Teks fitur "last_position certificate" per baris crew"""
+    return df["last_position"].astype(str) + " " + df["certificate"].astype(str)
+
+
+# Batas jumlah teks yang di-memo per model (query dari input pengguna ikut
+# di-memo, jadi dibatasi agar tidak tumbuh tanpa batas)
+TEXT_EMBEDDINGS_MAX_SIZE = 10000
+
+
+class TextEmbeddings:
+    """
+    Memo embedding ternormalisasi (float32) per teks untuk satu model Word2Vec
+
+    Kombinasi last_position + certificate hanya puluhan sampai ratusan teks
+    berbeda, jadi tiap teks cukup di-tokenize dan dirata-rata sekali per
+    model yang dimuat.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._vectors = {}
+
+    def vector(self, text):
+        vector = self._vectors.get(text)
+        if vector is None:
+            vector = normalize_rows(get_word2vec_vector(self.model, text))
+            if len(self._vectors) < TEXT_EMBEDDINGS_MAX_SIZE:
+                self._vectors[text] = vector
+        return vector
+
+    def matrix(self, texts):
+        """Matriks (len(texts), vector_size) embedding ternormalisasi"""
+        matrix = np.empty((len(texts), self.model.vector_size), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.vector(text)
+        return matrix
+
+
+_text_embeddings = None
+_text_embeddings_lock = threading.Lock()
+
+
+def get_text_embeddings(model):
+    """TextEmbeddings untuk model, dibuat ulang jika model dimuat ulang"""
+    global _text_embeddings
+
+    with _text_embeddings_lock:
+        if _text_embeddings is None or _text_embeddings.model is not model:
+            _text_embeddings = TextEmbeddings(model)
+        return _text_embeddings
+
+
+class CrewEmbeddings:
+    """
+    Embedding crew untuk satu versi DataFrame crew dan model Word2Vec
+
+    features adalah kolom kategori crew_features: codes per baris crew
+    menunjuk ke categories (teks berbeda), dan matrix berisi embedding
+    ternormalisasi per kategori. Cosine similarity seluruh crew terhadap
+    satu query dihitung per kategori lalu di-gather lewat codes.
+    """
+
+    def __init__(self, df, model):
+        self.data = df
+        self.model = model
+        self.features = pd.Categorical(crew_features(df))
+        self.codes = self.features.codes
+        self.matrix = get_text_embeddings(model).matrix(self.features.categories)
+
+    def positions(self, index):
+        """
+        Posisi baris untuk label index dari subset self.data
+
+        Returns:
+            Array posisi, atau None jika ada label yang tidak bisa dipetakan
+        """
+        if not self.data.index.is_unique:
+            return None
+        positions = self.data.index.get_indexer(index)
+        if (positions < 0).any():
+            return None
+        return positions
+
+    def scores(self, text, positions=None):
+        """
+        Cosine similarity antara text dan setiap baris crew
+
+        Args:
+            text: Teks query ("rank certificate")
+            positions: Optional array posisi baris (default semua baris)
+
+        Returns:
+            Array float64 sepanjang positions (atau seluruh crew)
+        """
+        query = get_text_embeddings(self.model).vector(text)
+        category_scores = (self.matrix @ query).astype(np.float64)
+        codes = self.codes if positions is None else self.codes[positions]
+        return category_scores[codes]
+
+
+# Embedding crew per (DataFrame, model); beberapa entri karena snapshot
+# seamen dan original_df app.py bisa berbeda objek
+CREW_EMBEDDINGS_CACHE_SIZE = 4
+
+_crew_embeddings = OrderedDict()
+_crew_embeddings_lock = threading.Lock()
+
+
+def get_crew_embeddings(df, model):
+    """
+    CrewEmbeddings untuk df dan model
+
+    Matriks dibangun sekali per objek DataFrame (versi snapshot) dan objek
+    model, lalu dipakai bersama oleh semua request.
+    """
+    key = (id(df), id(model))
+    with _crew_embeddings_lock:
+        embeddings = _crew_embeddings.get(key)
+        # id() bisa dipakai ulang setelah objek lama dihapus, cek identitasnya
+        if (
+            embeddings is None
+            or embeddings.data is not df
+            or embeddings.model is not model
+        ):
+            embeddings = CrewEmbeddings(df, model)
+            _crew_embeddings[key] = embeddings
+        _crew_embeddings.move_to_end(key)
+        while len(_crew_embeddings) > CREW_EMBEDDINGS_CACHE_SIZE:
+            _crew_embeddings.popitem(last=False)
+        return embeddings
+
+
+def top_k_positions(keys, k):
+    """
+    Posisi k baris teratas, urut descending lexicographic menurut keys
+
+    Hasilnya sama dengan sort_values(by=keys, ascending=False, kind="stable")
+    lalu head(k): nilai seri diurutkan berdasarkan posisi baris dan NaN di
+    akhir. Per key hanya dilakukan partisi O(n) untuk mencari nilai ambang,
+    sorting hanya dilakukan pada k pemenang.
+
+    Args:
+        keys: List array 1-D sama panjang, key utama lebih dulu
+        k: Jumlah baris yang diambil
+
+    Returns:
+        Array posisi baris (maksimal k)
+    """
+    keys = [np.asarray(key, dtype=np.float64) for key in keys]
+    keys = [np.where(np.isnan(key), -np.inf, key) for key in keys]
+    candidates = np.arange(len(keys[0]))
+    if k <= 0:
+        return candidates[:0]
+
+    winners = []
+    remaining = k
+    for key in keys:
+        values = key[candidates]
+        if remaining >= len(candidates):
+            winners.append(candidates)
+            break
+
+        # Nilai ke-remaining terbesar: yang lebih besar pasti menang, yang
+        # sama dengannya diputuskan oleh key berikutnya
+        kth = len(candidates) - remaining
+        threshold = values[np.argpartition(values, kth)[kth]]
+        above = candidates[values > threshold]
+        winners.append(above)
+        remaining -= len(above)
+        candidates = candidates[values == threshold]
+    else:
+        # Seri di semua key: ambil berdasarkan posisi baris
+        winners.append(candidates[:remaining])
+
+    winners = np.concatenate(winners)
+    # np.lexsort: key terakhir adalah key utama, posisi baris sebagai penentu seri
+    order = np.lexsort([winners] + [-key[winners] for key in reversed(keys)])
+    return winners[order]
+
+
 # Fungsi untuk mendapatkan Vessel Group ID berdasarkan nama vessel
 def get_vessel_group_id(df, vessel_name):
 
@@ -163,8 +368,10 @@ def calculate_day_remains_difference(df):
     return df
 
 
+# crew_df: DataFrame crew lengkap asal df (df hasil filter crew_df dengan index
+# yang sama), supaya matriks embedding crew_df yang sudah di-cache dipakai ulang
 def getRecommendation(
-    df, dataCandidates, bagian, vessel_name, rank, certificate, age_range
+    df, dataCandidates, bagian, vessel_name, rank, certificate, age_range, crew_df=None
 ):
     global word2vec_model
 
@@ -183,35 +390,14 @@ def getRecommendation(
     ]
     print(filtered_df)
 
-    # Menggabungkan fitur RANK dan CERTIFICATE untuk perhitungan similarity
-    filtered_df["combined_features"] = (
-        filtered_df["last_position"] + " " + filtered_df["certificate"]
-    )
-
-    # Fungsi untuk mengubah teks menjadi vektor Word2Vec
-    def get_word2vec_vector(text):
-        words = text.split()
-        word_vectors = [
-            word2vec_model.wv[word] for word in words if word in word2vec_model.wv
-        ]
-        if word_vectors:
-            return np.mean(word_vectors, axis=0)  # Rata-rata vektor kata
-        else:
-            return np.zeros(
-                word2vec_model.vector_size
-            )  # Vektor nol jika kata tidak ditemukan
-
-    # Mengonversi semua data CERTIFICATE menjadi vektor Word2Vec
-    filtered_df["vector"] = filtered_df["combined_features"].apply(get_word2vec_vector)
-
-    # Membuat vektor dari input pengguna
-    user_input = rank + " " + certificate
-    user_vector = get_word2vec_vector(user_input)
-
-    # Menghitung cosine similarity antara input pengguna dan data
-    similarity_scores = filtered_df["vector"].apply(
-        lambda x: cosine_similarity([user_vector], [x])[0][0]
-    )
+    # Cosine similarity input pengguna terhadap fitur RANK + CERTIFICATE crew,
+    # memakai matriks embedding crew yang sudah di-cache
+    embeddings = get_crew_embeddings(df if crew_df is None else crew_df, word2vec_model)
+    positions = embeddings.positions(filtered_df.index)
+    if positions is None:
+        # Index filtered_df tidak bisa dipetakan ke crew, hitung langsung
+        embeddings = CrewEmbeddings(filtered_df, word2vec_model)
+    similarity_scores = embeddings.scores(rank + " " + certificate, positions)
 
     # Hierarchical mapping
     hierarchy_mapping = {
@@ -263,13 +449,11 @@ def getRecommendation(
         + (0.1 * filtered_df["non_hierarchical_score"])
     )
 
-    # Sorting berlapis: Prioritas pada rank_match lalu final_score
-    filtered_df = filtered_df.sort_values(
-        by=["rank_match", "final_score"], ascending=[False, False]
+    # Top 20 rekomendasi, urutan berlapis: rank_match lalu final_score
+    top_positions = top_k_positions(
+        [filtered_df["rank_match"], filtered_df["final_score"]], 20
     )
-
-    # Mengambil top 20 rekomendasi
-    recommendations = filtered_df.head(20)[
+    recommendations = filtered_df.iloc[top_positions][
         [
             "seamancode",
             "seafarercode",
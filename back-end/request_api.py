@@ -1,6 +1,6 @@
 import pandas as pd
 
-from database import get_seamen_as_data
+from database import get_seamen_as_data, get_seamen_index
 from model import filter_in_vessel, vessel_group_id_deck
 
 KELOMPOK = {
@@ -143,21 +143,50 @@ def get_month_index(month_name, year):
 
 
 def get_nganggur(job):
-    # Load from Supabase instead of Excel
-    local_df = get_seamen_as_data()
-    filtered_cadangan = filter_in_vessel(local_df, "others", KELOMPOK)
-    filtered_cadangan = filtered_cadangan[(filtered_cadangan["last_position"] == job)]
+    # Hanya ambil crew darat untuk job ini, filter dijalankan di sisi query
+    filtered_cadangan = get_seamen_as_data(
+        columns=["name", "last_location", "seamancode"],
+        where={"last_position": job, "last_location": KELOMPOK["others"]},
+    )
     filtered_cadangan = filtered_cadangan.sort_values(by="last_location")
 
     return filtered_cadangan[["name", "last_location", "seamancode"]]
 
 
-def get_schedule(vessel_group_id_filter, new_nahkoda, type, part, job="NAKHODA"):
-    """Tambahkan parameter job dengan default NAKHODA"""
-    local_df = get_seamen_as_data()
+class RotationContext:
+    """
+    Data seamen untuk satu request rotasi
+
+    Seamen dimuat sekali dan hasil filter_in_vessel + vessel_group_id_deck
+    disimpan per (type, part), sehingga get_schedule dan helper crew dalam
+    satu request memakai data yang sama. DataFrame di dalamnya dipakai
+    bersama, jadi jangan diubah in-place.
+    """
+
+    def __init__(self):
+        self.index = get_seamen_index()
+        self.seamen = self.index.data
+        self._grouped = {}
 
-    filtered_df = filter_in_vessel(local_df, type, KELOMPOK)
-    filtered_df = vessel_group_id_deck(filtered_df, type, part)
+    def grouped(self, type, part):
+        """Seamen di kapal type dengan kolom VESSEL GROUP ID untuk part"""
+        key = (type, part)
+        if key not in self._grouped:
+            filtered_df = filter_in_vessel(self.seamen, type, KELOMPOK)
+            self._grouped[key] = vessel_group_id_deck(filtered_df, type, part)
+        return self._grouped[key]
+
+    def find_person(self, code):
+        """Baris seamen dengan seamancode code, atau None"""
+        return self.index.row(int(code))
+
+
+def get_schedule(
+    vessel_group_id_filter, new_nahkoda, type, part, job="NAKHODA", context=None
+):
+    """Tambahkan parameter job dengan default NAKHODA"""
+    context = context or RotationContext()
+    filtered_df = context.grouped(type, part)
 
     # Filter berdasarkan job (bukan hardcoded "NAKHODA")
     filtered_df_nahkoda = filtered_df[
@@ -286,13 +315,13 @@ def get_schedule(vessel_group_id_filter, new_nahkoda, type, part, job="NAKHODA")
     return schedule.fillna("")
 
 
-def get_nahkoda(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
-    # Load from Supabase instead of Excel
-    local_df = get_seamen_as_data()
+def get_nahkoda(
+    vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL", context=None
+):
+    context = context or RotationContext()
 
     if quantity != "ONE":
-        filtered_df = filter_in_vessel(local_df, type, KELOMPOK)
-        filtered_df = vessel_group_id_deck(filtered_df, type, part)
+        filtered_df = context.grouped(type, part)
 
         filtered_df_nahkoda = filtered_df[
             (filtered_df["last_position"] == "NAKHODA")
@@ -318,9 +347,8 @@ def get_nahkoda(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL")
     # Add cadangan (new_nahkoda)
     cadangan_list = []
     for code in new_nahkoda or []:
-        person = local_df[local_df["seamancode"] == int(code)]
-        if not person.empty:
-            person_data = person.iloc[0]
+        person_data = context.find_person(code)
+        if person_data is not None:
             row = {
                 "seamancode": code,
                 "last_location": person_data.get("last_location", ""),
@@ -350,13 +378,13 @@ def get_nahkoda(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL")
     ]
 
 
-def get_kkm(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
-    # Load from Supabase instead of Excel
-    local_df = get_seamen_as_data()
+def get_kkm(
+    vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL", context=None
+):
+    context = context or RotationContext()
 
     if quantity != "ONE":
-        filtered_df = filter_in_vessel(local_df, type, KELOMPOK)
-        filtered_df = vessel_group_id_deck(filtered_df, type, part)
+        filtered_df = context.grouped(type, part)
 
         filtered_df_nahkoda = filtered_df[
             (filtered_df["last_position"] == "KKM")
@@ -382,9 +410,8 @@ def get_kkm(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
     # Add cadangan (new_nahkoda)
     cadangan_list = []
     for code in new_nahkoda or []:
-        person = local_df[local_df["seamancode"] == int(code)]
-        if not person.empty:
-            person_data = person.iloc[0]
+        person_data = context.find_person(code)
+        if person_data is not None:
             row = {
                 "seamancode": code,
                 "last_location": person_data.get("last_location", ""),
@@ -414,13 +441,13 @@ def get_kkm(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
     ]
 
 
-def get_mualimI(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
-    # Load from Supabase instead of Excel
-    local_df = get_seamen_as_data()
+def get_mualimI(
+    vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL", context=None
+):
+    context = context or RotationContext()
 
     if quantity != "ONE":
-        filtered_df = filter_in_vessel(local_df, type, KELOMPOK)
-        filtered_df = vessel_group_id_deck(filtered_df, type, part)
+        filtered_df = context.grouped(type, part)
 
         filtered_df_nahkoda = filtered_df[
             (filtered_df["last_position"] == "MUALIM I")
@@ -446,9 +473,8 @@ def get_mualimI(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL")
     # Add cadangan (new_nahkoda)
     cadangan_list = []
     for code in new_nahkoda or []:
-        person = local_df[local_df["seamancode"] == int(code)]
-        if not person.empty:
-            person_data = person.iloc[0]
+        person_data = context.find_person(code)
+        if person_data is not None:
             row = {
                 "seamancode": code,
                 "last_location": person_data.get("last_location", ""),
@@ -478,13 +504,13 @@ def get_mualimI(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL")
     ]
 
 
-def get_masinisII(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL"):
-    # Load from Supabase instead of Excel
-    local_df = get_seamen_as_data()
+def get_masinisII(
+    vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL", context=None
+):
+    context = context or RotationContext()
 
     if quantity != "ONE":
-        filtered_df = filter_in_vessel(local_df, type, KELOMPOK)
-        filtered_df = vessel_group_id_deck(filtered_df, type, part)
+        filtered_df = context.grouped(type, part)
 
         filtered_df_nahkoda = filtered_df[
             (filtered_df["last_position"] == "MASINIS II")
@@ -510,9 +536,8 @@ def get_masinisII(vessel_group_id_filter, new_nahkoda, type, part, quantity="ALL
     # Add cadangan (new_nahkoda)
     cadangan_list = []
     for code in new_nahkoda or []:
-        person = local_df[local_df["seamancode"] == int(code)]
-        if not person.empty:
-            person_data = person.iloc[0]
+        person_data = context.find_person(code)
+        if person_data is not None:
             row = {
                 "seamancode": code,
                 "last_location": person_data.get("last_location", ""),
@@ -0,0 +1,112 @@
+# Serializer JSON bersama untuk semua response app.py
+# 1. orjson dengan dukungan numpy/pandas (tanpa konversi manual per record)
+# 2. DataFrame dalam orientasi "records" atau "split" (kolom tidak diulang per baris)
+# 3. Kompresi gzip/brotli sesuai Accept-Encoding
+
+import gzip
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import orjson
+import pandas as pd
+from flask import Response, request
+from werkzeug.http import http_date
+
+try:
+    import brotli
+except ImportError:  # Brotli tidak tersedia, hanya gzip
+    brotli = None
+
+# Response lebih kecil dari ini tidak dikompres
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+FRAME_ORIENTS = ["records", "split"]
+
+
+def _default(value):
+    """Tipe yang tidak ditangani orjson secara native"""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (datetime, date)):
+        # Format tanggal sama seperti jsonify Flask (RFC 822)
+        return http_date(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, pd.Timedelta):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj):
+    """Serialize obj ke JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def requested_orient(default="records"):
+    """Orientasi DataFrame dari query string ?orient=records|split"""
+    orient = request.args.get("orient", default)
+    return orient if orient in FRAME_ORIENTS else default
+
+
+def frame_payload(df, orient="records"):
+    """
+    DataFrame menjadi {"columns": [...], "data": [...]}
+
+    Args:
+        df: DataFrame yang dikirim
+        orient: "records" (data berupa list dict) atau "split" (data berupa
+            list baris, urutan nilai mengikuti columns)
+    """
+    columns = df.columns.tolist()
+    if orient == "split":
+        return {"columns": columns, "data": df.to_numpy(dtype=object).tolist()}
+    return {"columns": columns, "data": df.to_dict(orient="records")}
+
+
+def _negotiate_encoding():
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(candidates)
+
+
+def encoded_response(body, status=200, mimetype="application/json", headers=None):
+    """
+    Response dari body yang sudah di-serialize, dikompres jika client
+    mendukung dan ukurannya cukup besar
+    """
+    if isinstance(body, str):
+        body = body.encode()
+
+    response = Response(body, status=status, mimetype=mimetype, headers=headers)
+    response.vary.add("Accept-Encoding")
+
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _negotiate_encoding()
+    if encoding == "br":
+        response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    else:
+        return response
+
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def json_response(obj, status=200, headers=None):
+    """Pengganti jsonify: serialize dengan orjson lalu kompres jika perlu"""
+    return encoded_response(dumps(obj), status=status, headers=headers)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# database.py butuh DATABASE_URL saat import; test tidak memakai engine ini
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,155 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import database
+
+
+def test_split_date_range_covers_each_day_once():
+    date_from, date_to = date(2026, 1, 1), date(2026, 3, 15)
+    chunks = database.split_date_range(date_from, date_to, chunk_days=30)
+
+    days = [
+        start + timedelta(days=offset)
+        for start, end in chunks
+        for offset in range((end - start).days + 1)
+    ]
+    assert chunks[0][0] == date_from and chunks[-1][1] == date_to
+    assert days == [
+        date_from + timedelta(days=offset)
+        for offset in range((date_to - date_from).days + 1)
+    ]
+    assert all((end - start).days < 30 for start, end in chunks)
+
+
+def test_split_date_range_single_day_and_empty():
+    day = date(2026, 10, 18)
+    assert database.split_date_range(day, day) == [(day, day)]
+    assert database.split_date_range(day, day - timedelta(days=1)) == []
+
+
+def test_fetch_mutations_chunk_sends_exclusive_end(monkeypatch):
+    payloads = []
+
+    class Response:
+        status_code = 503
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    class Session:
+        def get(self, url, data=None, **kwargs):
+            payloads.append(json.loads(data))
+            return Response()
+
+    monkeypatch.setattr(database, "get_upstream_session", lambda: Session())
+
+    with pytest.raises(Exception):
+        database.fetch_mutations_chunk(date(2026, 10, 1), date(2026, 10, 18))
+    assert payloads[0]["transaction_date_1"] == "01/10/2026"
+    assert payloads[0]["transaction_date_2"] == "19/10/2026"
+
+
+def test_mutations_window_overlaps_watermark(monkeypatch):
+    monkeypatch.setattr(
+        database, "get_mutations_watermark", lambda: datetime(2026, 10, 10, 0, 5)
+    )
+    monkeypatch.setattr(
+        database, "get_last_full_mutations_sync", lambda: datetime.now()
+    )
+    window = database.get_mutations_window("incremental")
+
+    overlap = timedelta(days=database.MUTATIONS_OVERLAP_DAYS)
+    assert window["date_from"] == date(2026, 10, 10) - overlap
+    assert window["date_to"] == date.today()
+    assert window["incremental"]
+
+
+@pytest.mark.parametrize("last_full", [None, datetime(2020, 1, 1)])
+def test_mutations_window_runs_periodic_full_sync(monkeypatch, last_full):
+    monkeypatch.setattr(
+        database, "get_mutations_watermark", lambda: datetime(2026, 10, 10, 0, 5)
+    )
+    monkeypatch.setattr(database, "get_last_full_mutations_sync", lambda: last_full)
+    window = database.get_mutations_window("incremental")
+
+    start = datetime.strptime(
+        database.MUTATIONS_START_DATE, database.UPSTREAM_DATE_FORMAT
+    ).date()
+    assert window["date_from"] == start
+    assert not window["incremental"]
+
+
+@pytest.fixture
+def mutations_conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "pg_insert", sqlite_insert)
+    engine = create_engine(f"sqlite:///{tmp_path / 'mutations.db'}")
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE mutations (mutationnoid BIGINT PRIMARY KEY, "
+                "seamancode BIGINT, transactiondate TIMESTAMP, tovesselname TEXT)"
+            )
+        )
+        conn.execute(
+            text(
+                """
+            INSERT INTO mutations VALUES
+                (1, 10, '2026-09-30 23:59:00', 'BEFORE WINDOW'),
+                (2, 10, '2026-10-01 00:00:00', 'FIRST DAY'),
+                (3, 11, '2026-10-05 08:00:00', 'IN WINDOW'),
+                (4, 11, '2026-10-18 23:30:00', 'LAST DAY'),
+                (5, 12, '2026-10-19 00:00:00', 'AFTER WINDOW')
+        """
+            )
+        )
+        yield conn
+    engine.dispose()
+
+
+def test_merge_mutations_deletes_only_inside_window(mutations_conn):
+    window = {"date_from": date(2026, 10, 1), "date_to": date(2026, 10, 18)}
+    df = pd.DataFrame(
+        {
+            "mutationnoid": [3, 6],
+            "seamancode": [11, 12],
+            "transactiondate": pd.to_datetime(
+                ["2026-10-05 08:00:00", "2026-10-18 09:00:00"]
+            ),
+            "tovesselname": ["UPDATED", "NEW"],
+        }
+    )
+
+    changed = database.merge_mutations(mutations_conn, df, window)
+
+    rows = mutations_conn.execute(
+        text("SELECT mutationnoid, tovesselname FROM mutations ORDER BY 1")
+    ).fetchall()
+    # 2 dan 4 (hari pertama/terakhir window) hilang dari upstream, 1 dan 5 di
+    # luar window tetap
+    assert [tuple(row) for row in rows] == [
+        (1, "BEFORE WINDOW"),
+        (3, "UPDATED"),
+        (5, "AFTER WINDOW"),
+        (6, "NEW"),
+    ]
+    assert changed == 4
+
+
+def test_merge_mutations_empty_window_deletes_window(mutations_conn):
+    window = {"date_from": date(2026, 10, 1), "date_to": date(2026, 10, 18)}
+
+    changed = database.merge_mutations(mutations_conn, pd.DataFrame(), window)
+
+    rows = mutations_conn.execute(
+        text("SELECT mutationnoid FROM mutations ORDER BY 1")
+    ).fetchall()
+    assert [row[0] for row in rows] == [1, 5]
+    assert changed == 3
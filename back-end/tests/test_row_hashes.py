@@ -0,0 +1,74 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import database
+
+SEAMEN_HASH_OPTIONS = {
+    "ignored_columns": database.SEAMEN_DERIVED_COLUMNS,
+    "day_counters": database.SEAMEN_DAY_COUNTERS,
+}
+TODAY = date(2026, 10, 1)
+
+
+def seamen_frame():
+    return pd.DataFrame(
+        {
+            "seamancode": [1, 2, 3],
+            "age": [35, 41, 29],
+            "name": ["BUDI", "ANDI", None],
+            "day_remains": [10, 20, 30],
+            "no": [1, 2, 3],
+        }
+    )
+
+
+def row_hashes(df, today=TODAY):
+    return database.compute_row_hashes(df, today=today, **SEAMEN_HASH_OPTIONS)
+
+
+def test_row_hashes_ignore_numeric_dtype():
+    df = seamen_frame()
+    as_float = df.assign(age=df["age"].astype(float))
+    as_object = df.assign(age=pd.Series([35.0, 41.0, 29.0], dtype=object))
+
+    assert (row_hashes(df) == row_hashes(as_float)).all()
+    assert (row_hashes(df) == row_hashes(as_object)).all()
+
+
+def test_row_hashes_treat_nan_and_none_alike():
+    with_nan = seamen_frame().assign(age=[35.0, 41.0, np.nan])
+    with_none = seamen_frame().assign(age=pd.Series([35, 41, None], dtype=object))
+
+    assert (row_hashes(with_nan) == row_hashes(with_none)).all()
+    assert (row_hashes(with_nan)[:2] == row_hashes(seamen_frame())[:2]).all()
+
+
+def test_row_hashes_stable_across_days():
+    df = seamen_frame()
+    next_days = df.assign(day_remains=df["day_remains"] - 3, no=[3, 1, 2])
+
+    assert (row_hashes(df) == row_hashes(next_days, date(2026, 10, 4))).all()
+    # Hari yang sama: day_remains berubah berarti end_date berubah
+    assert not (row_hashes(df) == row_hashes(next_days)).any()
+
+
+def test_row_hashes_detect_changed_rows():
+    df = seamen_frame()
+    changed = df.assign(name=["BUDI", "ANDI S", None])
+
+    assert (row_hashes(df) == row_hashes(changed)).tolist() == [True, False, True]
+
+
+def test_content_hash_ignores_row_order_and_day_change():
+    df = seamen_frame()
+    shuffled = df.iloc[[2, 0, 1]].assign(day_remains=lambda f: f["day_remains"] - 1)
+
+    def content_hash(frame, today):
+        return database.compute_content_hash(
+            frame, "seamancode", today=today, **SEAMEN_HASH_OPTIONS
+        )
+
+    assert content_hash(df, TODAY) == content_hash(shuffled, date(2026, 10, 2))
+    assert content_hash(df, TODAY) != content_hash(df.assign(age=0), TODAY)
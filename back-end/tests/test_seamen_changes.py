@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+import database
+
+
+def seamen_frame():
+    return pd.DataFrame(
+        {
+            "seamancode": [1, 2, 3],
+            "name": ["BUDI", "ANDI", "SITI"],
+            "age": [35, 41, 29],
+            "last_location": ["KM. LUZON", None, "KM. VERIZON"],
+            "day_remains": [10, 20, 30],
+            "no": [1, 2, 3],
+        }
+    )
+
+
+def changes_by_code(changes):
+    return {change["seamancode"]: change for change in changes}
+
+
+def test_diff_seamen_reports_inserted_updated_deleted():
+    old = seamen_frame()
+    new = pd.concat(
+        [
+            old[old["seamancode"] != 3],
+            pd.DataFrame(
+                [
+                    {
+                        "seamancode": 4,
+                        "name": "RINA",
+                        "age": 24,
+                        "last_location": None,
+                        "day_remains": 5,
+                        "no": 4,
+                    }
+                ]
+            ),
+        ],
+        ignore_index=True,
+    )
+    new.loc[new["seamancode"] == 1, "last_location"] = "KM. NUSA"
+
+    changes = changes_by_code(database.diff_seamen(old, new))
+
+    assert sorted(changes) == [1, 3, 4]
+    assert changes[4]["change_type"] == "inserted"
+    assert changes[4]["new_values"]["name"] == "RINA"
+    assert changes[3]["change_type"] == "deleted"
+    assert changes[3]["old_values"]["name"] == "SITI"
+    assert changes[1]["change_type"] == "updated"
+    assert changes[1]["changed_columns"] == ["last_location"]
+    assert changes[1]["old_values"] == {"last_location": "KM. LUZON"}
+    assert changes[1]["new_values"] == {"last_location": "KM. NUSA"}
+
+
+def test_diff_seamen_ignores_derived_columns():
+    old = seamen_frame()
+    new = old.assign(day_remains=old["day_remains"] - 1, no=[3, 2, 1])
+
+    assert database.diff_seamen(old, new) == []
+
+
+def test_diff_seamen_ignores_dtype_differences():
+    old = seamen_frame()
+    # Data dari database vs API: int vs float, None vs NaN
+    new = old.assign(
+        age=old["age"].astype(float),
+        last_location=["KM. LUZON", np.nan, "KM. VERIZON"],
+    )
+
+    assert database.diff_seamen(old, new) == []
+
+
+def test_diff_seamen_detects_value_cleared():
+    old = seamen_frame()
+    new = old.assign(last_location=[None, None, "KM. VERIZON"])
+
+    changes = database.diff_seamen(old, new)
+
+    assert len(changes) == 1
+    assert changes[0]["seamancode"] == 1
+    assert changes[0]["new_values"] == {"last_location": None}
@@ -0,0 +1,41 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import database
+
+
+@pytest.fixture
+def seamen_conn(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seamen.db'}")
+    df = pd.DataFrame(
+        {"seamancode": range(1, 11), "name": [f"SEAMAN {i}" for i in range(1, 11)]}
+    )
+    with engine.connect() as conn:
+        df.to_sql("seamen", conn, index=False)
+        pd.DataFrame(
+            {
+                "seamancode": df["seamancode"],
+                "row_hash": database.compute_row_hashes(df),
+            }
+        ).to_sql("seamen_row_hashes", conn, index=False)
+        yield conn
+    engine.dispose()
+
+
+def test_incremental_sync_rejects_truncated_payload(seamen_conn):
+    payload = pd.DataFrame({"seamancode": [1, 2], "name": ["SEAMAN 1", "SEAMAN 2"]})
+
+    with pytest.raises(Exception, match="less than"):
+        database._sync_seamen_incremental(
+            seamen_conn,
+            payload,
+            database.compute_row_hashes(payload),
+            date.today(),
+            database.SyncTimer(),
+        )
+
+    count = seamen_conn.execute(text("SELECT COUNT(*) FROM seamen")).scalar()
+    assert count == 10